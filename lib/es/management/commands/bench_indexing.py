@@ -0,0 +1,57 @@
+"""
+Measures how fast documents are extracted for reindexing, without sending
+anything to Elasticsearch.
+
+Call like:
+
+    ./manage.py bench_indexing --index=apps --limit=2000
+
+"""
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from lib.es.management.commands.reindex import INDEX_CHOICES
+from mkt.site.utils import chunked
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--index', default='apps',
+                    help='Which indexes to extract documents for.'),
+        make_option('--limit', type='int', default=1000,
+                    help='How many objects to extract documents for.'),
+    )
+
+    help = __doc__
+
+    def handle(self, *args, **kw):
+        indexers = INDEX_CHOICES.get(kw['index'])
+        if indexers is None:
+            raise CommandError(
+                'Incorrect index name specified. '
+                'Choose one of: %s' % ', '.join(INDEX_CHOICES.keys()))
+
+        for indexer in indexers:
+            ids = list(indexer.get_indexable()
+                       .values_list('id', flat=True)[:kw['limit']])
+            count = 0
+            start = time.time()
+            with CaptureQueriesContext(connection) as queries:
+                for chunk in chunked(ids, indexer.chunk_size):
+                    objs = list(indexer.get_indexable().filter(id__in=chunk))
+                    indexer.attach_related(objs)
+                    for obj in objs:
+                        indexer.extract_document(obj.id, obj)
+                        count += 1
+            elapsed = time.time() - start
+
+            self.stdout.write(
+                '{name}: {count} documents in {elapsed:.1f}s, '
+                '{rate:.1f} documents/s, {queries:.1f} queries/document'
+                .format(name=indexer.get_mapping_type_name(), count=count,
+                        elapsed=elapsed, rate=count / (elapsed or 1),
+                        queries=len(queries) / float(count or 1)))
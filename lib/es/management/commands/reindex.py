@@ -2,6 +2,10 @@
 Marketplace ElasticSearch Indexer.
 
 Currently creates the indexes and re-indexes apps and feed elements.
+
+The progress of each chunk of objects is recorded in the database, so that an
+interrupted reindexation can be picked up where it stopped with `--resume`,
+and followed with `--status`.
 """
 import itertools
 import logging
@@ -15,9 +19,10 @@ from celery import chain, chord, task
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
 
 import mkt.feed.indexers as f_indexers
-from lib.es.models import Reindexing
+from lib.es.models import Reindexing, ReindexingChunk
 from mkt.extensions.indexers import ExtensionIndexer
 from mkt.site.utils import chunked, timestamp_index
 from mkt.webapps.indexers import HomescreenIndexer, WebappIndexer
@@ -153,17 +158,26 @@ def post_index(new_index, old_index, alias, index_name, settings):
 
 
 @task(ignore_result=False)
-def run_indexing(index, index_name, ids):
+def run_indexing(index, index_name, ids, chunk_number=None, **options):
     """Index the objects.
 
     - index: name of the index
+    - chunk_number: the ReindexingChunk to mark as done once indexed
+    - options: passed to the indexer's `run_indexing`, like `bulk_size`
 
     Note: `ignore_result=False` is required for the chord to work and trigger
     the callback.
 
     """
     indexer = INDEXER_MAP[index_name]
-    indexer.run_indexing(ids, ES, index=index)
+    start = time.time()
+    indexer.run_indexing(ids, ES, index=index, **options)
+    if chunk_number is not None:
+        ReindexingChunk.mark_done(index, chunk_number)
+    elapsed = time.time() - start
+    _print('Indexed {count} items in {elapsed:.1f}s ({rate:.1f} items/s)'
+           .format(count=len(ids), elapsed=elapsed,
+                   rate=len(ids) / (elapsed or 1)), index)
 
 
 def chunk_indexing(indexer, chunk_size):
@@ -172,6 +186,46 @@ def chunk_indexing(indexer, chunk_size):
     return chunked(chunks, chunk_size), len(chunks)
 
 
+def get_index_settings(index):
+    """Return the number of replicas and shards of an existing index."""
+    if index:
+        try:
+            s = (ES.indices.get_settings(index=index).get(
+                index, {}).get('settings', {}))
+        except elasticsearch.NotFoundError:
+            s = {}
+    else:
+        s = {}
+    num_replicas = s.get('number_of_replicas',
+                         settings.ES_DEFAULT_NUM_REPLICAS)
+    num_shards = s.get('number_of_shards',
+                       settings.ES_DEFAULT_NUM_SHARDS)
+    return num_replicas, num_shards
+
+
+def queue_tasks(index_tasks, post_task, pre_task=None, concurrency=None):
+    """
+    Run the index tasks, then the post task once they are all done.
+
+    With `concurrency`, the index tasks are split in that many chains, so
+    that no more than `concurrency` of them run at the same time.
+    """
+    if concurrency and index_tasks:
+        index_tasks = [chain(*index_tasks[i::concurrency])
+                       for i in range(min(concurrency, len(index_tasks)))]
+    pre_tasks = [pre_task] if pre_task else []
+
+    if not index_tasks:
+        chain(*(pre_tasks + [post_task])).apply_async()
+    elif settings.CELERY_ALWAYS_EAGER:
+        # Eager mode and chords don't get along. So we serialize
+        # the tasks as a workaround.
+        chain(*(pre_tasks + index_tasks + [post_task])).apply_async()
+    else:
+        chain(*(pre_tasks + [chord(header=index_tasks,
+                                   body=post_task)])).apply_async()
+
+
 class Command(BaseCommand):
     help = 'Reindex all ES indexes'
     option_list = BaseCommand.option_list + (
@@ -185,6 +239,25 @@ class Command(BaseCommand):
                     help=('Bypass the database flag that says '
                           'another indexation is ongoing'),
                     default=False),
+        make_option('--resume', action='store_true',
+                    help=('Index the chunks an interrupted indexation did '
+                          'not get to, then point the alias to the new '
+                          'index'),
+                    default=False),
+        make_option('--status', action='store_true',
+                    help='Show the progress of the ongoing indexation',
+                    default=False),
+        make_option('--concurrency', action='store', type='int',
+                    help=('How many chunks to index at the same time, '
+                          'defaults to as many as there are workers'),
+                    default=None),
+        make_option('--bulk-size', action='store', type='int',
+                    help='How many documents to send to ES per request',
+                    default=None),
+        make_option('--max-retries', action='store', type='int',
+                    help=('How many times to send documents ES rejected '
+                          'because it is overloaded again'),
+                    default=3),
     )
 
     def handle(self, *args, **kwargs):
@@ -194,7 +267,6 @@ class Command(BaseCommand):
         then points the alias to this new index when finished.
         """
         index_choice = kwargs.get('index', None)
-        prefix = kwargs.get('prefix', '')
         force = kwargs.get('force', False)
 
         if index_choice:
@@ -207,6 +279,20 @@ class Command(BaseCommand):
         else:
             INDEXES = INDEXERS
 
+        if kwargs.get('status'):
+            for INDEXER in INDEXES:
+                self.status(INDEXER)
+            return
+
+        options = {'bulk_size': kwargs.get('bulk_size'),
+                   'max_retries': kwargs.get('max_retries')}
+
+        if kwargs.get('resume'):
+            for INDEXER in INDEXES:
+                self.resume(INDEXER, kwargs.get('concurrency'), options)
+            _print('Remaining indexing tasks all queued up.')
+            return
+
         if Reindexing.is_reindexing() and not force:
             raise CommandError('Indexation already occuring - use --force to '
                                'bypass')
@@ -214,70 +300,97 @@ class Command(BaseCommand):
             Reindexing.unflag_reindexing()
 
         for INDEXER in INDEXES:
-            index_name = INDEXER.get_mapping_type_name()
-            chunk_size = INDEXER.chunk_size
-            alias = ES_INDEXES[index_name]
-
-            chunks, total = chunk_indexing(INDEXER, chunk_size)
-            if not total:
-                _print('No items to queue.', alias)
-            else:
-                total_chunks = int(ceil(total / float(chunk_size)))
-                _print('Indexing {total} items into {n} chunks of size {size}'
-                       .format(total=total, n=total_chunks, size=chunk_size),
-                       alias)
-
-            # Get the old index if it exists.
-            try:
-                aliases = ES.indices.get_alias(name=alias).keys()
-            except elasticsearch.NotFoundError:
-                aliases = []
-            old_index = aliases[0] if aliases else None
-
-            # Create a new index, using the index name with a timestamp.
-            new_index = timestamp_index(prefix + alias)
-
-            # See how the index is currently configured.
-            if old_index:
-                try:
-                    s = (ES.indices.get_settings(index=old_index).get(
-                        old_index, {}).get('settings', {}))
-                except elasticsearch.NotFoundError:
-                    s = {}
-            else:
-                s = {}
-            num_replicas = s.get('number_of_replicas',
-                                 settings.ES_DEFAULT_NUM_REPLICAS)
-            num_shards = s.get('number_of_shards',
-                               settings.ES_DEFAULT_NUM_SHARDS)
-
-            pre_task = pre_index.si(new_index, old_index, alias, index_name, {
-                'analysis': INDEXER.get_analysis(),
-                'number_of_replicas': 0,
-                'number_of_shards': num_shards,
-                'store.compress.tv': True,
-                'store.compress.stored': True,
-                'refresh_interval': '-1'})
-            post_task = post_index.si(new_index, old_index, alias, index_name,
-                                      {'number_of_replicas': num_replicas,
-                                       'refresh_interval': '5s'})
-
-            # Ship it.
-            if not total:
-                # If there's no data we still create the index and alias.
-                chain(pre_task, post_task).apply_async()
-            else:
-                index_tasks = [run_indexing.si(new_index, index_name, chunk)
-                               for chunk in chunks]
-
-                if settings.CELERY_ALWAYS_EAGER:
-                    # Eager mode and chords don't get along. So we serialize
-                    # the tasks as a workaround.
-                    index_tasks.insert(0, pre_task)
-                    index_tasks.append(post_task)
-                    chain(*index_tasks).apply_async()
-                else:
-                    chain(pre_task, chord(header=index_tasks,
-                                          body=post_task)).apply_async()
+            self.reindex(INDEXER, kwargs.get('prefix', ''),
+                         kwargs.get('concurrency'), options)
 
         _print('New index and indexing tasks all queued up.')
+
+    def reindex(self, INDEXER, prefix, concurrency, options):
+        index_name = INDEXER.get_mapping_type_name()
+        chunk_size = INDEXER.chunk_size
+        alias = ES_INDEXES[index_name]
+
+        chunks, total = chunk_indexing(INDEXER, chunk_size)
+        if not total:
+            _print('No items to queue.', alias)
+        else:
+            total_chunks = int(ceil(total / float(chunk_size)))
+            _print('Indexing {total} items into {n} chunks of size {size}'
+                   .format(total=total, n=total_chunks, size=chunk_size),
+                   alias)
+
+        # Get the old index if it exists.
+        try:
+            aliases = ES.indices.get_alias(name=alias).keys()
+        except elasticsearch.NotFoundError:
+            aliases = []
+        old_index = aliases[0] if aliases else None
+
+        # Create a new index, using the index name with a timestamp.
+        new_index = timestamp_index(prefix + alias)
+
+        # See how the index is currently configured.
+        num_replicas, num_shards = get_index_settings(old_index)
+
+        pre_task = pre_index.si(new_index, old_index, alias, index_name, {
+            'analysis': INDEXER.get_analysis(),
+            'number_of_replicas': 0,
+            'number_of_shards': num_shards,
+            'store.compress.tv': True,
+            'store.compress.stored': True,
+            'refresh_interval': '-1'})
+        post_task = post_index.si(new_index, old_index, alias, index_name,
+                                  {'number_of_replicas': num_replicas,
+                                   'refresh_interval': '5s'})
+
+        # Record the chunks so an interrupted indexation can be resumed.
+        chunks = list(chunks)
+        ReindexingChunk.create_chunks(alias, new_index, chunks)
+
+        # Ship it. If there's no data we still create the index and alias.
+        index_tasks = [run_indexing.si(new_index, index_name, chunk,
+                                       chunk_number=number, **options)
+                       for number, chunk in enumerate(chunks)]
+        queue_tasks(index_tasks, post_task, pre_task=pre_task,
+                    concurrency=concurrency)
+
+    def resume(self, INDEXER, concurrency, options):
+        index_name = INDEXER.get_mapping_type_name()
+        alias = ES_INDEXES[index_name]
+
+        try:
+            reindexing = Reindexing.objects.get(alias=alias)
+        except Reindexing.DoesNotExist:
+            _print('No indexation to resume.', alias)
+            return
+
+        new_index, old_index = reindexing.new_index, reindexing.old_index
+        remaining = ReindexingChunk.get_remaining(new_index)
+        _print('Resuming indexing into {index}, {n} chunks left'
+               .format(index=new_index, n=len(remaining)), alias)
+
+        num_replicas, num_shards = get_index_settings(old_index)
+        post_task = post_index.si(new_index, old_index, alias, index_name,
+                                  {'number_of_replicas': num_replicas,
+                                   'refresh_interval': '5s'})
+        index_tasks = [run_indexing.si(new_index, index_name, chunk,
+                                       chunk_number=number, **options)
+                       for number, chunk in remaining]
+        queue_tasks(index_tasks, post_task, concurrency=concurrency)
+
+    def status(self, INDEXER):
+        alias = ES_INDEXES[INDEXER.get_mapping_type_name()]
+
+        try:
+            reindexing = Reindexing.objects.get(alias=alias)
+        except Reindexing.DoesNotExist:
+            _print('Not reindexing.', alias)
+            return
+
+        done, total = ReindexingChunk.get_progress(reindexing.new_index)
+        elapsed = (timezone.now() - reindexing.start_date).total_seconds()
+        _print('Indexed {done} of {total} items into {index} in {elapsed}s '
+               '({rate:.1f} items/s)\n'
+               .format(done=done, total=total, index=reindexing.new_index,
+                       elapsed=int(elapsed), rate=done / (elapsed or 1)),
+               alias)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('es', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReindexingChunk',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('alias', models.CharField(max_length=255)),
+                ('new_index', models.CharField(max_length=255)),
+                ('number', models.PositiveIntegerField()),
+                ('ids', models.TextField()),
+                ('done', models.BooleanField(default=False)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'zadmin_reindexing_chunk',
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reindexingchunk',
+            unique_together=set([('new_index', 'number')]),
+        ),
+    ]
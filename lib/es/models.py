@@ -30,9 +30,12 @@ class Reindexing(models.Model):
     def unflag_reindexing(cls, alias=None):
         """Mark down that we are done reindexing"""
         qs = cls.objects.all()
+        chunks = ReindexingChunk.objects.all()
         if alias:
             qs = qs.filter(alias=alias)
+            chunks = chunks.filter(alias=alias)
         qs.delete()
+        chunks.delete()
 
     @classmethod
     def get_indices(cls, alias):
@@ -47,3 +50,56 @@ class Reindexing(models.Model):
                     if idx is not None]
         except Reindexing.DoesNotExist:
             return [alias]
+
+
+class ReindexingChunk(models.Model):
+    """
+    Used to keep track of which chunks of objects have been indexed into the
+    new index, so that an interrupted reindexing can be resumed.
+    """
+    alias = models.CharField(max_length=255)
+    new_index = models.CharField(max_length=255)
+    number = models.PositiveIntegerField()
+    # Comma separated list of the ids of the objects in this chunk.
+    ids = models.TextField()
+    done = models.BooleanField(default=False)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'zadmin_reindexing_chunk'
+        unique_together = ('new_index', 'number')
+
+    @classmethod
+    def create_chunks(cls, alias, new_index, chunks):
+        """Record the chunks of ids that have to be indexed."""
+        cls.objects.filter(alias=alias).delete()
+        cls.objects.bulk_create([
+            cls(alias=alias, new_index=new_index, number=number,
+                ids=','.join(str(id_) for id_ in ids))
+            for number, ids in enumerate(chunks)])
+
+    @classmethod
+    def get_remaining(cls, new_index):
+        """Return the (number, ids) of the chunks not indexed yet."""
+        qs = (cls.objects.filter(new_index=new_index, done=False)
+              .order_by('number').values_list('number', 'ids'))
+        return [(number, [int(id_) for id_ in ids.split(',') if id_])
+                for number, ids in qs]
+
+    @classmethod
+    def mark_done(cls, new_index, number):
+        """Mark down that this chunk has been indexed."""
+        cls.objects.filter(new_index=new_index, number=number).update(
+            done=True, modified=timezone.now())
+
+    @classmethod
+    def get_progress(cls, new_index):
+        """Return how many objects have been indexed, out of how many."""
+        done = total = 0
+        for ids, is_done in (cls.objects.filter(new_index=new_index)
+                             .values_list('ids', 'done')):
+            count = len(ids.split(','))
+            total += count
+            if is_done:
+                done += count
+        return done, total
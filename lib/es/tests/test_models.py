@@ -1,7 +1,7 @@
 from nose.tools import eq_
 
 import mkt.site.tests
-from lib.es.models import Reindexing
+from lib.es.models import Reindexing, ReindexingChunk
 
 
 class TestReindexing(mkt.site.tests.TestCase):
@@ -42,6 +42,13 @@ class TestReindexing(mkt.site.tests.TestCase):
         Reindexing.unflag_reindexing(alias='foo')
         assert Reindexing.objects.filter(alias='bar').count() == 1
 
+    def test_unflag_reindexing_chunks(self):
+        ReindexingChunk.create_chunks('foo', 'bar', [[1, 2]])
+        ReindexingChunk.create_chunks('other', 'baz', [[1, 2]])
+        Reindexing.unflag_reindexing(alias='foo')
+        eq_(list(ReindexingChunk.objects.values_list('alias', flat=True)),
+            ['other'])
+
     def test_is_reindexing(self):
         assert not Reindexing.is_reindexing()
 
@@ -61,3 +68,23 @@ class TestReindexing(mkt.site.tests.TestCase):
 
         # Doesn't clash on other aliases.
         self.assertSetEqual(Reindexing.get_indices('other'), ['other'])
+
+
+class TestReindexingChunk(mkt.site.tests.TestCase):
+
+    def test_create_chunks(self):
+        ReindexingChunk.create_chunks('foo', 'foo-1', [[1, 2, 3], [4]])
+        eq_(ReindexingChunk.get_remaining('foo-1'), [(0, [1, 2, 3]), (1, [4])])
+
+        # Starting another reindexing of the same alias drops the old chunks.
+        ReindexingChunk.create_chunks('foo', 'foo-2', [[5]])
+        eq_(ReindexingChunk.get_remaining('foo-1'), [])
+        eq_(ReindexingChunk.get_remaining('foo-2'), [(0, [5])])
+
+    def test_mark_done(self):
+        ReindexingChunk.create_chunks('foo', 'foo-1', [[1, 2, 3], [4]])
+        eq_(ReindexingChunk.get_progress('foo-1'), (0, 4))
+
+        ReindexingChunk.mark_done('foo-1', 0)
+        eq_(ReindexingChunk.get_remaining('foo-1'), [(1, [4])])
+        eq_(ReindexingChunk.get_progress('foo-1'), (3, 4))
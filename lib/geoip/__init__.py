@@ -1,4 +1,11 @@
+import csv
 import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
 
 import requests
 from django_statsd.clients import statsd
@@ -25,14 +32,137 @@ def is_public(ip):
     return True
 
 
+def ip_to_int(ip):
+    """Return an IPv4 address as an integer, or None if it isn't one."""
+    try:
+        parts = map(int, ip.split('.'))
+    except (AttributeError, ValueError):
+        return None
+    if len(parts) != 4 or not all(0 <= part <= 255 for part in parts):
+        return None
+    return (parts[0] << 24) + (parts[1] << 16) + (parts[2] << 8) + parts[3]
+
+
+class GeoIPDatabase(object):
+    """
+    Resolve IPv4 addresses to country codes from a local CSV file of IP
+    ranges, without calling geodude.
+
+    Each row of the file is either `first ip,last ip,country code`, or in the
+    format of MaxMind's GeoIPCountryWhois.csv (`first ip,last ip,first ip as
+    an integer,last ip as an integer,country code,country name`).
+
+    The ranges are kept sorted in arrays and looked up with a binary search.
+    The file is reloaded when it changes, which is checked at most every
+    `check_interval` seconds. The last `cache_size` addresses looked up are
+    kept in an LRU cache.
+    """
+
+    def __init__(self, path, check_interval=60, cache_size=0):
+        self.path = path
+        self.check_interval = check_interval
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.checked = 0
+        # (first ips, last ips, index of the country code, country codes).
+        self.ranges = (array('I'), array('I'), array('H'), [])
+
+    def load(self):
+        """Read the file into sorted arrays."""
+        rows = []
+        with open(self.path, 'rb') as f:
+            for row in csv.reader(f):
+                if len(row) < 3:
+                    continue
+                first, last = ip_to_int(row[0]), ip_to_int(row[1])
+                code = row[4] if len(row) >= 5 else row[2]
+                if first is None or last is None or not code:
+                    continue
+                rows.append((first, last, code.lower()))
+        rows.sort()
+
+        firsts, lasts, indexes, codes = array('I'), array('I'), array('H'), []
+        code_indexes = {}
+        for first, last, code in rows:
+            if code not in code_indexes:
+                code_indexes[code] = len(codes)
+                codes.append(code)
+            firsts.append(first)
+            lasts.append(last)
+            indexes.append(code_indexes[code])
+
+        # Swap the whole tuple at once, lookups in other threads keep using
+        # the previous ranges until then.
+        self.ranges = (firsts, lasts, indexes, codes)
+        self.cache = OrderedDict()
+        log.info('Loaded {0} GeoIP ranges from {1}'.format(len(rows),
+                                                           self.path))
+
+    def reload_if_changed(self):
+        now = time.time()
+        if now - self.checked < self.check_interval:
+            return
+        with self.lock:
+            if now - self.checked < self.check_interval:
+                return
+            self.checked = now
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime != self.mtime:
+                    self.load()
+                    self.mtime = mtime
+            except (IOError, OSError, csv.Error) as e:
+                log.error('Could not load GeoIP database {0}: {1}'
+                          .format(self.path, e))
+
+    def lookup(self, address):
+        """Return the country code of `address`, or None if unknown."""
+        self.reload_if_changed()
+
+        cache = self.cache
+        if self.cache_size > 0:
+            with self.lock:
+                if address in cache:
+                    # Put it back as the most recently used entry.
+                    code = cache[address] = cache.pop(address)
+                    return code
+
+        ip = ip_to_int(address)
+        if ip is None:
+            return None
+        firsts, lasts, indexes, codes = self.ranges
+        i = bisect_right(firsts, ip) - 1
+        code = codes[indexes[i]] if i >= 0 and ip <= lasts[i] else None
+
+        if self.cache_size > 0:
+            with self.lock:
+                cache[address] = code
+                while len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+        return code
+
+
 class GeoIP:
-    """Call to geodude server to resolve an IP to Geo Info block."""
+    """
+    Resolve an IP to a country code, from the local GeoIP database if there
+    is one, or with a call to the geodude server.
+    """
 
     def __init__(self, settings):
         self.timeout = float(getattr(settings, 'GEOIP_DEFAULT_TIMEOUT', .2))
         self.url = getattr(settings, 'GEOIP_URL', '')
         self.default_val = getattr(settings, 'GEOIP_DEFAULT_VAL',
                                    regions.RESTOFWORLD.slug).lower()
+        self.database = None
+        path = getattr(settings, 'GEOIP_DATABASE', '')
+        if path:
+            self.database = GeoIPDatabase(
+                path,
+                check_interval=getattr(settings,
+                                       'GEOIP_DATABASE_CHECK_INTERVAL', 60),
+                cache_size=getattr(settings, 'GEOIP_CACHE_SIZE', 0))
 
     def lookup(self, address):
         """Resolve an IP address to a block of geo information.
@@ -42,6 +172,13 @@ class GeoIP:
 
         """
         public_ip = is_public(address)
+        if self.database and public_ip:
+            country_code = self.database.lookup(address)
+            if country_code:
+                statsd.incr('z.geoip.local.success')
+                return country_code
+            statsd.incr('z.geoip.local.miss')
+
         if self.url and public_ip:
             with statsd.timer('z.geoip'):
                 res = None
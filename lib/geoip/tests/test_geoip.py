@@ -1,3 +1,7 @@
+import os
+import shutil
+import tempfile
+from bisect import bisect_right
 from random import randint
 
 import mock
@@ -6,12 +10,18 @@ from nose.tools import eq_
 
 import mkt.site.tests
 
-from lib.geoip import GeoIP
+from lib.geoip import GeoIP, GeoIPDatabase
 
 
-def generate_settings(url='', default='restofworld', timeout=0.2):
+DATABASE = os.path.join(os.path.dirname(__file__), 'fixtures',
+                        'countries.csv')
+
+
+def generate_settings(url='', default='restofworld', timeout=0.2,
+                      database=''):
     return mock.Mock(GEOIP_URL=url, GEOIP_DEFAULT_VAL=default,
-                     GEOIP_DEFAULT_TIMEOUT=timeout)
+                     GEOIP_DEFAULT_TIMEOUT=timeout, GEOIP_DATABASE=database,
+                     GEOIP_DATABASE_CHECK_INTERVAL=60, GEOIP_CACHE_SIZE=10)
 
 
 class GeoIPTest(mkt.site.tests.TestCase):
@@ -86,3 +96,77 @@ class GeoIPTest(mkt.site.tests.TestCase):
             result = geoip.lookup(ip)
             assert not mock_post.called
             eq_(result, 'restofworld')
+
+    @mock.patch('requests.post')
+    def test_local_database(self, mock_post):
+        geoip = GeoIP(generate_settings(url='localhost', database=DATABASE))
+        eq_(geoip.lookup('1.1.1.1'), 'us')
+        assert not mock_post.called
+
+    @mock.patch('requests.post')
+    def test_local_database_fallback(self, mock_post):
+        geoip = GeoIP(generate_settings(url='localhost', database=DATABASE))
+        mock_post.return_value = mock.Mock(status_code=200, json=lambda: {
+            'country_code': 'DE',
+        })
+        # Not in the local database, geodude is asked.
+        eq_(geoip.lookup('3.3.3.3'), 'de')
+        assert mock_post.called
+
+    def test_local_database_no_url(self):
+        geoip = GeoIP(generate_settings(database=DATABASE))
+        eq_(geoip.lookup('200.1.2.3'), 'br')
+        eq_(geoip.lookup('3.3.3.3'), 'restofworld')
+
+
+class GeoIPDatabaseTest(mkt.site.tests.TestCase):
+
+    def setUp(self):
+        self.db = GeoIPDatabase(DATABASE)
+
+    def test_lookup(self):
+        eq_(self.db.lookup('1.0.0.0'), 'au')
+        eq_(self.db.lookup('1.0.0.255'), 'au')
+        eq_(self.db.lookup('1.1.1.1'), 'us')
+        eq_(self.db.lookup('2.2.100.1'), 'fr')
+        eq_(self.db.lookup('200.255.255.255'), 'br')
+
+    def test_lookup_unknown(self):
+        eq_(self.db.lookup('0.255.255.255'), None)
+        eq_(self.db.lookup('1.0.1.0'), None)
+        eq_(self.db.lookup('255.255.255.255'), None)
+
+    def test_lookup_invalid(self):
+        eq_(self.db.lookup('::1'), None)
+        eq_(self.db.lookup('1.1.1.256'), None)
+        eq_(self.db.lookup('1.1.1'), None)
+
+    def test_missing_file(self):
+        db = GeoIPDatabase('/does/not/exist.csv')
+        eq_(db.lookup('1.1.1.1'), None)
+
+    @mock.patch('lib.geoip.bisect_right', side_effect=bisect_right)
+    def test_cache(self, bisect_right):
+        db = GeoIPDatabase(DATABASE, cache_size=2)
+        eq_(db.lookup('1.1.1.1'), 'us')
+        eq_(db.lookup('1.1.1.1'), 'us')
+        eq_(bisect_right.call_count, 1)
+        db.lookup('1.1.1.2')
+        db.lookup('1.1.1.3')
+        # The first address was dropped from the cache.
+        db.lookup('1.1.1.1')
+        eq_(bisect_right.call_count, 4)
+
+    def test_reload(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'countries.csv')
+        shutil.copy(DATABASE, path)
+        db = GeoIPDatabase(path, check_interval=0, cache_size=10)
+        eq_(db.lookup('1.1.1.1'), 'us')
+
+        with open(path, 'w') as f:
+            f.write('1.1.1.0,1.1.1.255,CA\n')
+        os.utime(path, (0, 0))
+        eq_(db.lookup('1.1.1.1'), 'ca')
+        eq_(db.lookup('2.2.2.2'), None)
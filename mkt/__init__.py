@@ -12,7 +12,7 @@ from mkt.constants.submit import *  # noqa
 # This is used in multiple other files to access logging, do not remove.
 from mkt.site.log import (_LOG, LOG, LOG_BY_ID, LOG_ADMINS, LOG_EDITORS,  # noqa
                           LOG_HIDE_DEVELOPER, LOG_KEEP, LOG_REVIEW_QUEUE,
-                          LOG_REVIEW_EMAIL_USER, log)
+                          LOG_REVIEW_EMAIL_USER, log, log_buffer)
 
 _locals = threading.local()
 _locals.user = None
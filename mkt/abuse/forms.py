@@ -23,6 +23,7 @@ class BaseAbuseViewFormSet(BaseModelFormSet):
         self.request = kwargs.pop('request', None)
         super(BaseAbuseViewFormSet, self).__init__(*args, **kwargs)
 
+    @mkt.log_buffer()
     def save(self):
         for form in self.forms:
             if form.cleaned_data:
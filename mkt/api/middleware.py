@@ -22,7 +22,7 @@ from multidb.middleware import PinningRouterMiddleware
 from oauthlib.common import Request
 from oauthlib.oauth1.rfc5849 import signature
 
-from mkt.api.models import Access, ACCESS_TOKEN, Token
+from mkt.api.models import get_access_principal, get_token_principal
 from mkt.api.oauth import server, validator
 from mkt.carriers import get_carrier
 from mkt.users.models import UserProfile
@@ -84,11 +84,7 @@ class RestOAuthMiddleware(object):
                 log.warning(u'Cannot find APIAccess token with that key: %s'
                             % oauth_req.attempted_key)
                 return
-            uid = Token.objects.filter(
-                token_type=ACCESS_TOKEN,
-                key=oauth_req.resource_owner_key).values_list(
-                    'user_id', flat=True)[0]
-            request.user = UserProfile.objects.get(pk=uid)
+            principal = get_token_principal(oauth_req.resource_owner_key)
         else:
             # This is 2-legged OAuth.
             log.info('Trying 2 legged OAuth')
@@ -103,21 +99,20 @@ class RestOAuthMiddleware(object):
             except ValueError:
                 log.warning('ValueError on verifying_request', exc_info=True)
                 return
-            uid = Access.objects.filter(
-                key=client_key).values_list(
-                    'user_id', flat=True)[0]
-            request.user = UserProfile.objects.get(pk=uid)
+            principal = get_access_principal(client_key)
 
         # But you cannot have one of these roles.
         denied_groups = set(['Admins'])
-        roles = set(request.user.groups.values_list('name', flat=True))
+        roles = set(principal['groups'])
         if roles and roles.intersection(denied_groups):
             log.info(u'Attempt to use API with denied role, user: %s'
-                     % request.user.pk)
+                     % principal['user_id'])
             # Set request user back to Anonymous.
             request.user = AnonymousUser()
             return
 
+        request.user = UserProfile.objects.get(pk=principal['user_id'])
+
         if request.user.is_authenticated():
             request.authed_from.append('RestOAuth')
 
@@ -1,10 +1,16 @@
+import hashlib
 import time
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
+from django.dispatch import receiver
 from django.utils.crypto import get_random_string
+from django.utils.encoding import smart_str
 
 from aesfield.field import AESField
 
+from mkt.access.models import Group, GroupUser
 from mkt.site.models import ModelBase
 from mkt.users.models import UserProfile
 
@@ -72,3 +78,101 @@ class Nonce(ModelBase):
         db_table = 'oauth_nonce'
         unique_together = ('nonce', 'timestamp', 'client_key',
                            'request_token', 'access_token')
+
+
+def principal_key(kind, key):
+    digest = hashlib.md5(smart_str(key)).hexdigest()
+    return 'oauth:principal:%s:%s' % (kind, digest)
+
+
+def _get_principal(kind, key, compute):
+    """
+    Return the principal cached for API_OAUTH_PRINCIPAL_CACHE_TIMEOUT
+    seconds under `kind` and `key`, calling `compute()` on a miss. Unknown
+    keys are cached as an empty dict.
+    """
+    timeout = settings.API_OAUTH_PRINCIPAL_CACHE_TIMEOUT
+    if not timeout:
+        return compute()
+    cache_key = principal_key(kind, key)
+    principal = cache.get(cache_key)
+    if principal is None:
+        principal = compute()
+        cache.set(cache_key, principal, timeout)
+    return principal
+
+
+def _group_names(user_id):
+    return list(Group.objects.filter(users=user_id)
+                             .values_list('name', flat=True))
+
+
+def get_access_principal(key):
+    """
+    Return the `secret`, `user_id` and `groups` names of the Access with
+    that consumer key, or an empty dict if there is none.
+    """
+    def compute():
+        try:
+            access = Access.objects.get(key=key)
+        except Access.DoesNotExist:
+            return {}
+        # OAuthlib needs unicode objects, django-aesfield returns a string.
+        return {'secret': access.secret.decode('utf8'),
+                'user_id': access.user_id,
+                'groups': _group_names(access.user_id)}
+    return _get_principal('access', key, compute)
+
+
+def get_token_principal(key):
+    """
+    Return the `client_key`, `secret`, `user_id` and `groups` names of the
+    access Token with that key, or an empty dict if there is none.
+    """
+    def compute():
+        token = (Token.objects.filter(token_type=ACCESS_TOKEN, key=key)
+                              .select_related('creds').first())
+        if token is None:
+            return {}
+        return {'client_key': token.creds.key,
+                'secret': token.secret,
+                'user_id': token.user_id,
+                'groups': _group_names(token.user_id)}
+    return _get_principal('token', key, compute)
+
+
+def _forget_principals(keys):
+    # Drop the principals right away, for the rest of this request, and
+    # again once the transaction is committed: in between, another request
+    # could cache them as they were before the change.
+    from mkt.api.tasks import forget_principals
+    cache.delete_many(keys)
+    forget_principals.delay(keys)
+
+
+@receiver([models.signals.post_save, models.signals.post_delete],
+          sender=Access, dispatch_uid='forget_access_principal')
+def forget_access_principal(sender, instance, **kw):
+    _forget_principals([principal_key('access', instance.key)])
+
+
+@receiver([models.signals.post_save, models.signals.post_delete],
+          sender=Token, dispatch_uid='forget_token_principal')
+def forget_token_principal(sender, instance, **kw):
+    if instance.token_type == ACCESS_TOKEN:
+        _forget_principals([principal_key('token', instance.key)])
+
+
+@receiver([models.signals.post_save, models.signals.post_delete],
+          sender=GroupUser, dispatch_uid='forget_groupuser_principals')
+def forget_groupuser_principals(sender, instance, **kw):
+    """The cached principals of a user hold the names of their groups."""
+    access_keys = (Access.objects.filter(user=instance.user_id)
+                   .values_list('key', flat=True))
+    token_keys = (Token.objects.filter(token_type=ACCESS_TOKEN,
+                                       user=instance.user_id)
+                  .values_list('key', flat=True))
+    keys = ([principal_key('access', key) for key in access_keys] +
+            [principal_key('token', key) for key in token_keys])
+    if keys:
+        _forget_principals(keys)
@@ -9,7 +9,8 @@ from oauthlib import oauth1
 from oauthlib.common import safe_string_equals
 from jingo.helpers import urlparams
 
-from mkt.api.models import Access, Nonce, Token, REQUEST_TOKEN, ACCESS_TOKEN
+from mkt.api.models import (Access, get_access_principal, get_token_principal,
+                            Nonce, Token, REQUEST_TOKEN, ACCESS_TOKEN)
 from mkt.site.decorators import login_required
 from mkt.site.utils import render
 
@@ -40,17 +41,14 @@ class MarketplaceOAuthRequestValidator(oauth1.RequestValidator):
 
     def validate_client_key(self, key, request):
         request.attempted_key = key
-        return Access.objects.filter(key=key).exists()
+        return bool(get_access_principal(key))
 
     def get_client_secret(self, key, request):
         # This method returns a dummy secret on failure so that auth
         # success and failure take a codepath with the same run time,
-        # to prevent timing attacks.
-        try:
-            # OAuthlib needs unicode objects, django-aesfield returns a string.
-            return Access.objects.get(key=key).secret.decode('utf8')
-        except Access.DoesNotExist:
-            return DUMMY_SECRET
+        # to prevent timing attacks. Unknown keys are cached like the
+        # others.
+        return get_access_principal(key).get('secret', DUMMY_SECRET)
 
     @property
     def dummy_client(self):
@@ -97,9 +95,8 @@ class MarketplaceOAuthRequestValidator(oauth1.RequestValidator):
     def validate_access_token(self, client_key, access_token, request):
         # This method must take the same amount of time/db lookups for
         # success and failure to prevent timing attacks.
-        return Token.objects.filter(token_type=ACCESS_TOKEN,
-                                    creds__key=client_key,
-                                    key=access_token).exists()
+        principal = get_token_principal(access_token)
+        return principal.get('client_key') == client_key
 
     def validate_verifier(self, client_key, request_token, verifier, request):
         # This method must take the same amount of time/db lookups for
@@ -124,13 +121,10 @@ class MarketplaceOAuthRequestValidator(oauth1.RequestValidator):
     def get_access_token_secret(self, client_key, request_token, request):
         # This method must take the same amount of time/db lookups for
         # success and failure to prevent timing attacks.
-        try:
-            t = Token.objects.get(key=request_token, creds__key=client_key,
-                                  token_type=ACCESS_TOKEN)
-        except Token.DoesNotExist:
+        principal = get_token_principal(request_token)
+        if principal.get('client_key') != client_key:
             return DUMMY_SECRET
-
-        return t.secret
+        return principal['secret']
 
 
 validator = MarketplaceOAuthRequestValidator()
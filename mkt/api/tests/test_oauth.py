@@ -7,8 +7,10 @@ from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.core.urlresolvers import reverse
 from django.test.client import RequestFactory
+from django.test.utils import override_settings
 from django.utils.encoding import iri_to_uri, smart_str
 
+import mock
 from django_browserid.tests import mock_browserid
 from jingo.helpers import urlparams
 from nose.tools import eq_, ok_
@@ -16,9 +18,12 @@ from oauthlib import oauth1
 from pyquery import PyQuery as pq
 from rest_framework.request import Request
 
+from mkt.access.models import Group, GroupUser
 from mkt.api import authentication
 from mkt.api.middleware import RestOAuthMiddleware
-from mkt.api.models import Access, ACCESS_TOKEN, REQUEST_TOKEN, Token
+from mkt.api.models import (Access, ACCESS_TOKEN, get_access_principal,
+                            get_token_principal, principal_key, REQUEST_TOKEN,
+                            Token)
 from mkt.api.tests import BaseAPI
 from mkt.site.fixtures import fixture
 from mkt.site.helpers import absolutify
@@ -369,3 +374,81 @@ class Test2LeggedOAuthFlow(TestCase):
         RestOAuthMiddleware().process_request(req)
         ok_(not auth.authenticate(Request(req)))
         ok_(not req.user.is_authenticated())
+
+
+@override_settings(API_OAUTH_PRINCIPAL_CACHE_TIMEOUT=60)
+class TestOAuthPrincipals(TestCase):
+    fixtures = fixture('user_2519', 'user_999')
+
+    def setUp(self):
+        self.user = UserProfile.objects.get(pk=2519)
+        self.access = Access.objects.create(key='oauthClientKeyForTests',
+                                            secret='super secret',
+                                            user=self.user,
+                                            redirect_uri='https://foo.com',
+                                            app_name='Mkt Test App')
+        self.token = Token.generate_new(
+            ACCESS_TOKEN, creds=self.access,
+            user=UserProfile.objects.get(pk=999))
+
+    def test_access(self):
+        eq_(get_access_principal(self.access.key),
+            {'secret': u'super secret', 'user_id': 2519, 'groups': []})
+        with self.assertNumQueries(0):
+            get_access_principal(self.access.key)
+
+    def test_access_unknown(self):
+        eq_(get_access_principal('unknown'), {})
+        with self.assertNumQueries(0):
+            eq_(get_access_principal('unknown'), {})
+
+    def test_access_revoked(self):
+        get_access_principal(self.access.key)
+        self.access.delete()
+        eq_(get_access_principal(self.access.key), {})
+
+    def test_token(self):
+        eq_(get_token_principal(self.token.key),
+            {'client_key': self.access.key, 'secret': self.token.secret,
+             'user_id': 999, 'groups': []})
+        with self.assertNumQueries(0):
+            get_token_principal(self.token.key)
+
+    def test_token_revoked(self):
+        get_token_principal(self.token.key)
+        self.token.delete()
+        eq_(get_token_principal(self.token.key), {})
+
+    def test_groups_changed(self):
+        get_access_principal(self.access.key)
+        get_token_principal(self.token.key)
+        admins = Group.objects.create(name='Admins', rules='*:*')
+        GroupUser.objects.create(group=admins, user=self.user)
+        GroupUser.objects.create(group=admins, user_id=999)
+        eq_(get_access_principal(self.access.key)['groups'], ['Admins'])
+        eq_(get_token_principal(self.token.key)['groups'], ['Admins'])
+
+    @mock.patch('mkt.api.tasks.forget_principals.delay')
+    def test_forgotten_after_commit(self, delay):
+        self.token.delete()
+        delay.assert_called_with([principal_key('token', self.token.key)])
+        admins = Group.objects.create(name='Admins', rules='*:*')
+        GroupUser.objects.create(group=admins, user=self.user)
+        delay.assert_called_with([principal_key('access', self.access.key)])
+
+    def test_denied_group(self):
+        get_access_principal(self.access.key)
+        admins = Group.objects.create(name='Admins', rules='*:*')
+        GroupUser.objects.create(group=admins, user=self.user)
+        oa = oauth1.Client(signature_method=oauth1.SIGNATURE_HMAC,
+                           client_key=self.access.key,
+                           client_secret=self.access.secret)
+        url, headers, _ = oa.sign(absolutify(reverse('app-list')),
+                                  http_method='GET')
+        req = RequestFactory().get(
+            url, HTTP_HOST='testserver',
+            HTTP_AUTHORIZATION=headers['Authorization'])
+        req.API = True
+        req.user = AnonymousUser()
+        RestOAuthMiddleware().process_request(req)
+        ok_(not req.user.is_authenticated())
@@ -33,7 +33,7 @@ from mkt.api.models import Access
 from mkt.constants import CATEGORY_CHOICES, MAX_PACKAGED_APP_SIZE
 from mkt.developers.utils import prioritize_app
 from mkt.files.models import FileUpload
-from mkt.files.utils import SafeUnzip, WebAppParser
+from mkt.files.utils import SafeUnzip, SpooledUpload, WebAppParser
 from mkt.regions import REGIONS_CHOICES_SORTED_BY_NAME
 from mkt.regions.utils import parse_region
 from mkt.reviewers.models import RereviewQueue
@@ -367,10 +367,12 @@ class NewPackagedAppForm(happyforms.Form):
             # which would read the file.
             raise self.persist_errors(errors, upload)
 
+        # Check the local copy, so that nothing is written to storage before
+        # the archive is known to be safe.
+        spool = SpooledUpload(upload, suffix='.zip')
         manifest = None
         try:
-            # Be careful to keep this as in-memory zip reading.
-            safe_zip = SafeUnzip(upload, 'r')
+            safe_zip = SafeUnzip(spool.path, 'r')
             safe_zip.is_valid()  # Will throw ValidationError if necessary.
             manifest = safe_zip.extract_path('manifest.webapp')
         except forms.ValidationError as e:
@@ -410,11 +412,12 @@ class NewPackagedAppForm(happyforms.Form):
                 })
 
         if errors:
+            spool.delete()
             raise self.persist_errors(errors, upload)
 
         # Everything passed validation.
         self.file_upload = FileUpload.from_post(
-            upload, upload.name, upload.size, user=self.user)
+            upload, upload.name, upload.size, spool=spool, user=self.user)
 
     def persist_errors(self, errors, upload):
         """
@@ -1,6 +1,7 @@
 import json
 import string
 import uuid
+from collections import defaultdict
 from copy import copy
 from datetime import datetime
 
@@ -255,6 +256,10 @@ class GroupLog(ModelBase):
 
 class ActivityLogManager(ManagerBase):
 
+    def get_queryset(self):
+        qs = super(ActivityLogManager, self).get_queryset()
+        return qs.transform(ActivityLog.transformer)
+
     def for_apps(self, apps):
         vals = (AppLog.objects.filter(addon__in=apps)
                 .values_list('activity_log', flat=True))
@@ -362,31 +367,58 @@ class ActivityLog(ModelBase):
 
     @property
     def arguments(self):
+        if '_resolved_arguments' not in self.__dict__:
+            ActivityLog.transformer([self])
+        return self._resolved_arguments
 
+    def _decode_arguments(self):
         try:
             # d is a structure:
             # ``d = [{'addons.addon':12}, {'addons.addon':1}, ... ]``
-            d = json.loads(self._arguments)
+            return json.loads(self._arguments)
         except:
             log.debug('unserializing data from addon_log failed: %s' % self.id)
             return None
 
-        objs = []
-        for item in d:
-            # item has only one element.
-            model_name, pk = item.items()[0]
-            if model_name in ('str', 'int', 'null'):
-                objs.append(pk)
+    @staticmethod
+    def transformer(logs):
+        """
+        Attach the arguments of all the logs, loading the objects of each
+        model they reference in one query.
+        """
+        decoded = [al._decode_arguments() for al in logs]
+
+        pks = defaultdict(set)
+        for d in decoded:
+            for item in d or []:
+                # item has only one element.
+                model_name, pk = item.items()[0]
+                if model_name not in ('str', 'int', 'null'):
+                    pks[model_name].add(pk)
+
+        objs = {}
+        for model_name, ids in pks.items():
+            (app_label, name) = model_name.split('.')
+            model = apps.get_model(app_label, name)
+            # Cope with soft deleted models.
+            if hasattr(model, 'with_deleted'):
+                qs = model.with_deleted.filter(pk__in=ids)
             else:
-                (app_label, model_name) = model_name.split('.')
-                model = apps.get_model(app_label, model_name)
-                # Cope with soft deleted models.
-                if hasattr(model, 'with_deleted'):
-                    objs.extend(model.with_deleted.filter(pk=pk))
-                else:
-                    objs.extend(model.objects.filter(pk=pk))
-
-        return objs
+                qs = model.objects.filter(pk__in=ids)
+            for obj in qs:
+                objs[(model_name, obj.pk)] = obj
+
+        for al, d in zip(logs, decoded):
+            if d is None:
+                al._resolved_arguments = None
+                continue
+            al._resolved_arguments = []
+            for item in d:
+                model_name, pk = item.items()[0]
+                if model_name in ('str', 'int', 'null'):
+                    al._resolved_arguments.append(pk)
+                elif (model_name, pk) in objs:
+                    al._resolved_arguments.append(objs[(model_name, pk)])
 
     @arguments.setter
     def arguments(self, args=[]):
@@ -415,6 +447,7 @@ class ActivityLog(ModelBase):
                 serialize_me.append(dict(((unicode(arg._meta), arg.pk),)))
 
         self._arguments = json.dumps(serialize_me)
+        self.__dict__.pop('_resolved_arguments', None)
 
     @property
     def details(self):
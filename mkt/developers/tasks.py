@@ -33,7 +33,7 @@ from mkt.site.helpers import absolutify
 from mkt.site.mail import send_mail_jinja
 from mkt.site.storage_utils import (copy_stored_file, local_storage,
                                     private_storage, public_storage)
-from mkt.site.utils import (remove_icons, remove_promo_imgs, resize_image,
+from mkt.site.utils import (remove_icons, remove_promo_imgs, resize_images,
                             strip_bom)
 from mkt.webapps.models import AddonExcludedRegion, Preview, Webapp
 
@@ -49,6 +49,13 @@ REQUESTS_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Mobile; rv:18.0) Gecko/18.0 Firefox/18.0'
 }
 
+# (name, response header, conditional request header) of the validators a
+# server can give us to avoid downloading an unchanged manifest again.
+CONDITIONAL_HEADERS = (
+    ('etag', 'ETag', 'If-None-Match'),
+    ('last_modified', 'Last-Modified', 'If-Modified-Since'),
+)
+
 
 @task
 @use_master
@@ -63,7 +70,8 @@ def validator(upload_id, **kw):
         return
 
     try:
-        validation_result = run_validator(upload.path, url=kw.get('url'))
+        validation_result = run_validator(upload.path, url=kw.get('url'),
+                                          local_path=upload.local_path)
         if upload.validation:
             # If there's any preliminary validation result, merge it with the
             # actual validation result.
@@ -93,6 +101,10 @@ def validator(upload_id, **kw):
         # Don't raise if we're being eager, setting the error is enough.
         if not settings.CELERY_ALWAYS_EAGER:
             raise
+    finally:
+        # Nothing needs the local copy of the upload after validation.
+        if upload.local_path and os.path.exists(upload.local_path):
+            os.remove(upload.local_path)
 
 
 @task
@@ -112,37 +124,47 @@ def file_validator(file_id, **kw):
     return FileValidation.from_json(file, result)
 
 
-def run_validator(file_path, url=None):
-    """A pre-configured wrapper around the app validator."""
+def run_validator(file_path, url=None, local_path=None):
+    """
+    A pre-configured wrapper around the app validator.
+
+    `local_path` is a local copy of the file that can be used instead of
+    fetching it from storage, if it exists on this machine.
+    """
 
     temp_path = None
-    # Make a copy of the file since we can't assume the
-    # uploaded file is on the local filesystem.
-    temp_path = tempfile.mktemp()
-    copy_stored_file(
-        file_path, temp_path,
-        src_storage=private_storage, dst_storage=local_storage)
-
-    with statsd.timer('mkt.developers.validator'):
-        is_packaged = zipfile.is_zipfile(temp_path)
-        if is_packaged:
-            log.info(u'Running `validate_packaged_app` for path: %s'
-                     % (file_path))
-            with statsd.timer('mkt.developers.validate_packaged_app'):
-                return validate_packaged_app(
-                    temp_path,
-                    market_urls=settings.VALIDATOR_IAF_URLS,
-                    timeout=settings.VALIDATOR_TIMEOUT,
-                    spidermonkey=settings.SPIDERMONKEY)
-        else:
-            log.info(u'Running `validate_app` for path: %s' % (file_path))
-            with statsd.timer('mkt.developers.validate_app'):
-                return validate_app(open(temp_path).read(),
-                                    market_urls=settings.VALIDATOR_IAF_URLS,
-                                    url=url)
+    if local_path and os.path.exists(local_path):
+        path = local_path
+    else:
+        # Make a copy of the file since we can't assume the
+        # uploaded file is on the local filesystem.
+        path = temp_path = tempfile.mktemp()
+        copy_stored_file(
+            file_path, temp_path,
+            src_storage=private_storage, dst_storage=local_storage)
 
-    # Clean up copied files.
-    os.unlink(temp_path)
+    try:
+        with statsd.timer('mkt.developers.validator'):
+            is_packaged = zipfile.is_zipfile(path)
+            if is_packaged:
+                log.info(u'Running `validate_packaged_app` for path: %s'
+                         % (file_path))
+                with statsd.timer('mkt.developers.validate_packaged_app'):
+                    return validate_packaged_app(
+                        path,
+                        market_urls=settings.VALIDATOR_IAF_URLS,
+                        timeout=settings.VALIDATOR_TIMEOUT,
+                        spidermonkey=settings.SPIDERMONKEY)
+            else:
+                log.info(u'Running `validate_app` for path: %s' % (file_path))
+                with statsd.timer('mkt.developers.validate_app'):
+                    return validate_app(
+                        open(path).read(),
+                        market_urls=settings.VALIDATOR_IAF_URLS, url=url)
+    finally:
+        # Clean up copied files.
+        if temp_path:
+            os.unlink(temp_path)
 
 
 def _hash_file(fd):
@@ -158,13 +180,12 @@ def resize_icon(src, dst, sizes, src_storage=private_storage,
     log.info('[1@None] Resizing icon: %s' % dst)
 
     try:
-        for s in sizes:
-            size_dst = '%s-%s.png' % (dst, s)
-            resize_image(src, size_dst, (s, s), remove_src=False,
-                         src_storage=src_storage, dst_storage=dst_storage)
-            pngcrush_image.delay(size_dst, storage=dst_storage, **kw)
-        with src_storage.open(src) as fd:
+        with src_storage.open(src, 'rb') as fd:
             icon_hash = _hash_file(fd)
+            fd.seek(0)
+            resize_images(fd, [('%s-%s.png' % (dst, s), (s, s))
+                               for s in sizes],
+                          dst_storage=dst_storage, optimize=pngcrush_files)
         src_storage.delete(src)
 
         log.info('Icon resizing completed for: %s' % dst)
@@ -180,14 +201,13 @@ def resize_promo_imgs(src, dst, sizes, **kw):
     """Resizes webapp/website promo imgs."""
     log.info('[1@None] Resizing promo imgs: %s' % dst)
     try:
-        for s in sizes:
-            size_dst = '%s-%s.png' % (dst, s)
-            # Crop only to the width, keeping the aspect ratio.
-            resize_image(src, size_dst, (s, 0), remove_src=False)
-            pngcrush_image.delay(size_dst, **kw)
-
-        with private_storage.open(src) as fd:
+        with private_storage.open(src, 'rb') as fd:
             promo_img_hash = _hash_file(fd)
+            fd.seek(0)
+            # Crop only to the width, keeping the aspect ratio.
+            resize_images(fd, [('%s-%s.png' % (dst, s), (s, 0))
+                               for s in sizes],
+                          optimize=pngcrush_files)
         private_storage.delete(src)
 
         log.info('Promo img hash resizing completed for: %s' % dst)
@@ -196,6 +216,34 @@ def resize_promo_imgs(src, dst, sizes, **kw):
         log.error("Error resizing promo img hash: %s; %s" % (e, dst))
 
 
+def pngcrush_files(paths):
+    """
+    Optimizes local PNG files in place, running Pngcrush on all of them at
+    the same time. Files that can't be optimized are left untouched.
+    """
+    # pngcrush -ow has some issues, use temporary files and do the final
+    # renaming ourselves.
+    suffix = '.opti.png'
+    processes = []
+    for path in paths:
+        cmd = [settings.PNGCRUSH_BIN, '-q', '-rem', 'alla', '-brute',
+               '-reduce', '-e', suffix, path]
+        try:
+            processes.append((path, subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE)))
+        except OSError, e:
+            log.error('Error optimizing image: %s; %s' % (path, e))
+
+    for path, sp in processes:
+        stdout, stderr = sp.communicate()
+        if sp.returncode != 0:
+            log.error('Error optimizing image: %s; %s'
+                      % (path, stderr.strip()))
+            continue
+        os.rename('%s%s' % (os.path.splitext(path)[0], suffix), path)
+
+
 @task
 @use_master
 @set_modified_on
@@ -260,21 +308,22 @@ def resize_preview(src, pk, **kw):
         image_size = APP_PREVIEW_SIZES[1][:2]
         with private_storage.open(src, 'rb') as fp:
             size = Image.open(fp).size
-        if size[0] > size[1]:
-            # If the image is wider than tall, then reverse the wanted size
-            # to keep the original aspect ratio while still resizing to
-            # the correct dimensions.
-            thumbnail_size = thumbnail_size[::-1]
-            image_size = image_size[::-1]
-
-        if kw.get('generate_thumbnail', True):
-            sizes['thumbnail'] = resize_image(src, thumb_dst,
-                                              thumbnail_size,
-                                              remove_src=False)
-        if kw.get('generate_image', True):
-            sizes['image'] = resize_image(src, full_dst,
-                                          image_size,
-                                          remove_src=False)
+            if size[0] > size[1]:
+                # If the image is wider than tall, then reverse the wanted
+                # size to keep the original aspect ratio while still resizing
+                # to the correct dimensions.
+                thumbnail_size = thumbnail_size[::-1]
+                image_size = image_size[::-1]
+
+            names, dsts = [], []
+            if kw.get('generate_thumbnail', True):
+                names.append('thumbnail')
+                dsts.append((thumb_dst, thumbnail_size))
+            if kw.get('generate_image', True):
+                names.append('image')
+                dsts.append((full_dst, image_size))
+            fp.seek(0)
+            sizes.update(zip(names, resize_images(fp, dsts)))
         instance.sizes = sizes
         instance.save()
         log.info('Preview resized to: %s' % thumb_dst)
@@ -288,11 +337,21 @@ def resize_preview(src, pk, **kw):
         log.error("Error saving preview: %s; %s" % (e, thumb_dst))
 
 
-def _fetch_content(url):
+class ContentNotModified(Exception):
+    """Raised when a conditional request is answered with a 304."""
+    pass
+
+
+def _fetch_content(url, headers=None):
     with statsd.timer('developers.tasks.fetch_content'):
         try:
             res = requests.get(url, timeout=30, stream=True,
-                               headers=REQUESTS_HEADERS)
+                               headers=dict(REQUESTS_HEADERS,
+                                            **(headers or {})))
+
+            if headers and res.status_code == 304:
+                statsd.incr('developers.tasks.fetch_content.not_modified')
+                raise ContentNotModified()
 
             if not 200 <= res.status_code < 300:
                 statsd.incr('developers.tasks.fetch_content.error')
@@ -458,7 +517,15 @@ def failed_validation(*messages, **kwargs):
                        'prelim': True})
 
 
-def _fetch_manifest(url, upload=None):
+def _fetch_manifest(url, upload=None, validators=None):
+    """
+    Fetch the manifest at `url` and return its content.
+
+    If `validators` is given, it's a dict of the validators (see
+    CONDITIONAL_HEADERS) of a copy we already have: the request is made
+    conditional, ContentNotModified is raised if that copy is still current,
+    and otherwise the dict is updated with the validators of the new content.
+    """
     def fail(message, upload=None):
         if upload is None:
             # If `upload` is None, that means we're using one of @washort's old
@@ -466,8 +533,15 @@ def _fetch_manifest(url, upload=None):
             raise Exception(message)
         upload.update(validation=failed_validation(message, upload=upload))
 
+    headers = {}
+    for name, response_header, request_header in CONDITIONAL_HEADERS:
+        if validators and validators.get(name):
+            headers[request_header] = validators[name]
+
     try:
-        response = _fetch_content(url)
+        response = _fetch_content(url, headers=headers)
+    except ContentNotModified:
+        raise
     except Exception, e:
         log.error('Failed to fetch manifest from %r: %s' % (url, e))
         fail(_('No manifest was found at that URL. Check the address and try '
@@ -508,6 +582,12 @@ def _fetch_manifest(url, upload=None):
                    'provided in the HTTP Content-Type.'),
                  upload=upload)
 
+    if validators is not None:
+        validators.clear()
+        for name, response_header, request_header in CONDITIONAL_HEADERS:
+            if response.headers.get(response_header):
+                validators[name] = response.headers[response_header]
+
     content = strip_bom(content)
     return content
 
@@ -303,6 +303,20 @@ class TestPackagedAppForm(mkt.site.tests.MktPaths,
         assert form.is_valid(), form.errors
         assert form.file_upload
 
+    def test_local_copy(self):
+        form = forms.NewPackagedAppForm({}, self.files)
+        assert form.is_valid(), form.errors
+        upload = form.file_upload
+        eq_(open(upload.local_path).read(),
+            private_storage.open(upload.path).read())
+
+    @mock.patch('mkt.files.models.copy_stored_file')
+    def test_invalid_zip_not_stored(self, copy_stored_file_):
+        self.files = {'upload': SimpleUploadedFile('mozball.zip', 'nope')}
+        form = forms.NewPackagedAppForm({}, self.files)
+        assert not form.is_valid()
+        assert not copy_stored_file_.called
+
     def test_too_big(self):
         form = forms.NewPackagedAppForm({}, self.files, max_size=5)
         assert not form.is_valid()
@@ -82,6 +82,44 @@ class TestActivityLogCount(mkt.site.tests.TestCase):
         eq_(len(ActivityLog.objects.for_developer()), 1)
 
 
+class TestActivityLogArguments(mkt.site.tests.TestCase):
+    fixtures = fixture('webapp_337141', 'user_2519')
+
+    def setUp(self):
+        self.app = Webapp.objects.get()
+        self.user = UserProfile.objects.filter()[0]
+        mkt.set_user(self.user)
+
+    def test_arguments(self):
+        mkt.log(mkt.LOG['EDIT_VERSION'], self.app, self.app.current_version)
+        eq_(ActivityLog.objects.get().arguments,
+            [self.app, self.app.current_version])
+
+    def test_arguments_loaded_with_logs(self):
+        for x in range(0, 3):
+            mkt.log(mkt.LOG['EDIT_VERSION'], self.app,
+                    self.app.current_version)
+        logs = list(ActivityLog.objects.all())
+        with self.assertNumQueries(0):
+            for log in logs:
+                eq_(log.arguments, [self.app, self.app.current_version])
+
+    def test_arguments_deleted(self):
+        mkt.log(mkt.LOG['EDIT_VERSION'], self.app)
+        self.app.delete()
+        log = ActivityLog.objects.get(action=mkt.LOG['EDIT_VERSION'].id)
+        eq_(log.arguments, [self.app])
+
+    def test_arguments_missing(self):
+        mkt.log(mkt.LOG['EDIT_VERSION'], (Webapp, 12345), 'foo')
+        eq_(ActivityLog.objects.get().arguments, ['foo'])
+
+    def test_arguments_garbage(self):
+        log = mkt.log(mkt.LOG['EDIT_VERSION'], self.app)
+        log.update(_arguments='garbage')
+        eq_(ActivityLog.objects.get().arguments, None)
+
+
 @override_settings(DEFAULT_PAYMENT_PROVIDER='bango',
                    PAYMENT_PROVIDERS=['bango'])
 class TestPaymentAccount(Patcher, mkt.site.tests.TestCase):
@@ -220,6 +220,45 @@ class TestPngcrushImage(mkt.site.tests.TestCase):
         ok_('modified' in update_mock.call_args_list[-1][1])
 
 
+class TestPngcrushFiles(mkt.site.tests.TestCase):
+
+    @mock.patch('mkt.developers.tasks.subprocess.Popen')
+    def test_runs_at_once(self, popen_mock):
+        popen_mock.return_value.returncode = 1
+        popen_mock.return_value.communicate.return_value = ('', 'error')
+        tasks.pngcrush_files(['/tmp/a.png', '/tmp/b.png'])
+        # Every Pngcrush process is started before any is waited on.
+        eq_([name for name, args, kw in popen_mock.mock_calls],
+            ['', '', '().communicate', '().communicate'])
+
+    def test_optimize_in_place(self):
+        path = tempfile.mkstemp(suffix='.png')[1]
+        opti_path = os.path.splitext(path)[0] + '.opti.png'
+        try:
+            with open(opti_path, 'w') as fp:
+                fp.write('optimized')
+            with mock.patch('mkt.developers.tasks.subprocess.Popen') as popen:
+                popen.return_value = mock.Mock(
+                    returncode=0, communicate=lambda: ('', ''))
+                tasks.pngcrush_files([path])
+            eq_(open(path).read(), 'optimized')
+            ok_(not os.path.exists(opti_path))
+        finally:
+            os.remove(path)
+
+    def test_failure_left_untouched(self):
+        path = tempfile.mkstemp(suffix='.png')[1]
+        try:
+            with open(path, 'w') as fp:
+                fp.write('original')
+            with mock.patch('mkt.developers.tasks.subprocess.Popen') as popen:
+                popen.side_effect = OSError('No pngcrush')
+                tasks.pngcrush_files([path])
+            eq_(open(path).read(), 'original')
+        finally:
+            os.remove(path)
+
+
 class TestValidator(mkt.site.tests.TestCase):
 
     def setUp(self):
@@ -251,6 +290,23 @@ class TestValidator(mkt.site.tests.TestCase):
         assert error is not None
         assert error.startswith('Traceback (most recent call last)'), error
 
+    @mock.patch('mkt.developers.tasks.validate_app')
+    @mock.patch('mkt.developers.tasks.copy_stored_file')
+    def test_validate_local_copy(self, copy_stored_file_, validate_app_):
+        validate_app_.return_value = '{"errors": 0}'
+        tasks.validator(self.upload.pk)
+        eq_(validate_app_.call_args[0][0], 'test data')
+        assert not copy_stored_file_.called
+        # The local copy isn't needed anymore.
+        assert not os.path.exists(self.upload.local_path)
+
+    @mock.patch('mkt.developers.tasks.validate_app')
+    def test_validate_without_local_copy(self, validate_app_):
+        os.remove(self.upload.local_path)
+        validate_app_.return_value = '{"errors": 0}'
+        tasks.validator(self.upload.pk)
+        eq_(validate_app_.call_args[0][0], 'test data')
+
     @mock.patch('mkt.developers.tasks.validate_app')
     @mock.patch('mkt.developers.tasks.private_storage.open')
     def test_validate_manifest(self, _open, _mock):
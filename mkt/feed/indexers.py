@@ -5,6 +5,7 @@ feed homepage and curation tool search.
 import mkt.carriers
 import mkt.feed.constants as feed
 import mkt.regions
+from mkt.feed.utils import invalidate_feed_cache
 from mkt.search.indexers import BaseIndexer
 from mkt.translations.models import attach_trans_dict
 from mkt.webapps.models import Webapp
@@ -21,7 +22,40 @@ def get_slug_multifield():
     }
 
 
-class FeedAppIndexer(BaseIndexer):
+class BaseFeedIndexer(BaseIndexer):
+    """
+    Drops the cached feed responses whenever feed documents change, once the
+    new documents are searchable so that the feed isn't cached again from
+    the old ones, and then builds the most requested ones again.
+    """
+
+    @classmethod
+    def bulk_index(cls, documents, es=None, index=None, indices=None, **kw):
+        try:
+            super(BaseFeedIndexer, cls).bulk_index(
+                documents, es=es, index=index, indices=indices, **kw)
+        finally:
+            cls.feed_changed(es=es, index=indices or index)
+
+    @classmethod
+    def unindex(cls, id_, es=None, index=None):
+        super(BaseFeedIndexer, cls).unindex(id_, es=es, index=index)
+        cls.feed_changed(es=es, index=index)
+
+    @classmethod
+    def feed_changed(cls, es=None, index=None):
+        from mkt.feed.tasks import warm_feed_cache
+        try:
+            # Elasticsearch only makes the changes searchable on the next
+            # refresh, until then the feed would be built from the old
+            # documents.
+            cls.refresh_index(es=es, index=index)
+        finally:
+            invalidate_feed_cache()
+            warm_feed_cache.delay()
+
+
+class FeedAppIndexer(BaseFeedIndexer):
     @classmethod
     def get_model(cls):
         """Returns the Django model this MappingType relates to"""
@@ -96,7 +130,7 @@ class FeedAppIndexer(BaseIndexer):
         return doc
 
 
-class FeedBrandIndexer(BaseIndexer):
+class FeedBrandIndexer(BaseFeedIndexer):
     @classmethod
     def get_model(cls):
         from mkt.feed.models import FeedBrand
@@ -136,7 +170,7 @@ class FeedBrandIndexer(BaseIndexer):
         }
 
 
-class FeedCollectionIndexer(BaseIndexer):
+class FeedCollectionIndexer(BaseFeedIndexer):
     @classmethod
     def get_model(cls):
         from mkt.feed.models import FeedCollection
@@ -215,7 +249,7 @@ class FeedCollectionIndexer(BaseIndexer):
         return doc
 
 
-class FeedShelfIndexer(BaseIndexer):
+class FeedShelfIndexer(BaseFeedIndexer):
     @classmethod
     def get_model(cls):
         from mkt.feed.models import FeedShelf
@@ -293,7 +327,7 @@ class FeedShelfIndexer(BaseIndexer):
         return doc
 
 
-class FeedItemIndexer(BaseIndexer):
+class FeedItemIndexer(BaseFeedIndexer):
 
     chunk_size = 1000
 
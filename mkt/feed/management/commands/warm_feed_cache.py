@@ -0,0 +1,36 @@
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from mkt.feed.tasks import warm_feed_cache
+
+
+class Command(BaseCommand):
+    """
+    Usage:
+
+        python manage.py warm_feed_cache --dev=firefoxos --lang=en-US
+
+    The feed indexers already warm the cache for firefoxos in the default
+    language whenever feed documents are indexed, use this for the others.
+    """
+    help = ('Build and cache the feed for every region, and every region and '
+            'carrier pair, that has feed items')
+    option_list = BaseCommand.option_list + (
+        make_option('--dev', default='firefoxos',
+                    help='Platform to build the feed for.'),
+        make_option('--device', default=None,
+                    help='Device type to build the feed for.'),
+        make_option('--lang', default=settings.LANGUAGE_CODE,
+                    help='Language to build the feed in.'),
+    )
+
+    def handle(self, *args, **kw):
+        if not settings.FEED_CACHE_TIMEOUT:
+            raise CommandError('The feed cache is disabled.')
+
+        for region, carrier, status in warm_feed_cache(
+                dev=kw['dev'], device=kw['device'], lang=kw['lang']):
+            self.stdout.write('{region} {carrier}: {status}'.format(
+                region=region, carrier=carrier or '-', status=status))
@@ -1,8 +1,17 @@
 import logging
 
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.urlresolvers import reverse
+from django.test.client import RequestFactory
+from django.utils import translation
+
 from post_request_task.task import task
 
-from mkt.feed.models import FeedApp, FeedCollection
+import mkt
+from mkt.constants.carriers import CARRIER_CHOICE_DICT
+from mkt.constants.regions import REGIONS_CHOICES_ID_DICT
+from mkt.feed.models import FeedApp, FeedCollection, FeedItem
 
 log = logging.getLogger('z.feed')
 
@@ -31,3 +40,50 @@ def _migrate_collection_colors(ids, model):
             obj.update(color=color)
             log.info('Migrated %s:%s from %s to %s' %
                      (model, unicode(obj.id), obj.background_color, color))
+
+
+@task
+def warm_feed_cache(dev='firefoxos', device=None, lang=None, **kw):
+    """
+    Build and cache the feed for rest of world and for every region, and
+    every region and carrier pair, that has feed items.
+
+    Returns the region slug, carrier slug and response status of each.
+    """
+    if not settings.FEED_CACHE_TIMEOUT:
+        return []
+    # Circular import, the views import the indexers.
+    from mkt.feed.views import FeedView
+
+    lang = lang or settings.LANGUAGE_CODE
+    pairs = set([(mkt.regions.RESTOFWORLD.id, None)])
+    for region, carrier in (FeedItem.objects.values_list('region', 'carrier')
+                                            .distinct()):
+        if region in REGIONS_CHOICES_ID_DICT:
+            pairs.add((region, None))
+            if carrier in CARRIER_CHOICE_DICT:
+                pairs.add((region, carrier))
+
+    results = []
+    view = FeedView.as_view()
+    with translation.override(lang):
+        for region, carrier in sorted(pairs):
+            params = {'dev': dev, 'lang': lang,
+                      'region': REGIONS_CHOICES_ID_DICT[region].slug}
+            if device:
+                params['device'] = device
+            if carrier:
+                params['carrier'] = CARRIER_CHOICE_DICT[carrier].slug
+
+            request = RequestFactory().get(reverse('api-v2:feed.get'), params)
+            request.user = AnonymousUser()
+            request.API = True
+            request.API_VERSION = 2
+            request.REGION = REGIONS_CHOICES_ID_DICT[region]
+            mkt.regions.set_region(request.REGION)
+            res = view(request)
+            results.append((params['region'], params.get('carrier'),
+                            res.status_code))
+    log.info('Warmed the feed cache for %s regions and carriers'
+             % len(results))
+    return results
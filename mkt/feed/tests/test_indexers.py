@@ -1,4 +1,5 @@
-from nose.tools import eq_
+import mock
+from nose.tools import eq_, ok_
 
 import mkt.site.tests
 
@@ -19,6 +20,29 @@ class BaseFeedIndexerTest(object):
     def test_get_mapping_ok(self):
         assert isinstance(self.indexer.get_mapping(), dict)
 
+    @mock.patch('mkt.feed.tasks.warm_feed_cache.delay')
+    @mock.patch('mkt.feed.indexers.invalidate_feed_cache')
+    @mock.patch('mkt.search.indexers.helpers.bulk')
+    def test_bulk_index_refreshes_then_invalidates(self, bulk, invalidate,
+                                                   warm):
+        bulk.return_value = (1, [])
+        es = mock.Mock()
+        es.indices.refresh.side_effect = lambda **kw: ok_(
+            not invalidate.called)
+        self.indexer.bulk_index([self._get_doc()], es=es, indices=['a', 'b'])
+        es.indices.refresh.assert_called_with(index=['a', 'b'])
+        ok_(invalidate.called)
+        ok_(warm.called)
+
+    @mock.patch('mkt.feed.tasks.warm_feed_cache.delay')
+    @mock.patch('mkt.feed.indexers.invalidate_feed_cache')
+    def test_unindex_refreshes_then_invalidates(self, invalidate, warm):
+        es = mock.Mock()
+        self.indexer.unindex(self.obj.pk, es=es, index='a')
+        es.indices.refresh.assert_called_with(index='a')
+        ok_(invalidate.called)
+        ok_(warm.called)
+
     def _get_doc(self):
         return self.indexer.extract_document(self.obj.pk, self.obj)
 
@@ -3,6 +3,7 @@ import json
 import os
 
 from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
 from django.utils.text import slugify
 
 import mock
@@ -10,6 +11,7 @@ from elasticsearch_dsl.search import Search
 from mpconstants import collection_colors as coll_colors
 from nose.tools import eq_, ok_
 from post_request_task import task as post_request_task
+from rest_framework.response import Response
 
 import mkt
 import mkt.carriers
@@ -19,6 +21,7 @@ from mkt.api.tests.test_oauth import RestOAuth
 from mkt.constants import applications
 from mkt.feed.models import (FeedApp, FeedBrand, FeedCollection, FeedItem,
                              FeedShelf)
+from mkt.feed.tasks import warm_feed_cache
 from mkt.feed.tests.test_models import FeedAppMixin, FeedTestMixin
 from mkt.feed.views import FeedView
 from mkt.fireplace.tests.test_views import assert_fireplace_app
@@ -1457,6 +1460,46 @@ class TestFeedView(BaseTestFeedESView, BaseTestFeedItemViewSet):
         res2, data2 = self._get()
         ok_(data1['websites'] != data2['websites'])
 
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    def test_cached(self):
+        self.feed_factory()
+        res1, data1 = self._get()
+        with mock.patch.object(FeedView, '_get') as _get:
+            res2, data2 = self._get()
+        ok_(not _get.called)
+        eq_(res2.status_code, 200)
+        eq_(data1, data2)
+
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    def test_cached_per_carrier(self):
+        self.feed_factory()
+        self._get()
+        with mock.patch.object(FeedView, '_get') as _get:
+            _get.return_value = Response(status=404)
+            self._get(carrier='sprint')
+        ok_(_get.called)
+
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    def test_warm_feed_cache(self):
+        self.feed_factory()
+        self._refresh()
+        ok_(('restofworld', None, 200) in warm_feed_cache())
+        with mock.patch.object(FeedView, '_get') as _get:
+            res = self.anon.get(self.url, {'dev': 'firefoxos',
+                                           'lang': 'en-US',
+                                           'region': 'restofworld'})
+        ok_(not _get.called)
+        eq_(res.status_code, 200)
+
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    def test_cache_invalidated_when_indexing(self):
+        self.feed_factory()
+        res1, data1 = self._get()
+        self.feed_item_factory()
+        self._refresh()
+        res2, data2 = self._get()
+        eq_(len(data2['objects']), len(data1['objects']) + 1)
+
     @mock.patch('mkt.api.paginator.CustomPagination.get_limit')
     def test_limit_honored(self, get_limit):
         PAGINATE_BY = 3
@@ -0,0 +1,28 @@
+import hashlib
+
+from django.utils import translation
+
+from mkt.site.utils import cache_ns_key
+
+
+# The query parameters the feed response depends on, besides the region.
+FEED_CACHE_PARAMS = ('carrier', 'dev', 'device', 'filtering', 'limit',
+                     'offset', 'pro')
+
+
+def feed_cache_key(request, seed):
+    """
+    Return the cache key of the feed response for this request.
+
+    `seed` is the daily seed the featured websites are picked with, so that
+    the cached responses don't outlive it.
+    """
+    params = [request.REGION.slug, translation.get_language(), seed]
+    params += [request.GET.get(param) for param in FEED_CACHE_PARAMS]
+    return 'feed:%s:%s' % (cache_ns_key('feed'),
+                           hashlib.md5(repr(params)).hexdigest())
+
+
+def invalidate_feed_cache():
+    """Make every cached feed response stale at once."""
+    cache_ns_key('feed', increment=True)
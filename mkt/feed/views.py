@@ -1,6 +1,7 @@
 import StringIO
 from datetime import datetime
 import hashlib
+import json
 import uuid
 
 import requests
@@ -11,6 +12,7 @@ from django.utils.translation import ugettext as _
 
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.base import File
 from django.db.models import Q
 from django.db.transaction import non_atomic_requests
@@ -39,6 +41,7 @@ from mkt.api.authentication import (RestAnonymousAuthentication,
                                     RestSharedSecretAuthentication)
 from mkt.api.base import CORSMixin, MarketplaceView, SlugOrIdMixin
 from mkt.api.permissions import AllowReadOnly, AnyOf, GroupPermission
+from mkt.api.renderers import SuccinctJSONRenderer
 from mkt.constants.carriers import CARRIER_MAP
 from mkt.constants.regions import REGIONS_DICT
 from mkt.developers.tasks import pngcrush_image
@@ -46,6 +49,7 @@ from mkt.feed.indexers import FeedItemIndexer
 from mkt.operators.models import OperatorPermission
 from mkt.search.filters import (DeviceTypeFilter, ProfileFilter,
                                 PublicContentFilter, RegionFilter)
+from mkt.search.utils import BackgroundSearch
 from mkt.site.storage_utils import public_storage
 from mkt.site.utils import get_file_response
 from mkt.webapps.indexers import WebappIndexer
@@ -60,6 +64,7 @@ from .serializers import (FeedAppESSerializer, FeedAppSerializer,
                           FeedCollectionESSerializer, FeedCollectionSerializer,
                           FeedItemESSerializer, FeedItemSerializer,
                           FeedShelfESSerializer, FeedShelfSerializer)
+from .utils import feed_cache_key
 
 
 log = commonware.log.getLogger('z.feed')
@@ -884,10 +889,11 @@ class FeedView(MarketplaceView, BaseFeedESView, generics.GenericAPIView):
         """
         return int(datetime.now().strftime('%Y%m%d'))
 
-    def get_featured_websites(self):
+    def get_featured_websites_query(self):
         """
-        Get up to 11 featured MOWs for the request's region. If less than 11
-        are available, make up the difference with globally-featured MOWs.
+        Build ES query for up to 11 featured MOWs for the request's region. If
+        less than 11 are available, make up the difference with
+        globally-featured MOWs.
         """
         REGION_TAG = 'featured-website-%s' % self.request.REGION.slug
         region_filter = es_filter.Term(tags=REGION_TAG)
@@ -902,8 +908,7 @@ class FeedView(MarketplaceView, BaseFeedESView, generics.GenericAPIView):
             ],
         )
         es = Search(using=WebsiteIndexer.get_es())[:11]
-        results = es.query(mow_query).execute().hits
-        return ESWebsiteSerializer(results, many=True).data
+        return es.query(mow_query)
 
     def _check_empty_feed(self, items, rest_of_world):
         """
@@ -1005,8 +1010,8 @@ class FeedView(MarketplaceView, BaseFeedESView, generics.GenericAPIView):
             return self._handle_empty_feed(feed_ok, region, request, args,
                                            kwargs)
 
-        with statsd.timer('mkt.feed.view.feed_website_query'):
-            websites = self.get_featured_websites()
+        websites = ESWebsiteSerializer(self.websites_search.result(),
+                                       many=True).data
 
         return response.Response({
             'meta': meta,
@@ -1016,7 +1021,28 @@ class FeedView(MarketplaceView, BaseFeedESView, generics.GenericAPIView):
 
     def get(self, request, *args, **kwargs):
         with statsd.timer('mkt.feed.view'):
-            return self._get(request, *args, **kwargs)
+            cache_key = None
+            if settings.FEED_CACHE_TIMEOUT:
+                cache_key = feed_cache_key(request, self._get_daily_seed())
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    statsd.incr('mkt.feed.view.cache.hit')
+                    return response.Response(json.loads(cached))
+                statsd.incr('mkt.feed.view.cache.miss')
+
+            # The featured websites don't depend on the feed, so they are
+            # fetched while the feed items, elements and apps are.
+            self.websites_search = BackgroundSearch(
+                self.get_featured_websites_query(),
+                timer='mkt.feed.view.feed_website_query')
+            res = self._get(request, *args, **kwargs)
+
+            if cache_key and res.status_code == status.HTTP_200_OK:
+                # Store the response as JSON, the serialized data holds on to
+                # objects that don't pickle.
+                cache.set(cache_key, SuccinctJSONRenderer().render(res.data),
+                          settings.FEED_CACHE_TIMEOUT)
+            return res
 
 
 class FeedElementGetView(BaseFeedESView):
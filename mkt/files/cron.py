@@ -1,5 +1,6 @@
 import hashlib
 import os
+import time
 from datetime import datetime
 
 from django.conf import settings
@@ -44,6 +45,31 @@ def cleanup_extracted_file():
             cache.delete('%s:memoize:%s:%s' % (settings.CACHE_PREFIX,
                                                'file-viewer', key.hexdigest()))
 
+    # The packages copied locally by ZipFileViewer.
+    _remove_local_files(os.path.join(settings.TMP_PATH, 'file_viewer_zip'),
+                        60 * 60, 'Removing local package: %s, %dsecs old.')
+
+
+@cronjobs.register
+def cleanup_file_uploads():
+    """
+    Remove the local copies of uploads (see FileUpload.add_file) that the
+    validator didn't use, because it ran on another machine or failed.
+    """
+    log.info('Removing local copies of uploads.')
+    _remove_local_files(os.path.join(settings.TMP_PATH, 'file_uploads'),
+                        60 * 60, 'Removing local upload: %s, %dsecs old.')
+
+
+def _remove_local_files(root, max_age, msg):
+    if os.path.isdir(root):
+        for path in os.listdir(root):
+            full = os.path.join(root, path)
+            age = time.time() - os.path.getmtime(full)
+            if age > max_age:
+                log.debug(msg % (full, age))
+                os.remove(full)
+
 
 @cronjobs.register
 def cleanup_validation_results():
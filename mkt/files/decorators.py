@@ -11,7 +11,7 @@ from cache_nuggets.lib import Token
 
 import mkt
 from mkt.access import acl
-from mkt.files.helpers import DiffHelper, FileViewer
+from mkt.files.helpers import DiffHelper, get_file_viewer
 from mkt.files.models import File
 
 
@@ -61,7 +61,7 @@ def webapp_file_view(func, **kwargs):
         if result is not True:
             return result
         try:
-            obj = FileViewer(file_)
+            obj = get_file_viewer(file_)
         except ObjectDoesNotExist:
             raise http.Http404
 
@@ -99,7 +99,7 @@ def compare_webapp_file_view(func, **kwargs):
 def webapp_file_view_token(func, **kwargs):
     @functools.wraps(func)
     def wrapper(request, file_id, key, *args, **kw):
-        viewer = FileViewer(get_object_or_404(File, pk=file_id))
+        viewer = get_file_viewer(get_object_or_404(File, pk=file_id))
         token = request.GET.get('token')
         if not token:
             log.error('Denying access to %s, no token.' % viewer.file.id)
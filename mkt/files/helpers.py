@@ -1,10 +1,14 @@
 import codecs
+import datetime
+import hashlib
 import json
 import mimetypes
 import os
 import time
+import zipfile
 from collections import OrderedDict
 
+from django import http
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.template.defaultfilters import filesizeformat
@@ -12,6 +16,7 @@ from django.utils.encoding import smart_unicode
 
 import commonware.log
 import jinja2
+import waffle
 from cache_nuggets.lib import memoize, Message
 from jingo import register
 from django.utils.translation import ugettext as _
@@ -20,11 +25,11 @@ from appvalidator.testcases.packagelayout import (
     blacklisted_magic_numbers as blocked_magic_numbers)
 
 import mkt
-from mkt.files.utils import extract_zip, get_md5
+from mkt.files.utils import extract_zip, get_md5, SafeUnzip
 from mkt.site.storage_utils import (copy_stored_file, local_storage,
                                     private_storage, public_storage,
                                     storage_is_remote, walk_storage)
-from mkt.site.utils import env
+from mkt.site.utils import env, get_file_response
 
 
 # Allow files with a shebang through.
@@ -138,11 +143,9 @@ class FileViewer(object):
         if ext in blocked_extensions:
             return True
 
-        # S3 will return false for storage.exists() for directory paths, so
-        # os.path call is safe here.
-        if private_storage.exists(path) and not os.path.isdir(path):
-            with private_storage.open(path, 'r') as rfile:
-                bytes = tuple(map(ord, rfile.read(4)))
+        head = self._read_head(path)
+        if head is not None:
+            bytes = tuple(map(ord, head))
             if any(bytes[:len(x)] == x for x in blocked_magic_numbers):
                 return True
 
@@ -153,6 +156,18 @@ class FileViewer(object):
 
         return False
 
+    def _read_head(self, path):
+        """Returns the first bytes of the file, or None if it isn't one."""
+        # S3 will return false for storage.exists() for directory paths, so
+        # os.path call is safe here.
+        if private_storage.exists(path) and not os.path.isdir(path):
+            with private_storage.open(path, 'r') as rfile:
+                return rfile.read(4)
+
+    def _read(self, path):
+        with private_storage.open(path, 'r') as opened:
+            return opened.read()
+
     def read_file(self, allow_empty=False):
         """
         Reads the file. Imposes a file limit and tries to cope with
@@ -183,17 +198,16 @@ class FileViewer(object):
             self.selected['msg'] = msg
             return ''
 
-        with private_storage.open(self.selected['full'], 'r') as opened:
-            cont = opened.read()
-            codec = 'utf-16' if cont.startswith(codecs.BOM_UTF16) else 'utf-8'
-            try:
-                return cont.decode(codec)
-            except UnicodeDecodeError:
-                cont = cont.decode(codec, 'ignore')
-                # L10n: {0} is the filename.
-                self.selected['msg'] = (
-                    _('Problems decoding {0}.').format(codec))
-                return cont
+        cont = self._read(self.selected['full'])
+        codec = 'utf-16' if cont.startswith(codecs.BOM_UTF16) else 'utf-8'
+        try:
+            return cont.decode(codec)
+        except UnicodeDecodeError:
+            cont = cont.decode(codec, 'ignore')
+            # L10n: {0} is the filename.
+            self.selected['msg'] = (
+                _('Problems decoding {0}.').format(codec))
+            return cont
 
     def _process_manifest(self, data):
         """
@@ -241,6 +255,15 @@ class FileViewer(object):
                 self.selected['msg'] = _('This file is a directory.')
             return self.selected['directory']
 
+    def get_hash(self, file_):
+        """Returns what tells whether two entries of get_files() differ."""
+        return file_.get('md5')
+
+    def get_file_response(self, request, file_):
+        """Returns the response serving an entry of get_files()."""
+        return get_file_response(request, file_['full'],
+                                 content_type=file_['mimetype'])
+
     def get_default(self, key=None):
         """Gets the default file and copes with search engines."""
         if key:
@@ -362,11 +385,208 @@ class FileViewer(object):
         return res
 
 
+class ZipFileViewer(FileViewer):
+    """
+    Provide access to a storage-managed file by reading its entries in place.
+
+    The package is copied once to `local_path` and the file tree is built
+    from the zip central directory, so nothing is extracted into storage.
+    Entries are read from the local copy when needed, and their md5 is
+    only computed for the selected one.
+    """
+
+    def __init__(self, file_obj):
+        super(ZipFileViewer, self).__init__(file_obj)
+        self.local_path = os.path.join(settings.TMP_PATH, 'file_viewer_zip',
+                                       '%s.zip' % file_obj.pk)
+        self._zip = None
+
+    def extract(self):
+        """
+        Copies the package locally once it has been checked.
+        Raises error on nasty files.
+        """
+        if self.file.status in mkt.LISTED_STATUSES:
+            storage = public_storage
+        else:
+            storage = private_storage
+        tmp_path = '%s.%s.tmp' % (self.local_path, os.getpid())
+        try:
+            copy_stored_file(self.src, tmp_path, src_storage=storage,
+                             dst_storage=local_storage)
+            zip = SafeUnzip(tmp_path)
+            try:
+                zip.is_valid()
+            finally:
+                zip.close()
+            # Renaming is atomic, other processes only see a complete copy.
+            os.rename(tmp_path, self.local_path)
+        except Exception, err:
+            task_log.error('Error (%s) extracting %s' % (err, self.src))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def cleanup(self):
+        if os.path.exists(self.local_path):
+            os.remove(self.local_path)
+
+    def is_extracted(self):
+        """If the package has been copied locally or not."""
+        return os.path.exists(self.local_path)
+
+    def _read_head(self, path):
+        # Only called by _get_files(), which keeps the zip open.
+        with self._zip.open(path) as member:
+            return member.read(4)
+
+    def _read(self, path):
+        with zipfile.ZipFile(self.local_path) as zip:
+            return zip.read(path)
+
+    def _get_md5(self, path):
+        md5 = hashlib.md5()
+        with zipfile.ZipFile(self.local_path) as zip:
+            with zip.open(path) as member:
+                for chunk in iter(lambda: member.read(2 ** 20), ''):
+                    md5.update(chunk)
+        return md5.hexdigest()
+
+    def select(self, file_):
+        super(ZipFileViewer, self).select(file_)
+        if (self.selected and not self.selected['directory'] and
+                not self.selected['md5']):
+            try:
+                self.selected['md5'] = self._get_md5(self.selected['full'])
+            except (IOError, KeyError):
+                pass
+
+    def get_hash(self, file_):
+        return file_.get('crc')
+
+    def get_file_response(self, request, file_):
+        # Directories have no content to serve, and the member can be gone
+        # if the package changed since the tree was cached.
+        if file_['directory']:
+            raise http.Http404
+        try:
+            content = self._read(file_['full'])
+        except (IOError, KeyError):
+            raise http.Http404
+        return http.HttpResponse(content, content_type=file_['mimetype'])
+
+    def get_files(self):
+        """
+        Returns an OrderedDict, ordered by the filename of all the files in the
+        addon-file, copying the package locally first if needed.
+        """
+        if self._files:
+            return self._files
+
+        if not self.is_extracted():
+            try:
+                self.extract()
+            except Exception:
+                # Already logged by extract().
+                return {}
+        # In case a cron job comes along and deletes the copy mid tree
+        # building.
+        try:
+            self._files = self._get_files()
+            return self._files
+        except (OSError, IOError, zipfile.BadZipfile):
+            return {}
+
+    @memoize(prefix='file-viewer-zip', time=60 * 60)
+    def _get_files(self):
+        with zipfile.ZipFile(self.local_path) as self._zip:
+            try:
+                return self._get_zip_files()
+            finally:
+                self._zip = None
+
+    def _get_zip_files(self):
+        infos = dict((info.filename.rstrip('/'), info)
+                     for info in self._zip.infolist())
+
+        # Zips don't always list the directories, add the missing ones.
+        tree = {}
+        for name in infos:
+            parts = name.split('/')
+            for depth in range(len(parts)):
+                tree.setdefault('/'.join(parts[:depth]), set()).add(
+                    '/'.join(parts[:depth + 1]))
+        dirs = set(tree).union(name for name, info in infos.items()
+                               if info.filename.endswith('/'))
+
+        # Directories first, then files, like FileViewer.
+        all_files = []
+
+        def iterate(path):
+            children = tree.get(path, ())
+            for full in sorted(c for c in children if c in dirs):
+                all_files.append(full)
+                iterate(full)
+            for full in sorted(c for c in children if c not in dirs):
+                all_files.append(full)
+
+        iterate('')
+
+        res = OrderedDict()
+        for short in all_files:
+            info = infos.get(short)
+            directory = short in dirs
+            filename = smart_unicode(os.path.basename(short), errors='replace')
+            short = smart_unicode(short, errors='replace')
+            mime, encoding = mimetypes.guess_type(filename)
+            if not mime and filename == 'manifest.webapp':
+                mime = 'application/x-web-app-manifest+json'
+            # The member name, or a name that is never one for directories.
+            full = info.filename if info and not directory else short + '/'
+            res[short] = {
+                'binary': (self._is_binary(mime, full)
+                           if not directory else False),
+                'crc': ('%08x:%s' % (info.CRC, info.file_size)
+                        if info and not directory else ''),
+                'depth': short.count('/'),
+                'directory': directory,
+                'filename': filename,
+                'full': full,
+                'md5': '',
+                'mimetype': mime or 'application/octet-stream',
+                'syntax': self.get_syntax(filename),
+                'modified': (
+                    time.mktime(
+                        datetime.datetime(*info.date_time).timetuple())
+                    if info and not directory else 0),
+                'short': short,
+                'size': info.file_size if info and not directory else 0,
+                'truncated': self.truncate(filename),
+                'url': reverse('mkt.files.list',
+                               args=[self.file.id, 'file', short]),
+                'url_serve': reverse('mkt.files.redirect',
+                                     args=[self.file.id, short]),
+                'version': self.file.version.version,
+            }
+
+        return res
+
+
+def get_file_viewer(file_obj):
+    """
+    Returns the file viewer for `file_obj`, reading the package in place if
+    the `file-viewer-zip-index` switch is active.
+    """
+    if waffle.switch_is_active('file-viewer-zip-index'):
+        return ZipFileViewer(file_obj)
+    return FileViewer(file_obj)
+
+
 class DiffHelper(object):
 
     def __init__(self, left, right):
-        self.left = FileViewer(left)
-        self.right = FileViewer(right)
+        self.left = get_file_viewer(left)
+        self.right = get_file_viewer(right)
         self.addon = self.left.addon
         self.key = None
 
@@ -399,7 +619,8 @@ class DiffHelper(object):
         different = []
         for key, file in left_files.items():
             file['url'] = self.get_url(file['short'])
-            diff = file['md5'] != right_files.get(key, {}).get('md5')
+            diff = (self.left.get_hash(file) !=
+                    self.right.get_hash(right_files.get(key, {})))
             file['diff'] = diff
             if diff:
                 different.append(file)
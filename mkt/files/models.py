@@ -16,11 +16,13 @@ from jingo.helpers import urlparams
 from uuidfield.fields import UUIDField
 
 import mkt
+from mkt.files.utils import SpooledUpload
 from mkt.site.decorators import use_master
 from mkt.site.helpers import absolutify
 from mkt.site.models import ModelBase, OnChangeMixin
-from mkt.site.storage_utils import (copy_stored_file, move_stored_file,
-                                    private_storage, public_storage)
+from mkt.site.storage_utils import (copy_stored_file, local_storage,
+                                    move_stored_file, private_storage,
+                                    public_storage)
 from mkt.site.utils import smart_path
 
 
@@ -288,32 +290,45 @@ class FileUpload(ModelBase):
                 log.error('Invalid validation json: %r' % self)
         super(FileUpload, self).save()
 
-    def add_file(self, chunks, filename, size):
+    def add_file(self, chunks, filename, size, spool=None):
+        """
+        Store the upload made of `chunks`. `spool` is a SpooledUpload of
+        them if the caller already made one, to check the file for instance.
+        A local copy is kept at `local_path` for the validator.
+        """
         filename = smart_str(filename)
         loc = os.path.join(settings.ADDONS_PATH, 'temp', uuid.uuid4().hex)
         base, ext = os.path.splitext(smart_path(filename))
         if ext in EXTENSIONS:
             loc += ext
         log.info('UPLOAD: %r (%s bytes) to %r' % (filename, size, loc))
-        hash = hashlib.sha256()
-        # The buffer might have been read before, so rewind back at the start.
-        if hasattr(chunks, 'seek'):
-            chunks.seek(0)
-        with private_storage.open(loc, 'wb') as fd:
-            for chunk in chunks:
-                hash.update(chunk)
-                fd.write(chunk)
+        if spool is None:
+            spool = SpooledUpload(chunks)
+        copy_stored_file(spool.path, loc, src_storage=local_storage,
+                         dst_storage=private_storage)
         self.path = loc
         self.name = filename
-        self.hash = 'sha256:%s' % hash.hexdigest()
+        self.hash = spool.hash
+        spool.move(self.local_path)
         self.save()
 
     @classmethod
-    def from_post(cls, chunks, filename, size, **kwargs):
+    def from_post(cls, chunks, filename, size, spool=None, **kwargs):
         fu = FileUpload(**kwargs)
-        fu.add_file(chunks, filename, size)
+        fu.add_file(chunks, filename, size, spool=spool)
         return fu
 
+    @property
+    def local_path(self):
+        """
+        Where add_file() left a copy of the upload. It only exists on the
+        machine that received it, and not for long: see
+        cleanup_file_uploads().
+        """
+        if self.path:
+            return os.path.join(settings.TMP_PATH, 'file_uploads',
+                                os.path.basename(self.path))
+
     @property
     def processed(self):
         return bool(self.valid or self.validation)
@@ -6,7 +6,7 @@ from django.utils.translation import ugettext as _
 from cache_nuggets.lib import Message
 from post_request_task.task import task
 
-from mkt.files.helpers import FileViewer
+from mkt.files.helpers import get_file_viewer
 from mkt.files.models import File
 
 
@@ -16,7 +16,7 @@ task_log = logging.getLogger('z.task')
 @task
 def extract_file(file_id, **kw):
     # This message is for end users so they'll see a nice error.
-    viewer = FileViewer(File.objects.get(pk=file_id))
+    viewer = get_file_viewer(File.objects.get(pk=file_id))
     msg = Message('file-viewer:%s' % viewer)
     msg.delete()
     # This flag is so that we can signal when the extraction is completed.
@@ -1,17 +1,19 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import os
 import re
 import zipfile
 
-from django import forms
+from django import forms, http
 from django.conf import settings
 from django.core.cache import cache
 from django.core.urlresolvers import reverse
 
 from mock import Mock, patch
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
-from mkt.files.helpers import FileViewer, DiffHelper
+from mkt.files.helpers import (DiffHelper, FileViewer, get_file_viewer,
+                               ZipFileViewer)
 from mkt.files.utils import SafeUnzip
 from mkt.site.storage_utils import (copy_stored_file, local_storage,
                                     private_storage, storage_is_remote)
@@ -284,6 +286,105 @@ class TestDiffHelper(TestCase, MktPaths):
             f.write(data)
 
 
+class TestZipFileHelper(TestCase):
+
+    def setUp(self):
+        fn = get_file('dictionary-test.xpi')
+        if storage_is_remote():
+            copy_stored_file(
+                fn, fn,
+                src_storage=local_storage, dst_storage=private_storage)
+        self.viewer = ZipFileViewer(make_file(1, fn))
+
+    def tearDown(self):
+        self.viewer.cleanup()
+
+    def test_files_not_extracted(self):
+        eq_(self.viewer.is_extracted(), False)
+
+    def test_files_extracted(self):
+        self.viewer.extract()
+        eq_(self.viewer.is_extracted(), True)
+        ok_(not private_storage.exists(
+            os.path.join(self.viewer.dest, 'manifest.webapp')))
+
+    def test_cleanup(self):
+        self.viewer.extract()
+        self.viewer.cleanup()
+        eq_(self.viewer.is_extracted(), False)
+
+    def test_get_files_extracts(self):
+        eq_(len(self.viewer.get_files()), 15)
+        eq_(self.viewer.is_extracted(), True)
+
+    def test_get_files_same_as_extracted(self):
+        viewer = FileViewer(make_file(2, get_file('dictionary-test.xpi')))
+        viewer.extract()
+        try:
+            files = viewer.get_files()
+        finally:
+            viewer.cleanup()
+        zip_files = self.viewer.get_files()
+        eq_(zip_files.keys(), files.keys())
+        for key in ('binary', 'depth', 'directory', 'mimetype', 'size'):
+            eq_([f[key] for f in zip_files.values()],
+                [f[key] for f in files.values()])
+
+    def test_md5_on_select(self):
+        files = self.viewer.get_files()
+        eq_(files['install.js']['md5'], '')
+        self.viewer.select('install.js')
+        with zipfile.ZipFile(get_file('dictionary-test.xpi')) as zip:
+            md5 = hashlib.md5(zip.read('install.js')).hexdigest()
+        eq_(self.viewer.selected['md5'], md5)
+
+    def test_read_file(self):
+        self.viewer.select('install.js')
+        with zipfile.ZipFile(get_file('dictionary-test.xpi')) as zip:
+            eq_(self.viewer.read_file(), zip.read('install.js'))
+
+    @patch.object(settings, 'FILE_VIEWER_SIZE_LIMIT', 5)
+    def test_file_size(self):
+        self.viewer.select('install.js')
+        eq_(self.viewer.read_file(), '')
+        assert self.viewer.selected['msg'].startswith('File size is')
+
+    @patch.object(settings, 'FILE_UNZIP_SIZE_LIMIT', 5)
+    def test_contents_size(self):
+        self.assertRaises(forms.ValidationError, self.viewer.extract)
+        eq_(self.viewer.is_extracted(), False)
+        eq_(self.viewer.get_files(), {})
+
+    def test_delete_mid_read(self):
+        self.viewer.select('install.js')
+        self.viewer.cleanup()
+        eq_(self.viewer.read_file(), '')
+        assert self.viewer.selected['msg'].startswith('That file no')
+
+    def test_get_file_response(self):
+        files = self.viewer.get_files()
+        res = self.viewer.get_file_response(None, files['install.js'])
+        with zipfile.ZipFile(get_file('dictionary-test.xpi')) as zip:
+            eq_(res.content, zip.read('install.js'))
+
+    def test_get_file_response_directory(self):
+        files = self.viewer.get_files()
+        with self.assertRaises(http.Http404):
+            self.viewer.get_file_response(None, files['dictionaries'])
+
+    def test_get_file_response_missing(self):
+        files = self.viewer.get_files()
+        file_ = dict(files['install.js'], full='missing.js')
+        with self.assertRaises(http.Http404):
+            self.viewer.get_file_response(None, file_)
+
+    def test_get_file_viewer(self):
+        ok_(not isinstance(get_file_viewer(make_file(1, 'foo')),
+                           ZipFileViewer))
+        self.create_switch('file-viewer-zip-index')
+        ok_(isinstance(get_file_viewer(make_file(1, 'foo')), ZipFileViewer))
+
+
 class TestSafeUnzipFile(TestCase, MktPaths):
 
     # TODO(andym): get full coverage for existing SafeUnzip methods, most
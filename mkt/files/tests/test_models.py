@@ -82,6 +82,9 @@ class TestFileUpload(UploadTest):
         hash = hashlib.sha256(self.data).hexdigest()
         eq_(self.upload().hash, 'sha256:%s' % hash)
 
+    def test_from_post_local_copy(self):
+        eq_(open(self.upload().local_path).read(), self.data)
+
     def test_save_without_validation(self):
         f = FileUpload.objects.create()
         assert not f.valid
@@ -248,6 +248,46 @@ class SafeUnzip(object):
             self.zip.close()
 
 
+class SpooledUpload(object):
+    """
+    A local copy of an incoming upload, written along with its sha256 in a
+    single pass over the chunks. It can be checked (see SafeUnzip) before
+    anything is written to storage, and lets the validator skip fetching the
+    upload back from storage when it runs on the same machine.
+    """
+
+    def __init__(self, chunks, suffix=''):
+        root = os.path.join(settings.TMP_PATH, 'file_uploads')
+        if not os.path.isdir(root):
+            try:
+                os.makedirs(root)
+            except OSError:
+                # Another process beat us to it.
+                pass
+        fd, self.path = tempfile.mkstemp(suffix=suffix, dir=root)
+        hash = hashlib.sha256()
+        # Iterating over an UploadedFile splits it in lines, use its chunks.
+        if hasattr(chunks, 'chunks'):
+            chunks = chunks.chunks()
+        # The buffer might have been read before, so rewind back at the start.
+        elif hasattr(chunks, 'seek'):
+            chunks.seek(0)
+        with os.fdopen(fd, 'wb') as spool:
+            for chunk in chunks:
+                hash.update(chunk)
+                spool.write(chunk)
+        self.hash = 'sha256:%s' % hash.hexdigest()
+
+    def move(self, path):
+        """Move the copy to `path`, on the same filesystem."""
+        os.rename(self.path, path)
+        self.path = path
+
+    def delete(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
 def extract_zip(source):
     """Extracts the zip file."""
     tempdir = tempfile.mkdtemp()
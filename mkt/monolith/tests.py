@@ -11,9 +11,10 @@ from django.test import client
 
 from mkt.api.tests.test_oauth import RestOAuth
 from mkt.monolith.models import MonolithRecord, record_stat
-from mkt.monolith.views import daterange
+from mkt.monolith.views import _get_query_result, daterange
+from mkt.ratings.models import Review
 from mkt.site.fixtures import fixture
-from mkt.site.tests import TestCase
+from mkt.site.tests import app_factory, TestCase, user_factory
 
 
 class RequestFactory(client.RequestFactory):
@@ -214,6 +215,63 @@ class TestMonolithResource(RestOAuth):
         eq_(data['meta']['limit'], 2)
 
 
+class TestQueryResult(TestCase):
+
+    def setUp(self):
+        self.app = app_factory()
+        self.start = datetime.date(2014, 1, 1)
+        self.end = datetime.date(2014, 1, 4)
+        for day, rating in ((1, 5), (1, 4), (2, 3)):
+            review = Review.objects.create(addon=self.app, user=user_factory(),
+                                           rating=rating)
+            Review.objects.filter(pk=review.pk).update(
+                created=datetime.datetime(2014, 1, day, 12))
+
+    def values(self, data):
+        return [(d['recorded'], d['value']['app-id'], d['value']['count'])
+                for d in data]
+
+    def test_slice(self):
+        with self.assertNumQueries(1):
+            data = _get_query_result('apps_ratings', self.start, self.end)
+        eq_(self.values(data), [(datetime.date(2014, 1, 1), self.app.pk, 2),
+                                (datetime.date(2014, 1, 2), self.app.pk, 1)])
+
+    def test_total(self):
+        with self.assertNumQueries(1):
+            data = _get_query_result('apps_average_rating',
+                                     datetime.date(2013, 12, 31), self.end)
+        eq_(self.values(data), [(datetime.date(2014, 1, 1), self.app.pk, 4.5),
+                                (datetime.date(2014, 1, 2), self.app.pk, 4.0),
+                                (datetime.date(2014, 1, 3), self.app.pk, 4.0)])
+
+    def test_total_without_rating(self):
+        review = Review.objects.create(addon=self.app, user=user_factory(),
+                                       rating=None)
+        Review.objects.filter(pk=review.pk).update(
+            created=datetime.datetime(2014, 1, 3, 12))
+        data = _get_query_result('apps_average_rating',
+                                 datetime.date(2014, 1, 3), self.end)
+        eq_(self.values(data), [(datetime.date(2014, 1, 3), self.app.pk, 4.0)])
+
+    def test_total_counts_reviews_before_start(self):
+        data = _get_query_result('apps_average_rating',
+                                 datetime.date(2014, 1, 3), self.end)
+        eq_(self.values(data), [(datetime.date(2014, 1, 3), self.app.pk, 4.0)])
+
+    def test_cached(self):
+        data = _get_query_result('apps_ratings', self.start, self.end)
+        with self.assertNumQueries(0):
+            eq_(_get_query_result('apps_ratings', self.start, self.end), data)
+
+    def test_not_cached_until_today(self):
+        today = datetime.date.today()
+        tomorrow = today + datetime.timedelta(days=1)
+        _get_query_result('apps_ratings', today, tomorrow)
+        with self.assertNumQueries(1):
+            _get_query_result('apps_ratings', today, tomorrow)
+
+
 class TestDateRange(TestCase):
 
     def setUp(self):
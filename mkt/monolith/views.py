@@ -1,7 +1,9 @@
 import datetime
 import logging
 
-from django.db.models import Avg, Count
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
 from rest_framework import status
 from rest_framework.exceptions import ParseError
 from rest_framework.generics import ListAPIView
@@ -22,35 +24,25 @@ log = logging.getLogger('z.monolith')
 
 # TODO: Move the stats that can be calculated on the fly from
 # apps/stats/tasks.py here.
+#
+# 'slice' stats count the objects created each day, by app. 'total' stats
+# average `average` over all the objects created up to each day, by app.
 STATS = {
     'apps_ratings': {
-        'qs': Review.objects
-        .filter(editorreview=0)
-        .values('addon')
-        .annotate(count=Count('addon')).order_by(),
+        'qs': Review.objects.filter(editorreview=0),
         'type': 'slice',
-        'field_map': {
-            'count': 'count',
-            'app-id': 'addon'},
+        'app-id': 'addon',
     },
     'apps_average_rating': {
-        'qs': Review.objects
-        .filter(editorreview=0)
-        .values('addon')
-        .annotate(avg=Avg('rating')).order_by(),
+        'qs': Review.objects.filter(editorreview=0),
         'type': 'total',
-        'field_map': {
-            'count': 'avg',
-            'app-id': 'addon'},
+        'app-id': 'addon',
+        'average': 'rating',
     },
     'apps_abuse_reports': {
-        'qs': AbuseReport.objects
-        .values('addon')
-        .annotate(count=Count('addon')).order_by(),
+        'qs': AbuseReport.objects.all(),
         'type': 'slice',
-        'field_map': {
-            'count': 'count',
-            'app-id': 'addon'},
+        'app-id': 'addon',
     }
 }
 
@@ -60,12 +52,62 @@ def daterange(start, end):
         yield start + datetime.timedelta(n)
 
 
+def _daily_aggregates(stat, **filters):
+    """
+    Return the count, and the sum of the `average` field for 'total' stats,
+    of the objects of `stat` created each day, by app, ordered by day.
+    """
+    qs = stat['qs'].filter(**filters)
+    field = stat.get('average', stat['app-id'])
+    aggregates = {'count': Count(field)}
+    if 'average' in stat:
+        aggregates['sum'] = Sum(field)
+    return (qs.extra(select={'day': 'DATE(%s.created)' %
+                             qs.model._meta.db_table})
+            .values('day', stat['app-id']).annotate(**aggregates)
+            .order_by('day'))
+
+
+def _iter_slice(key, stat, start, end):
+    for row in _daily_aggregates(stat, created__gte=start, created__lt=end):
+        yield {
+            'key': key,
+            'recorded': row['day'],
+            'user_hash': None,
+            'value': {'count': row['count'],
+                      'app-id': row[stat['app-id']]}}
+
+
+def _iter_total(key, stat, start, end):
+    # Keep a running count and sum by app, from the beginning of time, and
+    # yield the average of every app once all the objects created on a day
+    # of the range have been added.
+    rows = iter(_daily_aggregates(stat, created__lt=end))
+    row = next(rows, None)
+    totals = {}
+    for day in daterange(start, end):
+        while row is not None and row['day'] <= day:
+            count, sum_ = totals.get(row[stat['app-id']], (0, 0))
+            # The sum is NULL on a day with nothing but NULL values.
+            totals[row[stat['app-id']]] = (count + row['count'],
+                                           sum_ + (row['sum'] or 0))
+            row = next(rows, None)
+
+        for app_id, (count, sum_) in sorted(totals.items()):
+            if count:
+                yield {
+                    'key': key,
+                    'recorded': day,
+                    'user_hash': None,
+                    'value': {'count': float(sum_) / count,
+                              'app-id': app_id}}
+
+
 def _get_query_result(key, start, end):
     # To do on-the-fly queries we have to produce results as if they
-    # were calculated daily, which means we need to iterate over each
-    # day in the range and perform an aggregation on this date.
+    # were calculated daily. Rather than running an aggregation for each
+    # day in the range, the objects are aggregated by day in one query.
 
-    data = []
     today = datetime.date.today()
     stat = STATS[key]
 
@@ -75,28 +117,21 @@ def _get_query_result(key, start, end):
     if not end:
         end = today
 
-    for day in daterange(start, end):
-        if stat['type'] == 'total':
-            # If it's a totalling queryset, we want to filter by the
-            # end date until the beginning of time to get the total
-            # objects up until this point in time.
-            date_filtered = stat['qs'].filter(
-                created__lt=(day + datetime.timedelta(days=1)))
-        else:
-            # Otherwise, we want to filter by both start/end to get
-            # counts on a specific day.
-            date_filtered = stat['qs'].filter(
-                created__gte=day,
-                created__lt=(day + datetime.timedelta(days=1)))
-
-        data.extend([{
-            'key': key,
-            'recorded': day,
-            'user_hash': None,
-            'value': {'count': d.get(stat['field_map']['count']),
-                      'app-id': d.get(stat['field_map']['app-id'])}}
-                     for d in date_filtered])
-
+    # Days before today won't change anymore, cache their results.
+    cache_key = None
+    if end <= today and settings.MONOLITH_STATS_CACHE_TIMEOUT:
+        cache_key = 'monolith:stats:%s:%s:%s' % (key, start, end)
+        data = cache.get(cache_key)
+        if data is not None:
+            return data
+
+    if stat['type'] == 'total':
+        data = list(_iter_total(key, stat, start, end))
+    else:
+        data = list(_iter_slice(key, stat, start, end))
+
+    if cache_key:
+        cache.set(cache_key, data, settings.MONOLITH_STATS_CACHE_TIMEOUT)
     return data
 
 
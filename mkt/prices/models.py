@@ -1,4 +1,5 @@
 import uuid
+from collections import defaultdict
 
 from django.conf import settings
 from django.core.cache import cache
@@ -24,11 +25,14 @@ from mkt.purchase.models import Contribution
 from mkt.regions.utils import remove_accents
 from mkt.site.decorators import use_master
 from mkt.site.models import ManagerBase, ModelBase
+from mkt.site.utils import cache_ns_key
 from mkt.translations.utils import get_locale_from_lang
 from mkt.users.models import UserProfile
 
 log = commonware.log.getLogger('z.market')
 
+PRICE_MATRIX_NAMESPACE = 'prices:matrix'
+
 
 def default_providers():
     """
@@ -49,6 +53,54 @@ def price_key(data):
             .format(**data))
 
 
+class PriceMatrix(object):
+    """
+    Every PriceCurrency, by tier, provider, region and carrier.
+
+    There are a constrained number of price currencies, so each process keeps
+    all of them in memory. The matrix is stamped with the version of the
+    PRICE_MATRIX_NAMESPACE cache namespace, which is bumped whenever a price
+    changes, so that every process reloads it.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        # PriceCurrency objects of the active tiers, keyed by price_key().
+        self.currencies = {}
+        # The PriceCurrency dicts of every tier, keyed by tier id.
+        self.tiers = defaultdict(list)
+        for currency in (PriceCurrency.objects.select_related('tier')
+                                              .order_by('id')):
+            data = model_to_dict(currency)
+            self.tiers[currency.tier_id].append(data)
+            if currency.tier.active:
+                self.currencies[price_key(data)] = currency
+
+
+def get_price_matrix():
+    """Return the PriceMatrix, reloading it if any price has changed."""
+    version = cache_ns_key(PRICE_MATRIX_NAMESPACE)
+    matrix = getattr(Price, '_currencies', None)
+    if matrix is None or matrix.version != version:
+        matrix = Price._currencies = PriceMatrix(version)
+    return matrix
+
+
+def invalidate_price_matrix():
+    """Make every process reload the PriceMatrix on its next lookup."""
+    cache_ns_key(PRICE_MATRIX_NAMESPACE, increment=True)
+    Price._currencies = None
+
+
+def _invalidate_price_matrix_after_commit():
+    # Bump the version right away, for the rest of this request, and again
+    # once the transaction is committed: in between, another process could
+    # reload the matrix with the old prices under the new version.
+    from mkt.prices.tasks import bump_price_matrix
+    invalidate_price_matrix()
+    bump_price_matrix.delay()
+
+
 class PriceManager(ManagerBase):
 
     def get_queryset(self):
@@ -88,10 +140,7 @@ class Price(ModelBase):
     def transformer(prices):
         # There are a constrained number of price currencies, let's just
         # get them all.
-        Price._currencies = dict(
-            (price_key(model_to_dict(p)), p)
-            for p in PriceCurrency.objects.filter(tier__active=True)
-        )
+        get_price_matrix()
 
     def get_price_currency(self, carrier=None, region=None, provider=None):
         """
@@ -107,20 +156,12 @@ class Price(ModelBase):
         # however we might need to think about this for the long term.
         provider = (provider or
                     ALL_PROVIDERS[settings.DEFAULT_PAYMENT_PROVIDER].provider)
-        if not hasattr(Price, '_currencies'):
-            Price.transformer([])
-
         lookup = price_key({
             'tier': self.id, 'carrier': carrier,
             'provider': provider, 'region': region
         })
 
-        try:
-            price_currency = Price._currencies[lookup]
-        except KeyError:
-            return None
-
-        return price_currency
+        return get_price_matrix().currencies.get(lookup)
 
     def get_price_data(self, carrier=None, regions=None, provider=None):
         """
@@ -161,8 +202,8 @@ class Price(ModelBase):
             If not provided it will use settings.PAYMENT_PROVIDERS,
         """
         providers = [provider] if provider else default_providers()
-        return [model_to_dict(o) for o in
-                self.pricecurrency_set.filter(provider__in=providers)]
+        tier = get_price_matrix().tiers.get(self.id, [])
+        return [dict(data) for data in tier if data['provider'] in providers]
 
     def regions_by_name(self, provider=None):
         """A list of price regions sorted by name.
@@ -267,6 +308,7 @@ def update_price_currency(sender, instance, **kw):
     Ensure that when PriceCurrencies are updated, all the apps that use them
     are re-indexed into ES so that the region information will be correct.
     """
+    _invalidate_price_matrix_after_commit()
     if kw.get('raw'):
         return
 
@@ -285,6 +327,13 @@ def update_price_currency(sender, instance, **kw):
         index_webapps.delay(ids)
 
 
+@receiver([models.signals.post_save, models.signals.post_delete],
+          sender=Price, dispatch_uid='update_price_matrix')
+def update_price(sender, instance, **kw):
+    """Tiers going (in)active change which currencies can be looked up."""
+    _invalidate_price_matrix_after_commit()
+
+
 class AddonPurchase(ModelBase):
     addon = models.ForeignKey('webapps.Webapp')
     type = models.PositiveIntegerField(default=mkt.CONTRIB_PURCHASE,
@@ -367,6 +416,23 @@ def create_addon_purchase(sender, instance, **kw):
     cache.delete(memoize_key('users:purchase-ids', instance.user.pk))
 
 
+@receiver([models.signals.post_save, models.signals.post_delete],
+          sender=AddonPurchase, dispatch_uid='forget_verified_app_purchase')
+def forget_verified_app_purchase(sender, instance, **kw):
+    """Make the receipt verifier look this purchase up again."""
+    from mkt.purchase.tasks import forget_verified_purchases
+    forget_verified_purchases.delay([('app', instance.addon_id,
+                                      instance.uuid)])
+
+
+@receiver([models.signals.post_save, models.signals.post_delete],
+          sender=Contribution, dispatch_uid='forget_verified_inapp_purchase')
+def forget_verified_inapp_purchase(sender, instance, **kw):
+    """Make the receipt verifier look this contribution up again."""
+    from mkt.purchase.tasks import forget_verified_purchases
+    forget_verified_purchases.delay([('inapp', instance.pk)])
+
+
 class AddonPremium(ModelBase):
     """Additions to the Webapp model that only apply to Premium add-ons."""
     addon = models.OneToOneField('webapps.Webapp')
@@ -0,0 +1,11 @@
+from post_request_task.task import task
+
+
+@task
+def bump_price_matrix(**kw):
+    """
+    Bump the price matrix version again once the change is committed, in
+    case another process reloaded the old prices under the first bump.
+    """
+    from mkt.prices.models import invalidate_price_matrix
+    invalidate_price_matrix()
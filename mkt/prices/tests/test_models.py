@@ -12,9 +12,13 @@ from mkt.constants import apps
 from mkt.constants.payments import PROVIDER_BANGO, PROVIDER_REFERENCE
 from mkt.constants.regions import (
     ALL_REGION_IDS, BRA, ESP, HUN, RESTOFWORLD, USA)
-from mkt.prices.models import AddonPremium, Price, PriceCurrency, Refund
+from mkt.prices.models import (AddonPremium, get_price_matrix,
+                               PRICE_MATRIX_NAMESPACE, Price, PriceCurrency,
+                               Refund)
+from mkt.prices.tasks import bump_price_matrix
 from mkt.purchase.models import Contribution
 from mkt.site.fixtures import fixture
+from mkt.site.utils import cache_ns_key
 from mkt.users.models import UserProfile
 from mkt.webapps.models import AddonUser, Webapp
 
@@ -39,8 +43,6 @@ class TestPrice(mkt.site.tests.TestCase):
 
     def setUp(self):
         self.tier_one = Price.objects.get(pk=1)
-        if hasattr(Price, '_currencies'):
-            del Price._currencies  # needed to pick up fixtures.
 
     def test_active(self):
         Price.objects.get(pk=2).update(active=False)
@@ -100,6 +102,56 @@ class TestPrice(mkt.site.tests.TestCase):
         with self.assertNumQueries(0):
             eq_(price.get_price_locale(regions=[RESTOFWORLD.id]), u'$0.99')
 
+    def test_prices_no_queries(self):
+        price = Price.objects.get(pk=2)
+        price.prices()
+        with self.assertNumQueries(0):
+            eq_(len(price.prices()), 3)
+            eq_(price.region_ids_by_name(), [BRA.id, ESP.id, RESTOFWORLD.id])
+            eq_(price.get_price(regions=[BRA.id]), Decimal('1.01'))
+
+    def test_price_currency_change_reloads(self):
+        price = Price.objects.get(pk=2)
+        eq_(price.get_price(regions=[BRA.id]), Decimal('1.01'))
+        PriceCurrency.objects.get(pk=3).update(price='2.02')
+        eq_(price.get_price(regions=[BRA.id]), Decimal('2.02'))
+
+    def test_inactive_tier_reloads(self):
+        price = Price.objects.get(pk=2)
+        eq_(price.get_price(regions=[BRA.id]), Decimal('1.01'))
+        price.update(active=False)
+        eq_(price.get_price(regions=[BRA.id]), None)
+
+    def test_version_bumped_elsewhere(self):
+        price = Price.objects.get(pk=2)
+        price.prices()
+        # Another process bumping the version makes this one reload.
+        cache_ns_key(PRICE_MATRIX_NAMESPACE, increment=True)
+        with self.assertNumQueries(1):
+            price.prices()
+
+    @mock.patch('mkt.prices.tasks.bump_price_matrix.delay')
+    def test_version_bumped_after_commit(self, delay):
+        PriceCurrency.objects.get(pk=3).update(price='2.02')
+        delay.assert_called_with()
+        delay.reset_mock()
+        Price.objects.get(pk=2).update(active=False)
+        delay.assert_called_with()
+
+    def test_stale_reload_before_commit(self):
+        price = Price.objects.get(pk=2)
+        with mock.patch('mkt.prices.tasks.bump_price_matrix.delay'):
+            PriceCurrency.objects.get(pk=3).update(price='2.02')
+        # Pretend another process reloaded the old prices under the new
+        # version before the change was committed.
+        stale = get_price_matrix()
+        stale.tiers[price.id] = []
+        with self.assertNumQueries(0):
+            eq_(price.prices(), [])
+        # The post-commit bump makes it reload them.
+        bump_price_matrix()
+        eq_(len(price.prices()), 3)
+
     def test_get_tier_price(self):
         eq_(Price.objects.get(pk=2).get_price_locale(regions=[BRA.id]),
             'R$1.01')
@@ -47,3 +47,14 @@ def send_purchase_receipt(contrib_id, **kw):
         html_template = 'purchase/receipt.html'
         send_html_mail_jinja(subject, html_template, text_template, data,
                              recipient_list=[contrib.user.email])
+
+
+@task
+def forget_verified_purchases(keys, **kw):
+    """
+    Makes the receipt verifier look the given purchases up again. Delayed so
+    that it happens once the change is committed: sooner, the verifier could
+    cache the purchase as it was before the change.
+    """
+    from services.verify import forget_purchases  # Loads verifier settings.
+    forget_purchases(keys)
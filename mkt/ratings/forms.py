@@ -20,6 +20,7 @@ class BaseReviewFlagFormSet(BaseModelFormSet):
         self.request = kwargs.pop('request', None)
         super(BaseReviewFlagFormSet, self).__init__(*args, **kwargs)
 
+    @mkt.log_buffer()
     def save(self):
 
         for form in self.forms:
@@ -1,6 +1,8 @@
 import logging
 
-from django.db.models import Count, Avg, F
+from django.core.cache import cache
+from django.db.models import (Avg, Case, Count, ExpressionWrapper, F,
+                              FloatField, Value, When)
 
 from post_request_task.task import task
 
@@ -11,6 +13,11 @@ from .models import Review
 
 log = logging.getLogger('z.task')
 
+GLOBAL_AVERAGES_KEY = 'ratings:global-averages'
+# How many seconds the averages of all the apps are kept for. A few more or
+# fewer reviews don't move them much.
+GLOBAL_AVERAGES_TIMEOUT = 60 * 60
+
 
 @task(rate_limit='50/m')
 def update_denorm(*pairs, **kw):
@@ -55,26 +62,34 @@ def addon_review_aggregates(*addons, **kw):
     addon_bayesian_rating.apply_async(args=addons, countdown=5)
 
 
+def get_global_averages():
+    """
+    Return the average rating and average number of reviews of all the apps,
+    from a snapshot refreshed every GLOBAL_AVERAGES_TIMEOUT seconds.
+    """
+    avg = cache.get(GLOBAL_AVERAGES_KEY)
+    if avg is None:
+        avg = Webapp.objects.aggregate(rating=Avg('average_rating'),
+                                       reviews=Avg('total_reviews'))
+        cache.set(GLOBAL_AVERAGES_KEY, avg, GLOBAL_AVERAGES_TIMEOUT)
+    return avg
+
+
 @task
 def addon_bayesian_rating(*addons, **kw):
     log.info('[%s@%s] Updating bayesian ratings.' %
              (len(addons), addon_bayesian_rating.rate_limit))
 
-    avg = Webapp.objects.aggregate(rating=Avg('average_rating'),
-                                   reviews=Avg('total_reviews'))
+    avg = get_global_averages()
     # Rating can be NULL in the DB, so don't update it if it's not there.
     if avg['rating'] is None:
         return
     mc = avg['reviews'] * avg['rating']
-    for addon in Webapp.objects.filter(id__in=addons):
-        if addon.average_rating is None:
-            # Ignoring addons with no average rating.
-            continue
-
-        q = Webapp.objects.filter(id=addon.id)
-        if addon.total_reviews:
-            num = mc + F('total_reviews') * F('average_rating')
-            denom = avg['reviews'] + F('total_reviews')
-            q.update(bayesian_rating=num / denom)
-        else:
-            q.update(bayesian_rating=0)
+    num = mc + F('total_reviews') * F('average_rating')
+    denom = avg['reviews'] + F('total_reviews')
+    # Ignoring addons with no average rating.
+    (Webapp.objects.filter(id__in=addons, average_rating__isnull=False)
+     .update(bayesian_rating=Case(
+         When(total_reviews__gt=0,
+              then=ExpressionWrapper(num / denom, output_field=FloatField())),
+         default=Value(0), output_field=FloatField())))
@@ -0,0 +1,38 @@
+from nose.tools import eq_
+
+import mkt.site.tests
+from mkt.ratings.tasks import addon_bayesian_rating
+from mkt.webapps.models import Webapp
+
+
+class TestBayesianRating(mkt.site.tests.TestCase):
+
+    def setUp(self):
+        self.app1 = mkt.site.tests.app_factory(average_rating=4,
+                                               total_reviews=2)
+        self.app2 = mkt.site.tests.app_factory(average_rating=2,
+                                               total_reviews=4)
+        self.app3 = mkt.site.tests.app_factory(average_rating=0,
+                                               total_reviews=0)
+
+    def bayesian_rating(self, app):
+        return Webapp.objects.get(pk=app.pk).bayesian_rating
+
+    def test_bayesian_rating(self):
+        # The average rating is 2 and the average review count 2.
+        with self.assertNumQueries(2):
+            addon_bayesian_rating(self.app1.pk, self.app2.pk, self.app3.pk)
+        self.assertAlmostEqual(self.bayesian_rating(self.app1),
+                               (2 * 2 + 2 * 4) / 4.)
+        self.assertAlmostEqual(self.bayesian_rating(self.app2),
+                               (2 * 2 + 4 * 2) / 6.)
+        eq_(self.bayesian_rating(self.app3), 0)
+
+    def test_global_averages_cached(self):
+        addon_bayesian_rating(self.app1.pk)
+        self.app2.update(average_rating=5)
+        with self.assertNumQueries(1):
+            addon_bayesian_rating(self.app1.pk)
+        # The averages of all the apps are the ones from the first run.
+        self.assertAlmostEqual(self.bayesian_rating(self.app1),
+                               (2 * 2 + 2 * 4) / 4.)
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import calendar
+import json
 import time
 import uuid
 from urllib import urlencode
@@ -20,6 +21,7 @@ import mkt.site.tests
 from mkt.inapp.models import InAppProduct
 from mkt.prices.models import AddonPurchase, Price
 from mkt.purchase.models import Contribution
+from mkt.purchase.tasks import forget_verified_purchases
 from mkt.receipts.utils import create_receipt, create_receipt_data
 from mkt.site.fixtures import fixture
 from mkt.users.models import UserProfile
@@ -381,6 +383,227 @@ class TestVerify(ReceiptTest):
         assert ('Cache-Control', 'no-cache') in hdrs, 'No cache header needed'
 
 
+@mock.patch.object(utils.settings, 'WEBAPPS_RECEIPT_KEY',
+                   mkt.site.tests.MktPaths.sample_key())
+@mock.patch.object(settings, 'SITE_URL', 'http://foo.com/')
+@mock.patch.object(settings, 'WEBAPPS_RECEIPT_URL', '/verifyme/')
+class TestVerifyBatch(ReceiptTest):
+
+    def setUp(self):
+        super(TestVerifyBatch, self).setUp()
+        self.app.update(premium_type=mkt.ADDON_PREMIUM)
+
+    @mock.patch.object(verify, 'decode_receipt')
+    def verify_receipts_data(self, receipts_data, decode_receipt):
+        # The receipts passed in are indexes into the unsigned receipt data
+        # that the decoder spits out.
+        decode_receipt.side_effect = lambda index: receipts_data[int(index)]
+        verifier = verify.VerifyBatch(
+            [str(index) for index in range(len(receipts_data))],
+            RequestFactory().get('/verifyme/').META
+        )
+        verifier.cursor = connection.cursor()
+        return verifier.check_full()
+
+    def make_inapp_contribution(self, type=mkt.CONTRIB_PURCHASE):
+        return Contribution.objects.create(
+            addon=self.app,
+            inapp_product=self.inapp,
+            type=type,
+            user=self.user,
+        )
+
+    def test_order(self):
+        AddonPurchase.objects.create(addon=self.app, user=self.user,
+                                     uuid='some-uuid')
+        refunded = self.make_inapp_contribution(type=mkt.CONTRIB_REFUND)
+        bought = self.make_inapp_contribution()
+        no_user = self.sample_app_receipt()
+        del no_user['user']
+        not_bought = self.sample_app_receipt()
+        not_bought['user']['value'] = 'other-uuid'
+
+        res = self.verify_receipts_data([
+            self.sample_inapp_receipt(refunded),
+            self.sample_app_receipt(),
+            no_user,
+            self.sample_inapp_receipt(bought),
+            not_bought,
+        ])
+        eq_([r['status'] for r in res],
+            ['refunded', 'ok', 'invalid', 'ok', 'invalid'])
+        eq_(res[2]['reason'], 'NO_DIRECTED_IDENTIFIER')
+        eq_(res[4]['reason'], 'NO_PURCHASE')
+
+    def test_one_query_per_flavour(self):
+        AddonPurchase.objects.create(addon=self.app, user=self.user,
+                                     uuid='some-uuid')
+        receipts = [self.sample_app_receipt() for i in range(5)]
+        receipts += [self.sample_inapp_receipt(
+            self.make_inapp_contribution()) for i in range(5)]
+        with self.assertNumQueries(2):
+            res = self.verify_receipts_data(receipts)
+        eq_([r['status'] for r in res], ['ok'] * 10)
+
+    def test_no_purchases_no_queries(self):
+        no_user = self.sample_app_receipt()
+        del no_user['user']
+        with self.assertNumQueries(0):
+            res = self.verify_receipts_data([no_user])
+        eq_(res[0]['status'], 'invalid')
+
+
+class TestLRUCache(mkt.site.tests.TestCase):
+
+    def test_get_set(self):
+        cache = utils.LRUCache('test', 2)
+        cache.set('a', 1, time.time() + 10)
+        eq_(cache.get('a'), 1)
+        eq_(cache.get('b'), None)
+
+    def test_expired(self):
+        cache = utils.LRUCache('test', 2)
+        cache.set('a', 1, time.time() - 1)
+        eq_(cache.get('a'), None)
+        with mock.patch('services.utils.time.time') as now:
+            cache.set('b', 2, 100)
+            now.return_value = 101
+            eq_(cache.get('b'), None)
+
+    def test_least_recently_used_dropped(self):
+        cache = utils.LRUCache('test', 2)
+        expires = time.time() + 10
+        cache.set('a', 1, expires)
+        cache.set('b', 2, expires)
+        cache.get('a')
+        cache.set('c', 3, expires)
+        eq_(cache.get('a'), 1)
+        eq_(cache.get('b'), None)
+        eq_(cache.get('c'), 3)
+
+    def test_disabled(self):
+        cache = utils.LRUCache('test', 0)
+        cache.set('a', 1, time.time() + 10)
+        eq_(cache.get('a'), None)
+
+    @mock.patch('services.utils.statsd.incr')
+    def test_statsd(self, incr):
+        cache = utils.LRUCache('test', 2)
+        cache.set('a', 1, time.time() + 10)
+        cache.get('a')
+        cache.get('b')
+        eq_([c[0][0] for c in incr.call_args_list],
+            ['services.cache.test.hit', 'services.cache.test.miss'])
+
+
+@mock.patch.object(settings, 'SITE_URL', 'http://foo.com/')
+@mock.patch.object(settings, 'WEBAPPS_RECEIPT_URL', '/verifyme/')
+class TestVerifyCache(ReceiptTest):
+
+    def setUp(self):
+        super(TestVerifyCache, self).setUp()
+        self.app.update(premium_type=mkt.ADDON_PREMIUM)
+        # The caches are disabled in the test settings.
+        for name in ('decoded_cache', 'purchase_cache'):
+            patcher = mock.patch.object(verify, name,
+                                        utils.LRUCache(name, 10))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def verify_receipt_data(self, receipt_data):
+        with mock.patch.object(verify, 'crack_receipt') as crack_receipt:
+            crack_receipt.return_value = receipt_data
+            verifier = verify.Verify('receipt',
+                                     RequestFactory().get('/verifyme/').META)
+            verifier.cursor = connection.cursor()
+            return verifier.check_full()
+
+    def verify_batch_data(self, receipt_data):
+        with mock.patch.object(verify, 'crack_receipt') as crack_receipt:
+            crack_receipt.return_value = receipt_data
+            batch = verify.VerifyBatch(
+                ['receipt'], RequestFactory().get('/verifyme/').META)
+            batch.cursor = connection.cursor()
+            return batch.check_full()[0]
+
+    @mock.patch.object(verify, 'crack_receipt')
+    def test_decode_cached(self, crack_receipt):
+        crack_receipt.return_value = {'exp': time.time() + 100}
+        first = verify.decode_receipt('receipt')
+        first['exp'] = 0
+        eq_(verify.decode_receipt('receipt'), crack_receipt.return_value)
+        eq_(crack_receipt.call_count, 1)
+
+    @mock.patch.object(verify, 'crack_receipt')
+    def test_decode_expired_not_cached(self, crack_receipt):
+        crack_receipt.return_value = {'exp': time.time() - 100}
+        verify.decode_receipt('receipt')
+        verify.decode_receipt('receipt')
+        eq_(crack_receipt.call_count, 2)
+
+    def test_purchase_cached(self):
+        AddonPurchase.objects.create(addon=self.app, user=self.user,
+                                     uuid='some-uuid')
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'ok')
+        with self.assertNumQueries(0):
+            eq_(self.verify_receipt_data(
+                self.sample_app_receipt())['status'], 'ok')
+
+    def test_no_purchase_not_cached(self):
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['reason'],
+            'NO_PURCHASE')
+        AddonPurchase.objects.create(addon=self.app, user=self.user,
+                                     uuid='some-uuid')
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'ok')
+
+    def test_refund_invalidates_app_purchase(self):
+        purchase = AddonPurchase.objects.create(addon=self.app,
+                                                user=self.user,
+                                                uuid='some-uuid')
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'ok')
+        purchase.update(type=mkt.CONTRIB_REFUND)
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'refunded')
+
+    def test_refund_in_another_process(self):
+        AddonPurchase.objects.create(addon=self.app, user=self.user,
+                                     uuid='some-uuid')
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'ok')
+        # The change doesn't go through this process' cache, only through
+        # the marker the marketplace sets once it's committed.
+        AddonPurchase.objects.filter(addon=self.app).update(
+            type=mkt.CONTRIB_REFUND)
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'ok')
+        forget_verified_purchases([('app', self.app.pk, 'some-uuid')])
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'refunded')
+
+    def test_refund_in_another_process_batch(self):
+        AddonPurchase.objects.create(addon=self.app, user=self.user,
+                                     uuid='some-uuid')
+        receipt = self.sample_app_receipt()
+        eq_(self.verify_batch_data(receipt)['status'], 'ok')
+        AddonPurchase.objects.filter(addon=self.app).update(
+            type=mkt.CONTRIB_REFUND)
+        eq_(self.verify_batch_data(receipt)['status'], 'ok')
+        forget_verified_purchases([('app', self.app.pk, 'some-uuid')])
+        eq_(self.verify_batch_data(receipt)['status'], 'refunded')
+
+    def test_refund_invalidates_inapp_purchase(self):
+        contribution = Contribution.objects.create(
+            addon=self.app, inapp_product=self.inapp, user=self.user,
+            type=mkt.CONTRIB_PURCHASE)
+        receipt = self.sample_inapp_receipt(contribution)
+        eq_(self.verify_receipt_data(receipt)['status'], 'ok')
+        contribution.update(type=mkt.CONTRIB_CHARGEBACK)
+        eq_(self.verify_receipt_data(receipt)['status'], 'refunded')
+
+
 class TestBase(mkt.site.tests.TestCase):
 
     def create(self, data, request=None):
@@ -456,3 +679,31 @@ class TestServices(mkt.site.tests.TestCase):
         eq_(data['headers']['Access-Control-Allow-Headers'],
             'content-type, x-fxpay-version')
         eq_(data['headers']['Content-Length'], '0')
+
+    def post(self, body):
+        data = {}
+        req = RequestFactory().post('/verify', body,
+                                    content_type='application/json')
+
+        def start_response(status, wsgi_headers):
+            data['status'] = status
+
+        data['body'] = verify.application(req.META, start_response)[0]
+        return data
+
+    def test_batch_not_json(self):
+        eq_(self.post('[receipt')['status'], '400 Bad Request')
+
+    def test_batch_not_receipts(self):
+        eq_(self.post('[1, 2]')['status'], '400 Bad Request')
+
+    @mock.patch.object(utils.settings, 'WEBAPPS_RECEIPT_BATCH_MAX', 1)
+    def test_batch_too_large(self):
+        eq_(self.post('["a", "b"]')['status'], '400 Bad Request')
+
+    @mock.patch.object(verify.VerifyBatch, 'check_full')
+    def test_batch(self, check_full):
+        check_full.return_value = [{'status': 'ok'}, {'status': 'invalid'}]
+        data = self.post('["a", "b"]')
+        eq_(data['status'], '200 OK')
+        eq_(json.loads(data['body']), check_full.return_value)
@@ -9,8 +9,9 @@ import commonware.log
 import mkt
 import mkt.constants.comm as comm
 from mkt.comm.utils import create_comm_note
+from mkt.files.models import File
 from mkt.site.models import ModelBase
-from mkt.site.utils import cache_ns_key
+from mkt.site.utils import cache_ns_get, cache_ns_key
 from mkt.translations.fields import save_signal, TranslatedField
 from mkt.users.models import UserProfile
 from mkt.webapps.indexers import WebappIndexer
@@ -20,6 +21,7 @@ from mkt.websites.models import Website
 
 user_log = commonware.log.getLogger('z.users')
 QUEUE_TARAKO = 'tarako'
+QUEUE_STATS_NAMESPACE = 'reviewers:queue-stats'
 SHOWCASE_TAG = 'nominated'
 
 
@@ -55,17 +57,26 @@ class ReviewerScore(ModelBase):
         db_table = 'reviewer_scores'
         ordering = ('-created',)
 
+    cache_namespace = 'riscore'
+
     @classmethod
     def get_key(cls, key=None, invalidate=False):
-        namespace = 'riscore'
         if not key:  # Assuming we're invalidating the namespace.
-            cache_ns_key(namespace, invalidate)
+            cache_ns_key(cls.cache_namespace, invalidate)
             return
         else:
             # Using cache_ns_key so each cache val is invalidated together.
-            ns_key = cache_ns_key(namespace, invalidate)
+            ns_key = cache_ns_key(cls.cache_namespace, invalidate)
             return '%s:%s' % (ns_key, key)
 
+    @classmethod
+    def get_cached(cls, key):
+        """
+        Returns the (cache key, value) of `key`, the value being None if it
+        isn't cached. See `mkt.site.utils.cache_ns_get`.
+        """
+        return cache_ns_get(cls.cache_namespace, key)
+
     @classmethod
     def get_event(cls, addon, status, **kwargs):
         """Return the review event type constant.
@@ -168,8 +179,7 @@ class ReviewerScore(ModelBase):
     @classmethod
     def get_total(cls, user):
         """Returns total points by user."""
-        key = cls.get_key('get_total:%s' % user.id)
-        val = cache.get(key)
+        key, val = cls.get_cached('get_total:%s' % user.id)
         if val is not None:
             return val
 
@@ -185,8 +195,7 @@ class ReviewerScore(ModelBase):
     @classmethod
     def get_recent(cls, user, limit=5):
         """Returns most recent ReviewerScore records."""
-        key = cls.get_key('get_recent:%s' % user.id)
-        val = cache.get(key)
+        key, val = cls.get_cached('get_recent:%s' % user.id)
         if val is not None:
             return val
 
@@ -199,8 +208,7 @@ class ReviewerScore(ModelBase):
     @classmethod
     def get_performance(cls, user):
         """Returns sum of reviewer points."""
-        key = cls.get_key('get_performance:%s' % user.id)
-        val = cache.get(key)
+        key, val = cls.get_cached('get_performance:%s' % user.id)
         if val is not None:
             return val
 
@@ -221,9 +229,8 @@ class ReviewerScore(ModelBase):
         """
         Returns sum of reviewer points since the given datetime.
         """
-        key = cls.get_key('get_performance:%s:%s' % (
+        key, val = cls.get_cached('get_performance:%s:%s' % (
             user.id, since.isoformat()))
-        val = cache.get(key)
         if val is not None:
             return val
 
@@ -275,8 +282,7 @@ class ReviewerScore(ModelBase):
         elements instead of the normal 3.
 
         """
-        key = cls.get_key('get_leaderboards:%s' % user.id)
-        val = cache.get(key)
+        key, val = cls.get_cached('get_leaderboards:%s' % user.id)
         if val is not None:
             return val
 
@@ -410,6 +416,11 @@ def update_search_index(sender, instance, **kwargs):
     WebappIndexer.index_ids([instance.addon_id])
 
 
+def invalidate_queue_stats(sender=None, **kwargs):
+    """Drop the cached reviewer queue counts and progress."""
+    cache_ns_key(QUEUE_STATS_NAMESPACE, increment=True)
+
+
 for model in (RereviewQueue, EscalationQueue):
     models.signals.post_save.connect(
         update_search_index, sender=model,
@@ -417,3 +428,24 @@ for model in (RereviewQueue, EscalationQueue):
     models.signals.post_delete.connect(
         update_search_index, sender=model,
         dispatch_uid='%s-delete-update-index' % model._meta.model_name)
+
+
+# Files are created pending when a new version is uploaded, and leave the
+# queues when they are reviewed.
+for model in (RereviewQueue, EscalationQueue, File):
+    models.signals.post_save.connect(
+        invalidate_queue_stats, sender=model,
+        dispatch_uid='%s-save-queue-stats' % model._meta.model_name)
+    models.signals.post_delete.connect(
+        invalidate_queue_stats, sender=model,
+        dispatch_uid='%s-delete-queue-stats' % model._meta.model_name)
+
+
+@Webapp.on_change
+def watch_queue_stats(old_attr={}, new_attr={}, instance=None, sender=None,
+                      **kw):
+    """Drop the cached queue counts when an app enters or leaves queues."""
+    for attr in ('status', 'disabled_by_user'):
+        if attr in new_attr and new_attr[attr] != old_attr.get(attr):
+            invalidate_queue_stats()
+            return
@@ -288,6 +288,31 @@ class TestReviewersHome(AppReviewerTest, AccessMixin):
         self.assertAlmostEqual(percentages['updates']['old'], 33.333333333333)
         self.assertAlmostEqual(percentages['updates']['med'], 33.333333333333)
 
+    def test_progress_one_query_per_queue(self):
+        with self.assertNumQueries(5):
+            counts, percentages = _progress()
+        eq_(counts['pending']['total'], 3)
+        eq_(counts['rereview']['total'], 1)
+        eq_(counts['escalated']['total'], 1)
+
+    @override_settings(REVIEWER_QUEUE_STATS_CACHE_TIMEOUT=60)
+    def test_progress_cached(self):
+        eq_(_progress()[0]['pending']['total'], 3)
+        with self.assertNumQueries(0):
+            eq_(_progress()[0]['pending']['total'], 3)
+        # Disabling an app makes it leave the queue and drops the cache.
+        self.apps[0].update(disabled_by_user=True)
+        eq_(_progress()[0]['pending']['total'], 2)
+
+    @override_settings(REVIEWER_QUEUE_STATS_CACHE_TIMEOUT=60)
+    def test_queue_counts_cached(self):
+        helper = ReviewersQueuesHelper()
+        eq_(helper.get_queue_counts()['rereview'], 1)
+        with self.assertNumQueries(0):
+            eq_(helper.get_queue_counts()['rereview'], 1)
+        RereviewQueue.objects.create(addon=self.apps[0])
+        eq_(helper.get_queue_counts()['rereview'], 2)
+
     def test_stats_waiting(self):
         self.apps[0].latest_version.update(nomination=self.days_ago(1))
         self.apps[1].latest_version.update(nomination=self.days_ago(5))
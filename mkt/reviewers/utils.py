@@ -5,7 +5,8 @@ from datetime import datetime
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Q
+from django.db.models import (Case, Count, IntegerField, Q, Sum, Value,
+                              When)
 from django.utils.translation import ugettext_lazy as _lazy
 
 import commonware.log
@@ -19,10 +20,12 @@ from mkt.comm.utils import create_comm_note
 from mkt.constants import comm
 from mkt.files.models import File
 from mkt.ratings.models import Review
-from mkt.reviewers.models import EscalationQueue, RereviewQueue, ReviewerScore
+from mkt.reviewers.models import (EscalationQueue, QUEUE_STATS_NAMESPACE,
+                                  RereviewQueue, ReviewerScore)
 from mkt.site.helpers import product_as_dict
 from mkt.site.models import manual_order
-from mkt.site.utils import cached_property, JSONEncoder
+from mkt.site.utils import (cache_ns_get, cached_property, days_ago,
+                            JSONEncoder)
 from mkt.translations.query import order_by_translation
 from mkt.versions.models import Version
 from mkt.webapps.models import Webapp
@@ -781,6 +784,109 @@ class ReviewersQueuesHelper(object):
 
         return Website.objects.filter(id__in=report_ids).order_by('created')
 
+    def _cached(self, name, compute):
+        """
+        Return the cached result of `compute()`, dropped by
+        `mkt.reviewers.models.invalidate_queue_stats` or after
+        settings.REVIEWER_QUEUE_STATS_CACHE_TIMEOUT seconds.
+        """
+        timeout = settings.REVIEWER_QUEUE_STATS_CACHE_TIMEOUT
+        if not timeout:
+            return compute()
+        key, rv = cache_ns_get(QUEUE_STATS_NAMESPACE, name)
+        if rv is None:
+            rv = compute()
+            cache.set(key, rv, timeout)
+        return rv
+
+    def get_progress(self):
+        """
+        Return how many items of each app queue were added in the last 5
+        days (new), 5 to 10 days ago (med), more than 10 days ago (old), in
+        the last week (week), and in total.
+
+        Each queue is aggregated in a single query instead of counting every
+        period separately.
+        """
+        return self._cached('progress', self._get_progress)
+
+    def _get_progress(self):
+        queues = {
+            'pending': (self.get_pending_queue, 'nomination'),
+            'homescreen': (self.get_homescreen_queue, 'nomination'),
+            'rereview': (self.get_rereview_queue, 'created'),
+            'escalated': (self.get_escalated_queue, 'created'),
+            'updates': (self.get_updates_queue, 'nomination'),
+        }
+        periods = {
+            'new': ('gt', days_ago(5)),
+            'med': ('range', (days_ago(10), days_ago(5))),
+            'old': ('lt', days_ago(10)),
+            'week': ('gte', days_ago(7)),
+        }
+
+        progress = {}
+        for name, (get_queue, field) in queues.items():
+            aggregates = dict(
+                (period, Sum(Case(When(then=Value(1), **{
+                    '%s__%s' % (field, operator): value}),
+                    default=Value(0), output_field=IntegerField())))
+                for period, (operator, value) in periods.items())
+            aggregates['total'] = Count('id')
+            # Sum() is None on an empty queue.
+            progress[name] = dict(
+                (k, v or 0) for k, v in
+                get_queue().order_by().aggregate(**aggregates).items())
+        return progress
+
+    def get_queue_counts(self):
+        """Return how many items there are in each reviewer queue."""
+        if self.use_es:
+            return self._cached('es-counts', self._get_queue_counts_es)
+        return self._cached('counts', self._get_queue_counts)
+
+    def _get_other_queue_counts(self):
+        return {
+            'moderated': self.get_moderated_queue().count(),
+            'abuse': self.get_abuse_queue().count(),
+            'abusewebsites': self.get_abuse_queue_websites().count(),
+        }
+
+    def _get_queue_counts(self):
+        counts = dict((name, progress['total']) for name, progress in
+                      self.get_progress().items())
+        counts.update(self._get_other_queue_counts())
+        return counts
+
+    def _get_queue_counts_es(self):
+        # The app queues are counted with one aggregation each, in a single
+        # request to both the apps and homescreens indexes. The queues that
+        # only search one of them are restricted to its type.
+        queues = {
+            'pending': (self.get_pending_queue, ['webapp']),
+            'homescreen': (self.get_homescreen_queue, ['homescreen']),
+            'rereview': (self.get_rereview_queue, ['webapp', 'homescreen']),
+            'escalated': (self.get_escalated_queue,
+                          ['webapp', 'homescreen']),
+            'updates': (self.get_updates_queue, ['webapp']),
+        }
+        aggs = {}
+        for name, (get_queue, types) in queues.items():
+            aggs[name] = {'filter': {'bool': {'must': [
+                {'terms': {'_type': types}},
+                {'query': get_queue().to_dict()['query']},
+            ]}}}
+
+        res = WebappIndexer.get_es().search(
+            index=[settings.ES_INDEXES['webapp'],
+                   settings.ES_INDEXES['homescreen']],
+            doc_type=['webapp', 'homescreen'],
+            body={'size': 0, 'aggs': aggs})
+        counts = dict((name, res['aggregations'][name]['doc_count'])
+                      for name in queues)
+        counts.update(self._get_other_queue_counts())
+        return counts
+
     def sort(self, qs, date_sort='created'):
         """Given a queue queryset, return the sorted version."""
         if self.use_es:
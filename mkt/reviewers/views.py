@@ -61,9 +61,9 @@ from mkt.search.views import SearchView
 from mkt.site.decorators import json_view, login_required, permission_required
 from mkt.site.helpers import absolutify, product_as_dict
 from mkt.site.mail import send_mail
-from mkt.site.utils import (JSONEncoder, days_ago, escape_all,
-                            get_file_response, paginate, redirect_for_login,
-                            render, smart_decode)
+from mkt.site.utils import (JSONEncoder, escape_all, get_file_response,
+                            paginate, redirect_for_login, render,
+                            smart_decode)
 from mkt.submit.forms import AppFeaturesForm
 from mkt.tags.models import Tag
 from mkt.users.models import UserProfile
@@ -149,17 +149,7 @@ def home(request):
 def queue_counts(request):
     use_es = waffle.switch_is_active('reviewer-tools-elasticsearch')
     queues_helper = ReviewersQueuesHelper(use_es=use_es)
-
-    counts = {
-        'pending': queues_helper.get_pending_queue().count(),
-        'rereview': queues_helper.get_rereview_queue().count(),
-        'updates': queues_helper.get_updates_queue().count(),
-        'escalated': queues_helper.get_escalated_queue().count(),
-        'moderated': queues_helper.get_moderated_queue().count(),
-        'abuse': queues_helper.get_abuse_queue().count(),
-        'abusewebsites': queues_helper.get_abuse_queue_websites().count(),
-        'homescreen': queues_helper.get_homescreen_queue().count(),
-    }
+    counts = queues_helper.get_queue_counts()
 
     rv = {}
     if isinstance(type, basestring):
@@ -178,39 +168,8 @@ def _progress():
     """
 
     queues_helper = ReviewersQueuesHelper()
-
-    base_filters = {
-        'pending': (queues_helper.get_pending_queue(),
-                    'nomination'),
-        'homescreen': (queues_helper.get_homescreen_queue(),
-                       'nomination'),
-        'rereview': (queues_helper.get_rereview_queue(),
-                     'created'),
-        'escalated': (queues_helper.get_escalated_queue(),
-                      'created'),
-        'updates': (queues_helper.get_updates_queue(),
-                    'nomination')
-    }
-
-    operators_and_values = {
-        'new': ('gt', days_ago(5)),
-        'med': ('range', (days_ago(10), days_ago(5))),
-        'old': ('lt', days_ago(10)),
-        'week': ('gte', days_ago(7))
-    }
-
-    types = base_filters.keys()
-    progress = {}
-
-    for t in types:
-        tmp = {}
-        base_query, field = base_filters[t]
-        for k in operators_and_values.keys():
-            operator, value = operators_and_values[k]
-            filter_ = {}
-            filter_['%s__%s' % (field, operator)] = value
-            tmp[k] = base_query.filter(**filter_).count()
-        progress[t] = tmp
+    progress = queues_helper.get_progress()
+    types = progress.keys()
 
     def pct(p, t):
         # Return the percent of (p)rogress out of (t)otal.
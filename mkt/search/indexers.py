@@ -1,5 +1,7 @@
+import itertools
 import logging
 import sys
+import time
 
 from django.conf import settings
 
@@ -18,6 +20,14 @@ from mkt.translations.utils import to_language
 
 log = logging.getLogger('z.task')
 
+# How many seconds to wait before sending documents Elasticsearch rejected
+# again. This doubles with every retry.
+BULK_RETRY_DELAY = 1
+
+# How many times the index task sends again the documents Elasticsearch
+# rejected because it is overloaded.
+INDEX_MAX_RETRIES = 2
+
 
 class BaseIndexer(object):
     """
@@ -27,6 +37,9 @@ class BaseIndexer(object):
     - get_mapping(cls)
     - extract_document(cls, pk=None, obj=None)
 
+    and can implement attach_related(cls, objs) to fetch the related objects
+    extract_document needs for many objects at once.
+
     """
     _es = {}
 
@@ -73,6 +86,14 @@ class BaseIndexer(object):
         cls._es[key] = es
         return es
 
+    @classmethod
+    def attach_related(cls, objs):
+        """
+        Attaches the related objects `extract_document` needs to all the
+        objects at once. By default, `extract_document` fetches them itself.
+        """
+        pass
+
     @classmethod
     def index(cls, document, id_=None, es=None, index=None):
         """Index one document."""
@@ -82,17 +103,52 @@ class BaseIndexer(object):
                  body=document, id=id_)
 
     @classmethod
-    def bulk_index(cls, documents, id_field='id', es=None, index=None):
-        """Index of a bunch of documents."""
+    def bulk_index(cls, documents, id_field='id', es=None, index=None,
+                   bulk_size=500, max_retries=0, indices=None):
+        """
+        Index of a bunch of documents.
+
+        Documents are sent `bulk_size` at a time, to `index` or to every
+        index in `indices`. The documents Elasticsearch rejects because it is
+        overloaded are sent again, up to `max_retries` times, waiting longer
+        each time.
+        """
         es = es or cls.get_es()
-        index = index or cls.get_index()
+        indices = indices or [index or cls.get_index()]
         type = cls.get_mapping_type_name()
 
         actions = [
-            {'_index': index, '_type': type, '_id': d['id'], '_source': d}
-            for d in documents]
-
-        helpers.bulk(es, actions)
+            {'_index': idx, '_type': type, '_id': d[id_field], '_source': d}
+            for idx in indices for d in documents]
+
+        def target(item):
+            index = item.get('_index')
+            if index not in indices and len(indices) == 1:
+                # Writing to an alias, the response names the index behind.
+                index = indices[0]
+            return index, str(item['_id'])
+
+        for attempt in itertools.count():
+            success, errors = helpers.bulk(es, actions, chunk_size=bulk_size,
+                                           raise_on_error=False)
+            if not errors:
+                return
+
+            # The same document can be rejected by several indices, only
+            # send it again to the ones that did.
+            rejected = set(target(item) for item in
+                           (error.values()[0] for error in errors)
+                           if item.get('status') == 429)
+            if attempt >= max_retries or len(rejected) < len(errors):
+                raise helpers.BulkIndexError(
+                    '%i document(s) failed to index.' % len(errors), errors)
+
+            delay = BULK_RETRY_DELAY * 2 ** attempt
+            log.info('Elasticsearch rejected %s documents, retrying in %ss'
+                     % (len(rejected), delay))
+            time.sleep(delay)
+            actions = [action for action in actions
+                       if (action['_index'], str(action['_id'])) in rejected]
 
     @classmethod
     def index_ids(cls, ids, no_delay=False):
@@ -301,10 +357,11 @@ class BaseIndexer(object):
 
         # Fetch QS given the IDs.
         docs = []
-        qs = cls.get_model().objects.filter(id__in=ids)
+        objs = list(cls.get_model().objects.filter(id__in=ids))
+        cls.attach_related(objs)
 
         # For each object, extract document.
-        for obj in qs:
+        for obj in objs:
             try:
                 docs.append(cls.extract_document(obj.id, obj=obj))
             except Exception as e:
@@ -313,7 +370,14 @@ class BaseIndexer(object):
 
         # Index.
         if docs:
-            cls.bulk_index(docs, es=ES, index=index or cls.get_index())
+            cls.bulk_index(docs, es=ES, index=index or cls.get_index(),
+                           **cls.get_bulk_options(kw))
+
+    @classmethod
+    def get_bulk_options(cls, kw):
+        """Returns the `bulk_index` options passed to `run_indexing`."""
+        return dict((k, kw[k]) for k in ('bulk_size', 'max_retries')
+                    if kw.get(k) is not None)
 
     @classmethod
     def attach_boost_mapping(cls, mapping):
@@ -513,7 +577,25 @@ def index(ids, indexer, **kw):
     indices = Reindexing.get_indices(indexer.get_index())
 
     es = indexer.get_es(urls=settings.ES_URLS)
-    for obj in indexer.get_indexable().filter(id__in=ids):
-        doc = indexer.extract_document(obj.id, obj)
-        for idx in indices:
-            indexer.index(doc, id_=obj.id, es=es, index=idx)
+    objs = list(indexer.get_indexable().filter(id__in=ids))
+    indexer.attach_related(objs)
+    docs = dict((str(obj.id), indexer.extract_document(obj.id, obj))
+                for obj in objs)
+    if not docs:
+        return
+
+    # Send everything in one request, to all the indices at once.
+    try:
+        indexer.bulk_index(docs.values(), es=es, indices=indices,
+                           max_retries=INDEX_MAX_RETRIES)
+    except helpers.BulkIndexError as e:
+        # Give the documents that failed one more chance on their own, so
+        # that one bad document doesn't keep the others out of the index.
+        for item in (error.values()[0] for error in e.errors):
+            try:
+                indexer.index(docs[item['_id']], id_=item['_id'], es=es,
+                              index=item['_index'])
+            except elasticsearch.ElasticsearchException:
+                log.exception('Failed to index {0} {1} into {2}.'.format(
+                    indexer.get_model()._meta.model_name, item['_id'],
+                    item['_index']))
@@ -1,7 +1,10 @@
+import mock
+from elasticsearch import helpers
 from nose.tools import eq_
 
-from mkt.search.indexers import BaseIndexer
-from mkt.site.tests import TestCase
+from mkt.search.indexers import BaseIndexer, index
+from mkt.site.tests import app_factory, TestCase
+from mkt.webapps.models import Webapp
 
 
 class TestBaseIndexer(TestCase):
@@ -13,3 +16,131 @@ class TestBaseIndexer(TestCase):
         es1 = self.indexer().get_es()
         es2 = self.indexer().get_es()
         eq_(id(es1), id(es2))
+
+
+def rejected(id_, index='things'):
+    return {'index': {'_id': str(id_), '_index': index, 'status': 429,
+                      'error': 'EsRejectedExecutionException'}}
+
+
+@mock.patch('mkt.search.indexers.time.sleep')
+@mock.patch('mkt.search.indexers.helpers.bulk')
+class TestBulkIndex(TestCase):
+
+    def bulk_index(self, **kw):
+        with mock.patch.object(BaseIndexer, 'get_mapping_type_name',
+                               return_value='things'):
+            BaseIndexer.bulk_index([{'id': 1}, {'id': 2}], es=mock.Mock(),
+                                   index='things', **kw)
+
+    def test_bulk_size(self, bulk, sleep):
+        bulk.return_value = (2, [])
+        self.bulk_index(bulk_size=50)
+        eq_(bulk.call_count, 1)
+        eq_(bulk.call_args[1]['chunk_size'], 50)
+
+    def test_retry_rejected(self, bulk, sleep):
+        bulk.side_effect = [(1, [rejected(2)]), (1, [])]
+        self.bulk_index(max_retries=1)
+        eq_(bulk.call_count, 2)
+        eq_([action['_id'] for action in bulk.call_args[0][1]], [2])
+        eq_(sleep.call_count, 1)
+
+    def test_retry_rejected_alias(self, bulk, sleep):
+        bulk.side_effect = [(1, [rejected(2, 'things_20150101')]), (1, [])]
+        self.bulk_index(max_retries=1)
+        eq_(bulk.call_count, 2)
+        eq_([action['_id'] for action in bulk.call_args[0][1]], [2])
+
+    def test_too_many_retries(self, bulk, sleep):
+        bulk.return_value = (1, [rejected(2)])
+        with self.assertRaises(helpers.BulkIndexError):
+            self.bulk_index(max_retries=2)
+        eq_(bulk.call_count, 3)
+        eq_([c[0][0] for c in sleep.call_args_list], [1, 2])
+
+    def test_other_errors_not_retried(self, bulk, sleep):
+        error = {'index': {'_id': '1', 'status': 400,
+                           'error': 'MapperParsingException'}}
+        bulk.return_value = (0, [error, rejected(2)])
+        with self.assertRaises(helpers.BulkIndexError):
+            self.bulk_index(max_retries=2)
+        eq_(bulk.call_count, 1)
+
+
+class FakeIndexer(BaseIndexer):
+
+    @classmethod
+    def get_model(cls):
+        return Webapp
+
+    @classmethod
+    def get_index(cls):
+        return 'things'
+
+    @classmethod
+    def get_mapping_type_name(cls):
+        return 'things'
+
+    @classmethod
+    def extract_document(cls, pk=None, obj=None):
+        return {'id': obj.id}
+
+
+@mock.patch('mkt.search.indexers.time.sleep')
+@mock.patch('mkt.search.indexers.helpers.bulk')
+class TestIndexTask(TestCase):
+
+    def setUp(self):
+        self.apps = [app_factory(), app_factory()]
+        self.ids = [app.id for app in self.apps]
+        self.es = mock.Mock()
+        for patcher in (
+                mock.patch.object(FakeIndexer, 'get_es', return_value=self.es),
+                mock.patch('mkt.search.indexers.Reindexing.get_indices',
+                           return_value=['new', 'old'])):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_one_request(self, bulk, sleep):
+        bulk.return_value = (4, [])
+        index(self.ids, FakeIndexer)
+        eq_(bulk.call_count, 1)
+        eq_(sorted((action['_index'], action['_id'])
+                   for action in bulk.call_args[0][1]),
+            sorted((idx, id_) for idx in ('new', 'old') for id_ in self.ids))
+        assert not self.es.index.called
+
+    def test_retry_failed_documents(self, bulk, sleep):
+        error = {'index': {'_id': str(self.ids[1]), '_index': 'old',
+                           'status': 400, 'error': 'MapperParsingException'}}
+        bulk.return_value = (3, [error])
+        index(self.ids, FakeIndexer)
+        eq_(bulk.call_count, 1)
+        self.es.index.assert_called_once_with(
+            index='old', doc_type='things', body={'id': self.ids[1]},
+            id=str(self.ids[1]))
+
+    def test_retry_rejected_documents(self, bulk, sleep):
+        bulk.side_effect = [(3, [rejected(self.ids[0], 'new')]), (2, [])]
+        index(self.ids, FakeIndexer)
+        eq_(bulk.call_count, 2)
+        eq_(set(action['_id'] for action in bulk.call_args[0][1]),
+            set([self.ids[0]]))
+        assert not self.es.index.called
+
+    def test_retry_rejected_by_both_indices(self, bulk, sleep):
+        errors = [rejected(self.ids[0], 'new'), rejected(self.ids[0], 'old')]
+        bulk.side_effect = [(2, errors), (2, [])]
+        index(self.ids, FakeIndexer)
+        eq_(bulk.call_count, 2)
+        eq_(sorted((action['_index'], action['_id'])
+                   for action in bulk.call_args[0][1]),
+            [('new', self.ids[0]), ('old', self.ids[0])])
+        assert not self.es.index.called
+
+    def test_retry_rejected_only_where_rejected(self, bulk, sleep):
+        bulk.side_effect = [(3, [rejected(self.ids[0], 'old')]), (1, [])]
+        index(self.ids, FakeIndexer)
+        eq_([(action['_index'], action['_id'])
+             for action in bulk.call_args[0][1]], [('old', self.ids[0])])
@@ -1,12 +1,13 @@
 from math import log10
 
 from mock import Mock
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 from mkt.constants.base import STATUS_REJECTED
 from mkt.site.tests import TestCase
 from mkt.site.utils import app_factory
-from mkt.search.utils import get_boost, get_popularity, get_trending
+from mkt.search.utils import (BackgroundSearch, get_boost, get_popularity,
+                              get_trending)
 from mkt.websites.utils import website_factory
 
 
@@ -71,3 +72,19 @@ class TestSearchUtils(TestCase):
         website = website_factory()
         website.popularity.create(region=0, value=1000.0)
         eq_(get_boost(website), log10(1 + 1000) * 4)
+
+
+class TestBackgroundSearch(TestCase):
+
+    def test_result(self):
+        search = Mock()
+        search.execute.return_value.hits = ['hit']
+        background = BackgroundSearch(search)
+        eq_(background.result(), ['hit'])
+        ok_(not background.is_alive())
+
+    def test_error(self):
+        search = Mock()
+        search.execute.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            BackgroundSearch(search).result()
@@ -1,3 +1,5 @@
+import sys
+import threading
 from math import log10
 
 from django.core.exceptions import ObjectDoesNotExist
@@ -20,6 +22,42 @@ class Search(dslSearch):
             return results
 
 
+class BackgroundSearch(threading.Thread):
+    """
+    Executes a search in a thread, so that other queries can be made while
+    Elasticsearch answers it. `result()` waits for the search to finish and
+    returns its hits, or raises what executing it raised.
+
+    Only the request is made in the thread: the hits should be serialized by
+    the caller, since translations and the like are thread-local.
+    """
+
+    def __init__(self, search, timer=None):
+        super(BackgroundSearch, self).__init__()
+        self.daemon = True
+        self.search = search
+        self.timer = timer
+        self.hits = None
+        self.exc_info = None
+        self.start()
+
+    def run(self):
+        try:
+            if self.timer:
+                with statsd.timer(self.timer):
+                    self.hits = self.search.execute().hits
+            else:
+                self.hits = self.search.execute().hits
+        except Exception:
+            self.exc_info = sys.exc_info()
+
+    def result(self):
+        self.join()
+        if self.exc_info:
+            raise self.exc_info[0], self.exc_info[1], self.exc_info[2]
+        return self.hits
+
+
 def _property_value_by_region(obj, region=None, property=None):
     if obj.is_dummy_content_for_qa():
         # Apps and Websites set up by QA for testing should never be considered
@@ -55,6 +55,11 @@ AUTHENTICATION_BACKENDS = ('django_browserid.auth.BrowserIDBackend',)
 
 CACHE_MIDDLEWARE_SECONDS = 60 * 3
 
+# How many seconds each process keeps the values of the cache_ns_key()
+# namespaces before fetching them from memcache again. Invalidating a
+# namespace in another process can take this long to be seen.
+CACHE_NS_LOCAL_TIMEOUT = 5
+
 # A non-standard setting, but moved up here so it can be accessed by
 # the CACHES settings.
 CACHE_PREFIX = 'marketplace:%s' % build_id
@@ -541,6 +546,11 @@ LANGUAGES = lazy(langs, dict)(AMO_LANGUAGES)
 # than this will include the `API-Status: Deprecated` header.
 API_CURRENT_VERSION = 1
 
+# How many seconds the user, secret and groups of OAuth consumer and access
+# token keys are cached. Revoking a key or changing the groups of its user
+# drops them right away.
+API_OAUTH_PRINCIPAL_CACHE_TIMEOUT = 60
+
 # When True, the API will return a full traceback when an exception occurs.
 API_SHOW_TRACEBACKS = False
 
@@ -717,6 +727,12 @@ ES_TIMEOUT = 30
 # When True include full tracebacks in JSON. This is useful for QA on preview.
 EXPOSE_VALIDATOR_TRACEBACKS = True
 
+# How many seconds the feed responses are cached for. They are dropped, and
+# built again for firefoxos in the default language, as soon as a feed element
+# or item is indexed, but not when the apps they show change. Set to 0 to
+# disable the cache.
+FEED_CACHE_TIMEOUT = 60 * 10
+
 # The maximum file size that is shown inside the file viewer.
 FILE_VIEWER_SIZE_LIMIT = 1048576
 
@@ -781,6 +797,13 @@ os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 GEOIP_URL = ''
 GEOIP_DEFAULT_VAL = 'restofworld'
 GEOIP_DEFAULT_TIMEOUT = .2
+# Path to a local CSV file of IP ranges and their country codes, looked up
+# before calling the GeoIP server. It is reloaded when it changes, which is
+# checked every GEOIP_DATABASE_CHECK_INTERVAL seconds. The last
+# GEOIP_CACHE_SIZE addresses looked up are kept in memory.
+GEOIP_DATABASE = ''
+GEOIP_DATABASE_CHECK_INTERVAL = 60
+GEOIP_CACHE_SIZE = 10000
 
 # Credentials for accessing Google Analytics stats.
 GOOGLE_ANALYTICS_CREDENTIALS = {}
@@ -917,6 +940,14 @@ MAX_REVIEW_ATTACHMENT_UPLOAD_SIZE = 5 * 1024 * 1024
 MAX_WEBAPP_UPLOAD_SIZE = 2 * 1024 * 1024
 MAX_VIDEO_UPLOAD_SIZE = 4 * 1024 * 1024
 
+# How many hosted app manifests update_manifests fetches at once, overall and
+# from any single host.
+MANIFEST_FETCH_CONCURRENCY = 20
+MANIFEST_FETCH_HOST_CONCURRENCY = 2
+# How long to remember the ETag/Last-Modified of hosted app manifests, to
+# make their next fetch conditional. 0 to disable.
+MANIFEST_VALIDATORS_TIMEOUT = 60 * 60 * 24 * 7
+
 # In-app product images are required to be this size in pixels (squared).
 REQUIRED_INAPP_IMAGE_SIZE = 64
 
@@ -944,6 +975,9 @@ MINIFY_MOZMARKET = True
 MONOLITH_SERVER = os.getenv('MONOLITH_URL', 'http://localhost:9200')
 MONOLITH_INDEX = 'time_*'
 MONOLITH_MAX_DATE_RANGE = 365
+# How many seconds the on-the-fly stats of ranges ending today or earlier
+# are cached for.
+MONOLITH_STATS_CACHE_TIMEOUT = 60 * 60 * 24
 
 # The issuer for unverified Persona email addresses.
 # We only trust one issuer to grant us unverified emails.
@@ -1039,6 +1073,12 @@ REST_FRAMEWORK = {
     'PAGE_SIZE_QUERY_PARAM': 'limit'
 }
 
+# How many seconds the reviewer queue counts and progress are cached for.
+# They are dropped whenever an app enters or leaves a queue, but reviews
+# flagged for moderation and abuse reports are only picked up once it
+# expires. Set to 0 to disable the cache.
+REVIEWER_QUEUE_STATS_CACHE_TIMEOUT = 60
+
 RTL_LANGUAGES = ('ar', 'fa', 'fa-IR', 'he')
 
 # Flip this on in your local settings to disable ES tests.
@@ -1055,6 +1095,12 @@ SENTRY_DSN = None
 # database connection, only some values are supported.
 SERVICES_DATABASE = DATABASES['default']
 
+# The connection pool the services scripts keep to SERVICES_DATABASE. When the
+# receipt verifier runs on gevent (see services/wsgi/receiptverify_gevent.py)
+# each process serves many requests at once, so raise these to match.
+SERVICES_DATABASE_POOL_SIZE = 5
+SERVICES_DATABASE_POOL_MAX_OVERFLOW = 10
+
 SHORTER_LANGUAGES = {'en': 'en-US', 'ga': 'ga-IE', 'pt': 'pt-PT',
                      'sv': 'sv-SE', 'zh': 'zh-CN'}
 
@@ -1148,6 +1194,11 @@ TEST_RUNNER = 'django_nose.NoseTestSuiteRunner'
 TOTEM_BINARIES = {'thumbnailer': 'totem-video-thumbnailer',
                   'indexer': 'totem-video-indexer'}
 
+# How many seconds the translations transformer caches translations for.
+# Saving or deleting a translation drops it from the cache, during the request
+# and again once it is committed. Set to 0 to disable the cache.
+TRANSLATIONS_CACHE_TIMEOUT = 60 * 60
+
 # Path to uglifyjs (our JS minifier).
 UGLIFY_BIN = os.getenv('UGLIFY_BIN',
                        path('node_modules/uglify-js/bin/uglifyjs'))
@@ -1178,6 +1229,19 @@ VIDEO_LIBRARIES = ['lib.video.totem', 'lib.video.ffmpeg']
 # Default app name for our webapp as specified in `manifest.webapp`.
 WEBAPP_MANIFEST_NAME = 'Marketplace'
 
+# The maximum number of receipts that can be verified in one batch request.
+WEBAPPS_RECEIPT_BATCH_MAX = 50
+
+# The number of decoded receipts the receipt verifier keeps in memory. Each
+# decoded receipt is kept until it expires.
+WEBAPPS_RECEIPT_DECODE_CACHE_SIZE = 10000
+
+# The number of purchase lookups the receipt verifier keeps in memory and for
+# how many seconds. Changes to purchases, refunds for instance, are seen right
+# away through markers in memcache, unless memcache is unavailable.
+WEBAPPS_RECEIPT_PURCHASE_CACHE_SIZE = 10000
+WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT = 60
+
 # Send a new receipt back when it expires.
 WEBAPPS_RECEIPT_EXPIRED_SEND = False
 
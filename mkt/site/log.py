@@ -1,3 +1,5 @@
+import functools
+import threading
 from inspect import isclass
 
 from celery.datastructures import AttributeDict
@@ -6,6 +8,8 @@ from django.utils.translation import ugettext_lazy as _
 
 __all__ = ('LOG', 'LOG_BY_ID', 'LOG_KEEP',)
 
+_local = threading.local()
+
 
 class _LOG(object):
     action_class = None
@@ -738,19 +742,48 @@ LOG_HIDE_DEVELOPER = [l.id for l in LOGS
                           l.id in LOG_ADMINS)]
 
 
+class log_buffer(object):
+    """
+    Collect the activity logs created with `mkt.log()` and write them all at
+    once when leaving the block, or the decorated function, instead of one
+    INSERT per log and per index row. Nothing is written if it raises.
+
+    e.g. with mkt.log_buffer():
+             for review in reviews:
+                 mkt.log(mkt.LOG.DELETE_REVIEW, review.addon, review)
+
+    `mkt.log()` returns None for buffered logs. Pass `buffer=False` to it to
+    write a log immediately and get it back.
+    """
+
+    def __enter__(self):
+        # Nested buffers are flushed by the outermost one.
+        self.outermost = getattr(_local, 'log_buffer', None) is None
+        if self.outermost:
+            _local.log_buffer = []
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.outermost:
+            entries, _local.log_buffer = _local.log_buffer, None
+            if exc_type is None:
+                write_logs(entries)
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kw):
+            with self.__class__():
+                return func(*args, **kw)
+        return wrapper
+
+
 def log(action, *args, **kw):
     """
     e.g. mkt.log(mkt.LOG.CREATE_ADDON, []),
          mkt.log(mkt.LOG.ADD_FILE_TO_VERSION, file, version)
     """
     from mkt import get_user
-    from mkt.developers.models import (ActivityLog, AppLog, CommentLog,
-                                       GroupLog, UserLog, VersionLog)
-    from mkt.access.models import Group
+    from mkt.developers.models import ActivityLog
     from mkt.site.utils import log as logger_log
-    from mkt.webapps.models import Webapp
-    from mkt.users.models import UserProfile
-    from mkt.versions.models import Version
 
     user = kw.get('user', get_user())
 
@@ -762,38 +795,75 @@ def log(action, *args, **kw):
     al.arguments = args
     if 'details' in kw:
         al.details = kw['details']
-    al.save()
 
-    if 'details' in kw and 'comments' in al.details:
-        CommentLog(comments=al.details['comments'], activity_log=al).save()
+    entry = (al, args, user, kw)
+    buffer_ = getattr(_local, 'log_buffer', None)
+    if buffer_ is not None and kw.get('buffer', True):
+        buffer_.append(entry)
+        return
+
+    write_logs([entry])
+    return al
+
 
-    # TODO(davedash): post-remora this may not be necessary.
-    if 'created' in kw:
-        al.created = kw['created']
-        # Double save necessary since django resets the created date on save.
+def write_logs(entries):
+    """
+    Save the (activity log, arguments, user, log() keyword arguments)
+    entries, and index them by app, version, user and group with one INSERT
+    per index table.
+    """
+    from mkt.developers.models import (ActivityLog, AppLog, CommentLog,
+                                       GroupLog, UserLog, VersionLog)
+    from mkt.access.models import Group
+    from mkt.webapps.models import Webapp
+    from mkt.users.models import UserProfile
+    from mkt.versions.models import Version
+
+    index = dict((model, []) for model in
+                 (AppLog, CommentLog, GroupLog, UserLog, VersionLog))
+
+    for al, args, user, kw in entries:
         al.save()
 
-    for arg in args:
-        if isinstance(arg, tuple):
-            if arg[0] == Webapp:
-                AppLog(addon_id=arg[1], activity_log=al).save()
-            elif arg[0] == Version:
-                VersionLog(version_id=arg[1], activity_log=al).save()
-            elif arg[0] == UserProfile:
-                UserLog(user_id=arg[1], activity_log=al).save()
-            elif arg[0] == Group:
-                GroupLog(group_id=arg[1], activity_log=al).save()
-
-        if isinstance(arg, Webapp):
-            AppLog(addon=arg, activity_log=al).save()
-        elif isinstance(arg, Version):
-            VersionLog(version=arg, activity_log=al).save()
-        elif isinstance(arg, UserProfile):
-            # Index by any user who is mentioned as an argument.
-            UserLog(activity_log=al, user=arg).save()
-        elif isinstance(arg, Group):
-            GroupLog(group=arg, activity_log=al).save()
-
-    # Index by every user
-    UserLog(activity_log=al, user=user).save()
-    return al
+        if 'details' in kw and 'comments' in al.details:
+            index[CommentLog].append(
+                CommentLog(comments=al.details['comments'], activity_log=al))
+
+        # TODO(davedash): post-remora this may not be necessary.
+        if 'created' in kw:
+            al.created = kw['created']
+            # Django resets the created date on save.
+            ActivityLog.objects.filter(pk=al.pk).update(created=al.created)
+
+        for arg in args:
+            if isinstance(arg, tuple):
+                if arg[0] == Webapp:
+                    index[AppLog].append(
+                        AppLog(addon_id=arg[1], activity_log=al))
+                elif arg[0] == Version:
+                    index[VersionLog].append(
+                        VersionLog(version_id=arg[1], activity_log=al))
+                elif arg[0] == UserProfile:
+                    index[UserLog].append(
+                        UserLog(user_id=arg[1], activity_log=al))
+                elif arg[0] == Group:
+                    index[GroupLog].append(
+                        GroupLog(group_id=arg[1], activity_log=al))
+
+            if isinstance(arg, Webapp):
+                index[AppLog].append(AppLog(addon=arg, activity_log=al))
+            elif isinstance(arg, Version):
+                index[VersionLog].append(
+                    VersionLog(version=arg, activity_log=al))
+            elif isinstance(arg, UserProfile):
+                # Index by any user who is mentioned as an argument.
+                index[UserLog].append(UserLog(activity_log=al, user=arg))
+            elif isinstance(arg, Group):
+                index[GroupLog].append(GroupLog(group=arg, activity_log=al))
+
+        # Index by every user
+        index[UserLog].append(UserLog(activity_log=al, user=user))
+
+    for model, objs in index.items():
+        if objs:
+            model.objects.bulk_create(objs)
@@ -427,6 +427,8 @@ class TestCase(MockEsMixin, MockBrowserIdMixin, ClassFixtureTestCase):
 
         # Clean the slate.
         cache.clear()
+        # The in-process price matrix would outlive the rolled back prices.
+        Price._currencies = None
         post_request_task._discard_tasks()
         post_request_task._stop_queuing_tasks()
 
@@ -669,8 +671,6 @@ class TestCase(MockEsMixin, MockBrowserIdMixin, ClassFixtureTestCase):
         addon.update(premium_type=mkt.ADDON_PREMIUM)
         addon._premium = AddonPremium.objects.create(addon=addon,
                                                      price=price_obj)
-        if hasattr(Price, '_currencies'):
-            del Price._currencies
         return addon._premium
 
     def create_sample(self, name=None, **kw):
@@ -1,9 +1,10 @@
 """Tests for the activitylog."""
 from datetime import datetime
 
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 import mkt
+from mkt.developers.models import ActivityLog, AppLog, UserLog
 from mkt.site.tests import TestCase, user_factory
 from mkt.webapps.models import Webapp
 
@@ -31,3 +32,57 @@ class LogTest(TestCase):
         al = mkt.log(mkt.LOG.CUSTOM_TEXT, 'hi', created=datetime(2009, 1, 1))
 
         eq_(al.created, datetime(2009, 1, 1))
+
+
+class TestLogBuffer(TestCase):
+    def setUp(self):
+        self.user = user_factory()
+        mkt.set_user(self.user)
+        self.app = Webapp.objects.create(name='buffered')
+
+    def test_buffered(self):
+        with mkt.log_buffer():
+            eq_(mkt.log(mkt.LOG.EDIT_PROPERTIES, self.app), None)
+            eq_(ActivityLog.objects.count(), 0)
+        eq_(ActivityLog.objects.count(), 1)
+        eq_(AppLog.objects.get().addon, self.app)
+        eq_(UserLog.objects.get().user, self.user)
+
+    def test_bulk_inserted(self):
+        # One INSERT per log, then one for the app index rows and one for
+        # the user index rows.
+        with self.assertNumQueries(5):
+            with mkt.log_buffer():
+                for x in range(3):
+                    mkt.log(mkt.LOG.EDIT_PROPERTIES, self.app)
+        eq_(AppLog.objects.count(), 3)
+
+    def test_not_buffered(self):
+        with mkt.log_buffer():
+            al = mkt.log(mkt.LOG.EDIT_PROPERTIES, self.app, buffer=False)
+            eq_(ActivityLog.objects.get(), al)
+
+    def test_nested(self):
+        with mkt.log_buffer():
+            with mkt.log_buffer():
+                mkt.log(mkt.LOG.EDIT_PROPERTIES, self.app)
+            eq_(ActivityLog.objects.count(), 0)
+        eq_(ActivityLog.objects.count(), 1)
+
+    def test_discarded_on_error(self):
+        with self.assertRaises(ValueError):
+            with mkt.log_buffer():
+                mkt.log(mkt.LOG.EDIT_PROPERTIES, self.app)
+                raise ValueError
+        eq_(ActivityLog.objects.count(), 0)
+        # The buffer is gone, logs are written right away again.
+        ok_(mkt.log(mkt.LOG.EDIT_PROPERTIES, self.app))
+
+    def test_decorator(self):
+        @mkt.log_buffer()
+        def edit():
+            mkt.log(mkt.LOG.EDIT_PROPERTIES, self.app)
+            eq_(ActivityLog.objects.count(), 0)
+
+        edit()
+        eq_(ActivityLog.objects.count(), 1)
@@ -7,15 +7,19 @@ from os import path
 from django.conf import settings
 from django.core.cache import cache
 from django.core.validators import ValidationError
+from django.test.utils import override_settings
 
 import mock
-from nose.tools import assert_raises, eq_, raises
+from nose.tools import assert_raises, eq_, ok_, raises
+from PIL import Image
 
 from mkt.site.storage_utils import (LocalFileStorage, copy_stored_file,
                                     local_storage, private_storage,
                                     public_storage, storage_is_remote)
 from mkt.site.tests import TestCase
-from mkt.site.utils import (ImageCheck, cache_ns_key, escape_all, resize_image,
+from mkt.site.utils import (_local_namespaces, cache_ns_get, cache_ns_key,
+                            escape_all, ImageCheck, resize_image,
+                            resize_images,
                             rm_local_tmp_dir, slug_validator, slugify)
 
 
@@ -101,6 +105,30 @@ def test_resize_transparency():
             public_storage.delete(dest)
 
 
+def test_resize_images():
+    dsts = [(tempfile.mkstemp(dir=settings.TMP_PATH)[1], size)
+            for size in [(32, 32), (64, 64), (128, 128)]]
+    optimize = mock.Mock()
+    try:
+        with open(get_image_path('mozilla.png'), 'rb') as fp:
+            with mock.patch('mkt.site.utils.Image.open',
+                            wraps=Image.open) as open_mock:
+                sizes = resize_images(fp, dsts, optimize=optimize)
+        eq_(open_mock.call_count, 1)
+        eq_(sizes, [(32, 12), (64, 24), (128, 48)])
+        # The local files are optimized all at once before being stored.
+        paths = optimize.call_args[0][0]
+        eq_(len(paths), 3)
+        ok_(not any(os.path.exists(path) for path in paths))
+        for (dst, size), expected in zip(dsts, sizes):
+            with public_storage.open(dst) as dfh:
+                eq_(Image.open(dfh).size, expected)
+    finally:
+        for dst, size in dsts:
+            if public_storage.exists(dst):
+                public_storage.delete(dst)
+
+
 class TestLocalFileStorage(unittest.TestCase):
 
     def setUp(self):
@@ -181,6 +209,7 @@ class TestCacheNamespaces(unittest.TestCase):
 
     def setUp(self):
         cache.clear()
+        _local_namespaces.clear()
         self.namespace = 'my-test-namespace'
 
     @mock.patch('mkt.site.utils.epoch')
@@ -203,6 +232,81 @@ class TestCacheNamespaces(unittest.TestCase):
         eq_(ns_key, expected)
         eq_(cache_ns_key(self.namespace), expected)
 
+    @override_settings(CACHE_NS_LOCAL_TIMEOUT=60)
+    @mock.patch('mkt.site.utils.statsd')
+    def test_local_namespace(self, statsd_mock):
+        ns_key = cache_ns_key(self.namespace)
+        with mock.patch('mkt.site.utils.cache') as cache_mock:
+            eq_(cache_ns_key(self.namespace), ns_key)
+        ok_(not cache_mock.get.called)
+        eq_([c[0][0] for c in statsd_mock.incr.call_args_list],
+            ['cache.ns.local.miss', 'cache.ns.local.hit'])
+
+    @override_settings(CACHE_NS_LOCAL_TIMEOUT=60)
+    def test_local_namespace_incr(self):
+        cache_ns_key(self.namespace)
+        ns_key = cache_ns_key(self.namespace, increment=True)
+        eq_(cache_ns_key(self.namespace), ns_key)
+
+    @override_settings(CACHE_NS_LOCAL_TIMEOUT=60)
+    @mock.patch('mkt.site.utils.time.time')
+    def test_local_namespace_expires(self, time_mock):
+        time_mock.return_value = 1000
+        ns_key = cache_ns_key(self.namespace)
+        # Another process invalidates the namespace.
+        cache.incr('ns:%s' % self.namespace)
+        eq_(cache_ns_key(self.namespace), ns_key)
+        time_mock.return_value = 1061
+        ok_(cache_ns_key(self.namespace) != ns_key)
+
+    def test_get(self):
+        key, val = cache_ns_get(self.namespace, 'foo')
+        eq_(key, '%s:foo' % cache_ns_key(self.namespace))
+        eq_(val, None)
+        cache.set(key, 'bar')
+        eq_(cache_ns_get(self.namespace, 'foo'), (key, 'bar'))
+
+    def test_get_one_round_trip(self):
+        key, val = cache_ns_get(self.namespace, 'foo')
+        cache.set(key, 'bar')
+        ns_key = 'ns:%s' % self.namespace
+        ns_val = cache.get(ns_key)
+        with mock.patch('mkt.site.utils.cache') as cache_mock:
+            cache_mock.get_many.return_value = {ns_key: ns_val, key: 'bar'}
+            eq_(cache_ns_get(self.namespace, 'foo'), (key, 'bar'))
+        ok_(not cache_mock.get.called)
+
+    def test_get_invalidated(self):
+        key, val = cache_ns_get(self.namespace, 'foo')
+        cache.set(key, 'bar')
+        new_key = '%s:foo' % cache_ns_key(self.namespace, increment=True)
+        eq_(cache_ns_get(self.namespace, 'foo'), (new_key, None))
+        cache.set(new_key, 'baz')
+        eq_(cache_ns_get(self.namespace, 'foo'), (new_key, 'baz'))
+
+    def test_get_namespace_evicted(self):
+        key, val = cache_ns_get(self.namespace, 'foo')
+        cache.set(key, 'bar')
+        cache.delete('ns:%s' % self.namespace)
+        eq_(cache_ns_get(self.namespace, 'foo')[1], None)
+
+    @override_settings(CACHE_NS_LOCAL_TIMEOUT=60)
+    @mock.patch('mkt.site.utils.statsd')
+    def test_get_counts_one_miss(self, statsd_mock):
+        key, val = cache_ns_get(self.namespace, 'foo')
+        eq_(cache_ns_get(self.namespace, 'foo')[0], key)
+        eq_([c[0][0] for c in statsd_mock.incr.call_args_list],
+            ['cache.ns.local.miss', 'cache.ns.local.hit'])
+
+    @mock.patch('mkt.site.utils.statsd')
+    def test_get_namespace_evicted_counts_one_miss(self, statsd_mock):
+        cache_ns_get(self.namespace, 'foo')
+        cache.delete('ns:%s' % self.namespace)
+        statsd_mock.reset_mock()
+        cache_ns_get(self.namespace, 'foo')
+        eq_([c[0][0] for c in statsd_mock.incr.call_args_list],
+            ['cache.ns.local.miss'])
+
 
 class TestEscapeAll(unittest.TestCase):
 
@@ -7,6 +7,7 @@ import os
 import random
 import re
 import shutil
+import tempfile
 import time
 import unicodedata
 import urllib
@@ -34,6 +35,7 @@ import jingo
 import jinja2
 import pytz
 from cef import log_cef as _log_cef
+from django_statsd.clients import statsd
 from easy_thumbnails import processors
 from elasticsearch_dsl.search import Search
 from PIL import Image
@@ -42,8 +44,9 @@ import mkt
 from lib.utils import static_url
 from mkt.api.paginator import ESPaginator
 from mkt.constants.applications import DEVICE_TYPES
-from mkt.site.storage_utils import (local_storage, private_storage,
-                                    public_storage, storage_is_remote)
+from mkt.site.storage_utils import (copy_stored_file, local_storage,
+                                    private_storage, public_storage,
+                                    storage_is_remote)
 from mkt.translations.models import Translation
 
 
@@ -233,6 +236,39 @@ def resize_image(src, dst, size=None, remove_src=True,
     return im.size
 
 
+def resize_images(fp, dsts, dst_storage=public_storage, optimize=None):
+    """
+    Resizes the image read from the file object `fp` to every (dst, size) of
+    `dsts`. Returns the width and height of each resized image, in order.
+
+    The image is only decoded once. The resized images are written to local
+    temporary files, `optimize` is called with their paths if given, and
+    they are then all copied to dst_storage.
+    """
+    im = Image.open(fp).convert('RGBA')
+    tmp_paths, sizes = [], []
+    try:
+        for dst, size in dsts:
+            resized = processors.scale_and_crop(im, size) if size else im
+            fd, tmp_path = tempfile.mkstemp(suffix='.png')
+            tmp_paths.append(tmp_path)
+            with os.fdopen(fd, 'wb') as tmp:
+                resized.save(tmp, 'png')
+            sizes.append(resized.size)
+
+        if optimize:
+            optimize(tmp_paths)
+
+        for tmp_path, (dst, size) in zip(tmp_paths, dsts):
+            copy_stored_file(tmp_path, dst, src_storage=local_storage,
+                             dst_storage=dst_storage)
+    finally:
+        for tmp_path in tmp_paths:
+            os.remove(tmp_path)
+
+    return sizes
+
+
 def remove_icons(destination):
     for size in mkt.CONTENT_ICON_SIZES:
         filename = '%s-%s.png' % (destination, size)
@@ -342,6 +378,45 @@ def redirect_for_login(request):
     return http.HttpResponseRedirect(url)
 
 
+# The namespace values seen by this process, as {ns_key: (ns_val, expires)}.
+_local_namespaces = {}
+
+
+def _get_local_ns_val(ns_key):
+    """
+    Return the value of the namespace kept by this process, or None if it
+    is older than settings.CACHE_NS_LOCAL_TIMEOUT seconds.
+    """
+    ns_val, expires = _local_namespaces.get(ns_key, (None, 0))
+    if ns_val is not None and expires > time.time():
+        statsd.incr('cache.ns.local.hit')
+        return ns_val
+    statsd.incr('cache.ns.local.miss')
+    return None
+
+
+def _set_local_ns_val(ns_key, ns_val):
+    _local_namespaces[ns_key] = (
+        ns_val, time.time() + settings.CACHE_NS_LOCAL_TIMEOUT)
+
+
+def _start_ns_val(ns_key):
+    """Store a new value for the namespace, memcache not having one."""
+    ns_val = epoch(datetime.datetime.now())
+    cache.set(ns_key, ns_val, None)
+    _set_local_ns_val(ns_key, ns_val)
+    return ns_val
+
+
+def _fetch_ns_val(ns_key):
+    """Return the value of the namespace from memcache, keeping it locally."""
+    ns_val = cache.get(ns_key)
+    if ns_val is None:
+        return _start_ns_val(ns_key)
+    _set_local_ns_val(ns_key, ns_val)
+    return ns_val
+
+
 def cache_ns_key(namespace, increment=False):
     """
     Returns a key with namespace value appended. If increment is True, the
@@ -351,6 +426,10 @@ def cache_ns_key(namespace, increment=False):
     "%(key)s_namespace" value. Invalidating the namespace simply requires
     editing that key. Your application will no longer request the old keys,
     and they will eventually fall off the end of the LRU and be reclaimed.
+
+    Each process keeps the namespace values for CACHE_NS_LOCAL_TIMEOUT
+    seconds, so an increment made by another process is seen at most that
+    late.
     """
     ns_key = 'ns:%s' % namespace
     if increment:
@@ -360,14 +439,51 @@ def cache_ns_key(namespace, increment=False):
             log.info('Cache increment failed for key: %s. Resetting.' % ns_key)
             ns_val = epoch(datetime.datetime.now())
             cache.set(ns_key, ns_val, None)
+        _set_local_ns_val(ns_key, ns_val)
     else:
-        ns_val = cache.get(ns_key)
+        ns_val = _get_local_ns_val(ns_key)
         if ns_val is None:
-            ns_val = epoch(datetime.datetime.now())
-            cache.set(ns_key, ns_val, None)
+            ns_val = _fetch_ns_val(ns_key)
     return '%s:%s' % (ns_val, ns_key)
 
 
+def cache_ns_get(namespace, key):
+    """
+    Returns a (cache key, value) tuple for `key` in the cache_ns_key()
+    namespace, the value being None if it isn't cached.
+
+    When the namespace value kept by this process is too old, it is fetched
+    from memcache along with the value cached under the old namespace, in a
+    single get_many(). That value is only used if the namespace didn't
+    change in the meantime.
+    """
+    ns_key = 'ns:%s' % namespace
+    ns_val = _get_local_ns_val(ns_key)
+    if ns_val is not None:
+        full_key = '%s:%s:%s' % (ns_val, ns_key, key)
+        return full_key, cache.get(full_key)
+
+    # The lookups below don't go through cache_ns_key(), which would count
+    # this miss again.
+    old_ns_val = _local_namespaces.get(ns_key, (None, 0))[0]
+    if old_ns_val is None:
+        full_key = '%s:%s:%s' % (_fetch_ns_val(ns_key), ns_key, key)
+        return full_key, cache.get(full_key)
+
+    old_key = '%s:%s:%s' % (old_ns_val, ns_key, key)
+    values = cache.get_many([ns_key, old_key])
+    ns_val = values.get(ns_key)
+    if ns_val is None:
+        # The namespace fell out of memcache, start a new one.
+        full_key = '%s:%s:%s' % (_start_ns_val(ns_key), ns_key, key)
+        return full_key, None
+    _set_local_ns_val(ns_key, ns_val)
+    if ns_val == old_ns_val:
+        return old_key, values.get(old_key)
+    full_key = '%s:%s:%s' % (ns_val, ns_key, key)
+    return full_key, cache.get(full_key)
+
+
 def smart_path(string):
     """Returns a string you can pass to path.path safely."""
     if os.path.supports_unicode_filenames:
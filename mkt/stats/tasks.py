@@ -1,6 +1,10 @@
 import json
 import logging
 import datetime
+from collections import Counter
+from functools import partial
+
+from django.db.models import Count
 
 from post_request_task.task import task
 
@@ -9,7 +13,7 @@ from mkt.constants.regions import REGIONS_CHOICES_SLUG
 from mkt.monolith.models import MonolithRecord
 from mkt.site.decorators import use_master
 from mkt.ratings.models import Review
-from mkt.webapps.models import AddonUser, Webapp
+from mkt.webapps.models import AddonExcludedRegion, AddonUser, Webapp
 from mkt.users.models import UserProfile
 
 
@@ -23,6 +27,7 @@ def update_monolith_stats(metric, date, **kw):
 
     jobs = _get_monolith_jobs(date)[metric]
 
+    records = []
     for job in jobs:
         try:
             # Only record if count is greater than zero.
@@ -32,8 +37,8 @@ def update_monolith_stats(metric, date, **kw):
                 if 'dimensions' in job:
                     value.update(job['dimensions'])
 
-                MonolithRecord.objects.create(recorded=date, key=metric,
-                                              value=json.dumps(value))
+                records.append(MonolithRecord(recorded=date, key=metric,
+                                              value=json.dumps(value)))
 
                 log.info('Monolith stats details: (%s) has (%s) for (%s). '
                          'Value: %s' % (metric, count, date, value))
@@ -45,6 +50,51 @@ def update_monolith_stats(metric, date, **kw):
             log.critical('Update of monolith table failed: (%s): %s'
                          % ([metric, date], e))
 
+    try:
+        MonolithRecord.objects.bulk_create(records)
+    except Exception as e:
+        log.critical('Update of monolith table failed: (%s): %s'
+                     % ([metric, date], e))
+
+
+def _regional_app_counter(apps):
+    """
+    Return a function counting the `apps` not excluded from a region, with
+    optional `is_packaged` and `premium_type` filters.
+
+    The counts of every region are computed the first time it's called, with
+    one query grouping the apps by package and premium type, and one
+    grouping their region exclusions the same way: the apps available in a
+    region are all the apps minus the ones excluded from it.
+    """
+    fields = ('is_packaged', 'premium_type')
+    counts = {}
+
+    def load():
+        counts['all'] = Counter()
+        for row in apps.values(*fields).annotate(n=Count('id')).order_by():
+            counts['all'][tuple(row[f] for f in fields)] += row['n']
+
+        counts['excluded'] = Counter()
+        for row in (AddonExcludedRegion.objects.filter(addon__in=apps)
+                    .values('region', *['addon__%s' % f for f in fields])
+                    .annotate(n=Count('id')).order_by()):
+            key = (row['region'],) + tuple(row['addon__%s' % f]
+                                           for f in fields)
+            counts['excluded'][key] += row['n']
+
+    def count(region, **filters):
+        if not counts:
+            load()
+        total = 0
+        for key, n in counts['all'].items():
+            values = dict(zip(fields, key))
+            if all(values[f] == v for f, v in filters.items()):
+                total += n - counts['excluded'][(region,) + key]
+        return total
+
+    return count
+
 
 def _get_monolith_jobs(date=None):
     """
@@ -101,73 +151,45 @@ def _get_monolith_jobs(date=None):
         }],
     }
 
-    # Add various "Apps Added" for all the dimensions we need.
-    apps = Webapp.objects.filter(created__range=(date, next_date))
-
-    package_counts = []
-    premium_counts = []
-
     # privileged==packaged for our consideration.
     package_types = mkt.ADDON_WEBAPP_TYPES.copy()
     package_types.pop(mkt.ADDON_WEBAPP_PRIVILEGED)
 
-    for region_slug, region in REGIONS_CHOICES_SLUG:
-        # Apps added by package type and region.
-        for package_type in package_types.values():
-            package_counts.append({
-                'count': (apps
-                          .filter(is_packaged=package_type == 'packaged')
-                          .exclude(addonexcludedregion__region=region.id)
-                          .count),
-                'dimensions': {'region': region_slug,
-                               'package_type': package_type},
-            })
-
-        # Apps added by premium type and region.
-        for premium_type, pt_name in mkt.ADDON_PREMIUM_API.items():
-            premium_counts.append({
-                'count': (apps
-                          .filter(premium_type=premium_type)
-                          .exclude(addonexcludedregion__region=region.id)
-                          .count),
-                'dimensions': {'region': region_slug,
-                               'premium_type': pt_name},
-            })
-
-    stats.update({'apps_added_by_package_type': package_counts})
-    stats.update({'apps_added_by_premium_type': premium_counts})
-
-    # Add various "Apps Available" for all the dimensions we need.
-    apps = Webapp.objects.filter(_current_version__reviewed__lt=next_date,
-                                 status__in=mkt.LISTED_STATUSES,
-                                 disabled_by_user=False)
-    package_counts = []
-    premium_counts = []
-
-    for region_slug, region in REGIONS_CHOICES_SLUG:
-        # Apps available by package type and region.
-        for package_type in package_types.values():
-            package_counts.append({
-                'count': (apps
-                          .filter(is_packaged=package_type == 'packaged')
-                          .exclude(addonexcludedregion__region=region.id)
-                          .count),
-                'dimensions': {'region': region_slug,
-                               'package_type': package_type},
-            })
-
-        # Apps available by premium type and region.
-        for premium_type, pt_name in mkt.ADDON_PREMIUM_API.items():
-            premium_counts.append({
-                'count': (apps
-                          .filter(premium_type=premium_type)
-                          .exclude(addonexcludedregion__region=region.id)
-                          .count),
-                'dimensions': {'region': region_slug,
-                               'premium_type': pt_name},
-            })
-
-    stats.update({'apps_available_by_package_type': package_counts})
-    stats.update({'apps_available_by_premium_type': premium_counts})
+    # Add various "Apps Added" and "Apps Available" for all the dimensions we
+    # need.
+    families = (
+        ('added', Webapp.objects.filter(created__range=(date, next_date))),
+        ('available', Webapp.objects.filter(
+            _current_version__reviewed__lt=next_date,
+            status__in=mkt.LISTED_STATUSES,
+            disabled_by_user=False)),
+    )
+
+    for family, apps in families:
+        count = _regional_app_counter(apps)
+        package_counts = []
+        premium_counts = []
+
+        for region_slug, region in REGIONS_CHOICES_SLUG:
+            # Apps by package type and region.
+            for package_type in package_types.values():
+                package_counts.append({
+                    'count': partial(count, region.id,
+                                     is_packaged=package_type == 'packaged'),
+                    'dimensions': {'region': region_slug,
+                                   'package_type': package_type},
+                })
+
+            # Apps by premium type and region.
+            for premium_type, pt_name in mkt.ADDON_PREMIUM_API.items():
+                premium_counts.append({
+                    'count': partial(count, region.id,
+                                     premium_type=premium_type),
+                    'dimensions': {'region': region_slug,
+                                   'premium_type': pt_name},
+                })
+
+        stats.update({'apps_%s_by_package_type' % family: package_counts})
+        stats.update({'apps_%s_by_premium_type' % family: premium_counts})
 
     return stats
@@ -1,11 +1,12 @@
 import datetime
 
 import mock
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 import mkt
 import mkt.site.tests
 from mkt.constants.regions import REGIONS_CHOICES_SLUG
+from mkt.monolith.models import MonolithRecord
 from mkt.ratings.models import Review
 from mkt.site.tests import user_factory
 from mkt.stats import tasks
@@ -22,8 +23,23 @@ class TestMonolithStats(mkt.site.tests.TestCase):
         metric = 'mmo_user_count_total'
 
         tasks.update_monolith_stats(metric, datetime.date.today())
-        self.assertTrue(record.objects.create.called)
-        eq_(record.objects.create.call_args[1]['value'], '{"count": 1}')
+        self.assertTrue(record.objects.bulk_create.called)
+        eq_(record.call_args[1]['value'], '{"count": 1}')
+        eq_(record.objects.bulk_create.call_args[0][0], [record.return_value])
+
+    def test_regional_counts_bulk_created(self):
+        today = datetime.date(2013, 1, 25)
+        app = Webapp.objects.create()
+        app.update(created=today)
+        app.addonexcludedregion.create(region=mkt.regions.BRA.id)
+        metric = 'apps_added_by_premium_type'
+
+        # One query for the apps, one for their exclusions, one INSERT.
+        with self.assertNumQueries(3):
+            tasks.update_monolith_stats(metric, today)
+        records = MonolithRecord.objects.filter(key=metric)
+        eq_(records.count(), len(REGIONS_CHOICES_SLUG) - 1)
+        ok_('"region": "br"' not in ''.join(r.value for r in records))
 
     def test_app_new(self):
         Webapp.objects.create()
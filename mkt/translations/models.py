@@ -1,6 +1,7 @@
 import collections
 from itertools import groupby
 
+from django.core.cache import cache
 from django.db import connections, models, router
 from django.db.models.deletion import Collector
 from django.utils import encoding
@@ -16,6 +17,30 @@ from . import utils
 log = commonware.log.getLogger('z.translations')
 
 
+def trans_cache_key(id_, locale=None):
+    """
+    Return the key the translations transformer caches the translation `id_`
+    in `locale` under, or any translation with that id if `locale` is None.
+    """
+    # Locales are compared case-insensitively by MySQL.
+    return 'trans:%s:%s' % (id_, locale.lower() if locale else '*')
+
+
+def forget_cached_translations(ids, locale):
+    """
+    Drop the cached translations with these ids in `locale`.
+
+    They are dropped right away, for the rest of this request, and again
+    once the transaction is committed: in between, another request could
+    cache them as they were before the change.
+    """
+    from mkt.translations.tasks import forget_translations
+    keys = [key for id_ in ids for key in
+            (trans_cache_key(id_, locale), trans_cache_key(id_))]
+    cache.delete_many(keys)
+    forget_translations.delay(keys)
+
+
 class TranslationManager(ManagerBase):
 
     def remove_for(self, obj, locale):
@@ -24,6 +49,7 @@ class TranslationManager(ManagerBase):
         qs = Translation.objects.filter(id__in=filter(None, ids),
                                         locale=locale)
         qs.update(localized_string=None, localized_string_clean=None)
+        forget_cached_translations(filter(None, ids), locale)
 
 
 class Translation(ModelBase):
@@ -72,7 +98,9 @@ class Translation(ModelBase):
 
     def save(self, **kwargs):
         self.clean()
-        return super(Translation, self).save(**kwargs)
+        rval = super(Translation, self).save(**kwargs)
+        forget_cached_translations([self.id], self.locale)
+        return rval
 
     def delete(self, using=None):
         # FIXME: if the Translation is the one used as default/fallback,
@@ -81,6 +109,7 @@ class Translation(ModelBase):
         # languages!
         cls = self.__class__
         using = using or router.db_for_write(cls, instance=self)
+        forget_cached_translations([self.id], self.locale)
         # Look for all translations for the same string (id=self.id) except the
         # current one (autoid=self.autoid).
         qs = cls.objects.filter(id=self.id).exclude(autoid=self.autoid)
@@ -0,0 +1,11 @@
+from django.core.cache import cache
+
+from post_request_task.task import task
+
+
+@task
+def forget_translations(keys, **kw):
+    """
+    Drop the cached translations again once the change is committed.
+    """
+    cache.delete_many(keys)
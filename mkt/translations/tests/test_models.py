@@ -23,8 +23,8 @@ from mkt.translations import widgets
 from mkt.translations.models import (attach_trans_dict, LinkifiedTranslation,
                                      NoLinksTranslation,
                                      NoLinksNoMarkupTranslation,
-                                     PurifiedTranslation, Translation,
-                                     TranslationSequence)
+                                     PurifiedTranslation, trans_cache_key,
+                                     Translation, TranslationSequence)
 from mkt.translations.query import order_by_translation
 
 
@@ -416,6 +416,72 @@ class TranslationTestCase(TestCase):
             eq_(obj.name.locale, 'de')
 
 
+@override_settings(TRANSLATIONS_CACHE_TIMEOUT=60)
+class TranslationCacheTestCase(TestCase):
+    fixtures = ['testapp/test_models.json']
+
+    def setUp(self):
+        super(TranslationCacheTestCase, self).setUp()
+        self.TranslatedModel = (apps.get_app_config('testapp')
+                                    .get_model('TranslatedModel'))
+        translation.activate('en-US')
+
+    def test_cached(self):
+        self.TranslatedModel.objects.get(id=1)
+        with self.assertNumQueries(1):
+            o = self.TranslatedModel.objects.get(id=1)
+        trans_eq(o.name, 'some name', 'en-US')
+        trans_eq(o.description, 'some description', 'en-US')
+        eq_(unicode(o.no_locale), 'blammo')
+
+    def test_cached_per_locale(self):
+        self.TranslatedModel.objects.get(id=1)
+        try:
+            translation.activate('de')
+            o = self.TranslatedModel.objects.get(id=1)
+            trans_eq(o.name, 'German!! (unst unst)', 'de')
+            trans_eq(o.description, 'some description', 'en-US')
+        finally:
+            translation.deactivate()
+
+    def test_save_invalidates(self):
+        o = self.TranslatedModel.objects.get(id=1)
+        o.name.localized_string = 'new name'
+        o.name.save()
+        o = self.TranslatedModel.objects.get(id=1)
+        trans_eq(o.name, 'new name', 'en-US')
+
+    def test_new_locale_invalidates(self):
+        o = self.TranslatedModel.objects.get(id=1)
+        Translation.new('Un nom', 'fr', id=o.description_id).save()
+        try:
+            translation.activate('fr')
+            o = self.TranslatedModel.objects.get(id=1)
+            trans_eq(o.description, 'Un nom', 'fr')
+        finally:
+            translation.deactivate()
+
+    def test_delete_invalidates(self):
+        o = self.TranslatedModel.objects.get(id=1)
+        o.description.delete()
+        o = self.TranslatedModel.objects.get(id=1)
+        eq_(o.description, None)
+
+    def test_remove_for_invalidates(self):
+        o = self.TranslatedModel.objects.get(id=1)
+        Translation.objects.remove_for(o, 'en-US')
+        o = self.TranslatedModel.objects.get(id=1)
+        eq_(o.description, None)
+
+    @patch('mkt.translations.tasks.forget_translations.delay')
+    def test_invalidated_after_commit(self, delay):
+        o = self.TranslatedModel.objects.get(id=1)
+        o.name.localized_string = 'new name'
+        o.name.save()
+        delay.assert_called_with([trans_cache_key(o.name_id, o.name.locale),
+                                  trans_cache_key(o.name_id)])
+
+
 class TranslationMultiDbTests(TransactionTestCase):
     fixtures = ['testapp/test_models.json']
 
@@ -1,8 +1,11 @@
+import collections
+
 from django.conf import settings
+from django.core.cache import cache
 from django.db import connections, models, router
 from django.utils import translation
 
-from mkt.translations.models import Translation
+from mkt.translations.models import trans_cache_key, Translation
 
 isnull = """IF(!ISNULL({t1}.localized_string), {t1}.{col}, {t2}.{col})
             AS {name}_{col}"""
@@ -12,6 +15,9 @@ no_locale_join = """LEFT OUTER JOIN translations {t}
                     ON {t}.id={model}.{name}"""
 
 trans_fields = [f.name for f in Translation._meta.fields]
+TRANS_ID = trans_fields.index('id')
+TRANS_LOCALE = trans_fields.index('locale')
+TRANS_STRING = trans_fields.index('localized_string')
 
 
 def build_query(model, connection):
@@ -64,6 +70,56 @@ def get_trans(items):
     # FIXME: if we knew which db the queryset we are transforming used, we
     # could make sure we are re-using the same one.
     dbname = router.db_for_read(model)
+
+    # The model can define a fallback locale (which may be a Field).
+    if hasattr(model, 'get_fallback'):
+        fallback = model.get_fallback()
+    else:
+        fallback = settings.LANGUAGE_CODE
+    lang = translation.get_language()
+
+    fields = model._meta.translated_fields
+    columns = [f.attname for f in fields]
+    if isinstance(fallback, models.Field):
+        columns.append(fallback.attname)
+    if any(c not in item.__dict__ for item in items for c in columns):
+        # Some of the columns we need were deferred, let the database join
+        # the translations instead of querying them for each item.
+        return get_trans_from_db(items, model, dbname)
+
+    # For each item and translated field, the keys of the translation to use
+    # and of the one to fall back to.
+    wanted = []
+    for item in items:
+        if isinstance(fallback, models.Field):
+            item_fallback = getattr(item, fallback.attname)
+        else:
+            item_fallback = fallback
+        for field in fields:
+            id_ = getattr(item, field.attname)
+            if id_ is None:
+                continue
+            if field.require_locale:
+                fallback_key = (item_fallback and
+                                trans_cache_key(id_, item_fallback))
+            else:
+                fallback_key = trans_cache_key(id_)
+            wanted.append((item, field, trans_cache_key(id_, lang),
+                           fallback_key))
+
+    keys = set(key for _, _, key, fallback_key in wanted for key in
+               (key, fallback_key) if key)
+    found = get_cached_trans(keys, dbname)
+
+    for item, field, key, fallback_key in wanted:
+        row = found[key]
+        if not row or row[TRANS_STRING] is None:
+            row = found.get(fallback_key)
+        if row and row[TRANS_STRING] is not None:
+            setattr(item, field.name, Translation(*row))
+
+
+def get_trans_from_db(items, model, dbname):
     connection = connections[dbname]
     sql, params = build_query(model, connection)
     item_dict = dict((item.pk, item) for item in items)
@@ -80,3 +136,35 @@ def get_trans(items):
             t = Translation(*row[start:start + step])
             if t.id is not None and t.localized_string is not None:
                 setattr(item, field.name, t)
+
+
+def get_cached_trans(keys, dbname):
+    """
+    Return a dict of the translation rows for these cache keys, as tuples of
+    values in `trans_fields` order, or an empty tuple where there is no such
+    translation. Only the translations missing from the cache are queried.
+    """
+    timeout = settings.TRANSLATIONS_CACHE_TIMEOUT
+    found = cache.get_many(keys) if timeout else {}
+    missing = set(keys) - set(found)
+    if not missing:
+        return found
+
+    ids = set(int(key.split(':')[1]) for key in missing)
+    rows = collections.defaultdict(list)
+    for row in (Translation.objects.using(dbname).filter(id__in=ids)
+                .values_list(*trans_fields)):
+        rows[row[TRANS_ID]].append(row)
+
+    fetched = {}
+    for id_ in ids:
+        strings = [row for row in rows[id_] if row[TRANS_STRING] is not None]
+        fetched[trans_cache_key(id_)] = (strings or rows[id_] or [()])[0]
+        for row in rows[id_]:
+            fetched[trans_cache_key(id_, row[TRANS_LOCALE])] = row
+    for key in missing:
+        found[key] = fetched.get(key, ())
+        fetched.setdefault(key, ())
+    if timeout:
+        cache.set_many(fetched, timeout)
+    return found
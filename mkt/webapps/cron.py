@@ -4,6 +4,7 @@ import time
 from datetime import datetime
 
 from django.conf import settings
+from django.db import connections, router
 from django.db.models import Q
 
 import commonware.log
@@ -106,16 +107,52 @@ def clean_old_signed(seconds=60 * 60):
                 private_storage.delete(full)
 
 
-def _get_installs(app_id):
+def _monolith_app_query(app_ids, aggregations):
     """
-    Calculate popularity of app for all regions and per region.
+    Build a Monolith query computing `aggregations` for each of the apps in
+    `app_ids`, over all regions and per region.
+    """
+    return {
+        'query': {
+            'filtered': {
+                'query': {'match_all': {}},
+                'filter': {'terms': {'app-id': list(app_ids)}}
+            }
+        },
+        'aggregations': {
+            'app': {
+                'terms': {
+                    'field': 'app-id',
+                    # Add size so we get all the apps, not just the top 10.
+                    'size': len(app_ids)
+                },
+                'aggregations': dict(aggregations, region={
+                    'terms': {
+                        'field': 'region',
+                        # Add size so we get all regions, not just the top 10.
+                        'size': len(mkt.regions.ALL_REGIONS)
+                    },
+                    'aggregations': aggregations
+                })
+            }
+        },
+        'size': 0
+    }
+
+
+def _get_installs(app_ids):
+    """
+    Calculate popularity of apps for all regions and per region.
 
     Returns value in the format of::
 
-        {'all': <global installs>,
-         <region_slug>: <regional installs>,
+        {<app id>: {'all': <global installs>,
+                    <region_slug>: <regional installs>,
+                    ...},
          ...}
 
+    Apps without installs are left out.
+
     """
     # How many days back do we include when calculating popularity.
     POPULARITY_PERIOD = 90
@@ -140,28 +177,7 @@ def _get_installs(app_id):
         }
     }
 
-    query = {
-        'query': {
-            'filtered': {
-                'query': {'match_all': {}},
-                'filter': {'term': {'app-id': app_id}}
-            }
-        },
-        'aggregations': {
-            'popular': popular,
-            'region': {
-                'terms': {
-                    'field': 'region',
-                    # Add size so we get all regions, not just the top 10.
-                    'size': len(mkt.regions.ALL_REGIONS)
-                },
-                'aggregations': {
-                    'popular': popular
-                }
-            }
-        },
-        'size': 0
-    }
+    query = _monolith_app_query(app_ids, {'popular': popular})
 
     try:
         res = client.raw(query)
@@ -170,32 +186,71 @@ def _get_installs(app_id):
         return {}
 
     if 'aggregations' not in res:
-        task_log.error('No installs for app {}'.format(app_id))
+        task_log.error('No installs for apps {0}-{1}'.format(app_ids[0],
+                                                             app_ids[-1]))
         return {}
 
-    results = {
-        'all': res['aggregations']['popular']['total_installs']['value']
-    }
+    results = {}
+    for app_res in res['aggregations']['app']['buckets']:
+        scores = {
+            'all': app_res['popular']['total_installs']['value']
+        }
+
+        if 'region' in app_res:
+            for regional_res in app_res['region']['buckets']:
+                region_slug = regional_res['key']
+                popular = regional_res['popular']['total_installs']['value']
+                scores[region_slug] = popular
 
-    if 'region' in res['aggregations']:
-        for regional_res in res['aggregations']['region']['buckets']:
-            region_slug = regional_res['key']
-            popular = regional_res['popular']['total_installs']['value']
-            results[region_slug] = popular
+        results[int(app_res['key'])] = scores
 
     return results
 
 
-@cronjobs.register
-@use_master
-def update_app_installs():
+def _save_scores(model, scores, app_ids):
+    """
+    Store the global and regional scores of the `app_ids` apps in the
+    `model` table, in a single query, and remove the ones that are <= 0.
+
+    Returns the ids of the apps that have a score > 0.
     """
-    Update app install counts for all published apps.
+    # MySQL doesn't keep the microseconds, so don't let them make the rows we
+    # are about to write look older than `now`.
+    now = datetime.now().replace(microsecond=0)
+    rows = []
+    for app_id in app_ids:
+        app_scores = scores.get(app_id, {})
+        regions = [(0, 'all')] + [(region.id, region.slug) for region in
+                                  mkt.regions.REGIONS_DICT.values()]
+        for region_id, key in regions:
+            value = app_scores.get(key)
+            if value > 0:
+                rows.append((app_id, region_id, value, now, now))
+
+    if rows:
+        # Insert the scores, or update them when the app and region already
+        # have one.
+        sql = ('INSERT INTO {table} (addon_id, region, value, created, '
+               'modified) VALUES {values} ON DUPLICATE KEY UPDATE '
+               'value=VALUES(value), modified=VALUES(modified)').format(
+            table=model._meta.db_table,
+            values=','.join(['(%s, %s, %s, %s, %s)'] * len(rows)))
+        cursor = connections[router.db_for_write(model)].cursor()
+        cursor.execute(sql, [param for row in rows for param in row])
+
+    # The value is <= 0 for the rows we didn't just write, so remove them.
+    model.objects.filter(addon__in=app_ids, modified__lt=now).delete()
 
-    We break these into chunks so we can bulk index them. Each chunk will
-    process the apps in it and reindex them in bulk. After all the chunks are
-    processed we find records that haven't been updated and purge/reindex those
-    so we nullify their values.
+    return sorted(set(row[0] for row in rows))
+
+
+def _update_scores(model, get_scores, name):
+    """
+    Update the `model` scores returned by `get_scores` for all published apps.
+
+    We break these into chunks so we can fetch their scores and bulk index
+    them together. After all the chunks are processed we find records that
+    haven't been updated and purge/reindex those so we nullify their values.
 
     """
     chunk_size = 100
@@ -205,55 +260,15 @@ def update_app_installs():
                      .values_list('id', flat=True))
 
     for chunk in chunked(ids, chunk_size):
+        t_start = time.time()
+        reindex_ids = _save_scores(model, get_scores(chunk), chunk)
 
-        count = 0
-        times = []
-        reindex_ids = []
-
-        for app in Webapp.objects.filter(id__in=chunk).no_transforms():
-
-            reindex = False
-            count += 1
-            now = datetime.now()
-            t_start = time.time()
-
-            scores = _get_installs(app.id)
-
-            # Update global installs, then per-region installs below.
-            value = scores.get('all')
-            if value > 0:
-                reindex = True
-                installs, created = app.popularity.get_or_create(
-                    region=0, defaults={'value': value})
-                if not created:
-                    installs.update(value=value, modified=now)
-            else:
-                # The value is <= 0 so we can just ignore it.
-                app.popularity.filter(region=0).delete()
-
-            for region in mkt.regions.REGIONS_DICT.values():
-                value = scores.get(region.slug)
-                if value > 0:
-                    reindex = True
-                    installs, created = app.popularity.get_or_create(
-                        region=region.id, defaults={'value': value})
-                    if not created:
-                        installs.update(value=value, modified=now)
-                else:
-                    # The value is <= 0 so we can just ignore it.
-                    app.popularity.filter(region=region.id).delete()
-
-            if reindex:
-                reindex_ids.append(app.id)
-
-            times.append(time.time() - t_start)
-
-        # Now reindex the apps that actually have a popularity value.
+        # Now reindex the apps that actually have a score.
         if reindex_ids:
             WebappIndexer.run_indexing(reindex_ids)
 
-        log.info('Installs calculated for %s apps. Avg time overall: '
-                 '%0.2fs' % (count, sum(times) / count))
+        log.info('%s calculated for %s apps. Avg time overall: %0.2fs'
+                 % (name, len(chunk), (time.time() - t_start) / len(chunk)))
 
     # Purge any records that were not updated.
     #
@@ -262,7 +277,7 @@ def update_app_installs():
     now = datetime.now()
     midnight = datetime(year=now.year, month=now.month, day=now.day)
 
-    qs = Installs.objects.filter(modified__lte=midnight)
+    qs = model.objects.filter(modified__lte=midnight)
     # First get the IDs so we know what to reindex.
     purged_ids = qs.values_list('addon', flat=True).distinct()
     # Then delete them.
@@ -272,9 +287,16 @@ def update_app_installs():
         WebappIndexer.run_indexing(ids)
 
 
-def _get_trending(app_id):
+@cronjobs.register
+@use_master
+def update_app_installs():
+    """Update app install counts for all published apps."""
+    _update_scores(Installs, _get_installs, 'Installs')
+
+
+def _get_trending(app_ids):
     """
-    Calculate trending for app for all regions and per region.
+    Calculate trending for apps for all regions and per region.
 
     a = installs from 8 days ago to 1 day ago
     b = installs from 29 days ago to 9 days ago, averaged per week
@@ -282,10 +304,13 @@ def _get_trending(app_id):
 
     Returns value in the format of::
 
-        {'all': <global trending score>,
-         <region_slug>: <regional trending score>,
+        {<app id>: {'all': <global trending score>,
+                    <region_slug>: <regional trending score>,
+                    ...},
          ...}
 
+    Apps that aren't trending are left out.
+
     """
     # How many app installs are required in the prior week to be considered
     # "trending". Adjust this as total Marketplace app installs increases.
@@ -330,30 +355,7 @@ def _get_trending(app_id):
         }
     }
 
-    query = {
-        'query': {
-            'filtered': {
-                'query': {'match_all': {}},
-                'filter': {'term': {'app-id': app_id}}
-            }
-        },
-        'aggregations': {
-            'week1': week1,
-            'week3': week3,
-            'region': {
-                'terms': {
-                    'field': 'region',
-                    # Add size so we get all regions, not just the top 10.
-                    'size': len(mkt.regions.ALL_REGIONS)
-                },
-                'aggregations': {
-                    'week1': week1,
-                    'week3': week3
-                }
-            }
-        },
-        'size': 0
-    }
+    query = _monolith_app_query(app_ids, {'week1': week1, 'week3': week3})
 
     try:
         res = client.raw(query)
@@ -362,7 +364,8 @@ def _get_trending(app_id):
         return {}
 
     if 'aggregations' not in res:
-        task_log.error('No installs for app {}'.format(app_id))
+        task_log.error('No installs for apps {0}-{1}'.format(app_ids[0],
+                                                             app_ids[-1]))
         return {}
 
     def _score(week1, week3):
@@ -377,27 +380,31 @@ def _get_trending(app_id):
             score = 0.0
         return score
 
-    # Global trending score.
-    week1 = res['aggregations']['week1']['total_installs']['value']
-    week3 = res['aggregations']['week3']['total_installs']['value'] / 3.0
+    results = {}
+    for app_res in res['aggregations']['app']['buckets']:
+        # Global trending score.
+        week1 = app_res['week1']['total_installs']['value']
+        week3 = app_res['week3']['total_installs']['value'] / 3.0
 
-    if week1 < PRIOR_WEEK_INSTALL_THRESHOLD:
-        # If global installs over the last week aren't over 100, we
-        # short-circuit and return a zero-like value as this is not a trending
-        # app by definition. Since global installs aren't above 100, per-region
-        # installs won't be either.
-        return {}
+        if week1 < PRIOR_WEEK_INSTALL_THRESHOLD:
+            # If global installs over the last week aren't over 100, we
+            # short-circuit as this is not a trending app by definition.
+            # Since global installs aren't above 100, per-region installs
+            # won't be either.
+            continue
+
+        scores = {
+            'all': _score(week1, week3)
+        }
 
-    results = {
-        'all': _score(week1, week3)
-    }
+        if 'region' in app_res:
+            for regional_res in app_res['region']['buckets']:
+                region_slug = regional_res['key']
+                week1 = regional_res['week1']['total_installs']['value']
+                week3 = regional_res['week3']['total_installs']['value'] / 3.0
+                scores[region_slug] = _score(week1, week3)
 
-    if 'region' in res['aggregations']:
-        for regional_res in res['aggregations']['region']['buckets']:
-            region_slug = regional_res['key']
-            week1 = regional_res['week1']['total_installs']['value']
-            week3 = regional_res['week3']['total_installs']['value'] / 3.0
-            results[region_slug] = _score(week1, week3)
+        results[int(app_res['key'])] = scores
 
     return results
 
@@ -405,89 +412,8 @@ def _get_trending(app_id):
 @cronjobs.register
 @use_master
 def update_app_trending():
-    """
-    Update trending for all published apps.
-
-    We break these into chunks so we can bulk index them. Each chunk will
-    process the apps in it and reindex them in bulk. After all the chunks are
-    processed we find records that haven't been updated and purge/reindex those
-    so we nullify their values.
-
-    """
-    chunk_size = 100
-
-    ids = list(Webapp.objects.filter(status=mkt.STATUS_PUBLIC,
-                                     disabled_by_user=False)
-                     .values_list('id', flat=True))
-
-    for chunk in chunked(ids, chunk_size):
-
-        count = 0
-        times = []
-        reindex_ids = []
-
-        for app in Webapp.objects.filter(id__in=chunk).no_transforms():
-
-            reindex = False
-            count += 1
-            now = datetime.now()
-            t_start = time.time()
-
-            scores = _get_trending(app.id)
-
-            # Update global trending, then per-region trending below.
-            value = scores.get('all')
-            if value > 0:
-                reindex = True
-                trending, created = app.trending.get_or_create(
-                    region=0, defaults={'value': value})
-                if not created:
-                    trending.update(value=value, modified=now)
-            else:
-                # The value is <= 0 so the app is not trending. Let's remove it
-                # from the trending table.
-                app.trending.filter(region=0).delete()
-
-            for region in mkt.regions.REGIONS_DICT.values():
-                value = scores.get(region.slug)
-                if value > 0:
-                    reindex = True
-                    trending, created = app.trending.get_or_create(
-                        region=region.id, defaults={'value': value})
-                    if not created:
-                        trending.update(value=value, modified=now)
-                else:
-                    # The value is <= 0 so the app is not trending.
-                    # Let's remove it from the trending table.
-                    app.trending.filter(region=region.id).delete()
-
-            times.append(time.time() - t_start)
-
-            if reindex:
-                reindex_ids.append(app.id)
-
-        # Now reindex the apps that actually have a trending score.
-        if reindex_ids:
-            WebappIndexer.run_indexing(reindex_ids)
-
-        log.info('Trending calculated for %s apps. Avg time overall: '
-                 '%0.2fs' % (count, sum(times) / count))
-
-    # Purge any records that were not updated.
-    #
-    # Note: We force update `modified` even if no data changes so any records
-    # with older modified times can be purged.
-    now = datetime.now()
-    midnight = datetime(year=now.year, month=now.month, day=now.day)
-
-    qs = Trending.objects.filter(modified__lte=midnight)
-    # First get the IDs so we know what to reindex.
-    purged_ids = qs.values_list('addon', flat=True).distinct()
-    # Then delete them.
-    qs.delete()
-
-    for ids in chunked(purged_ids, chunk_size):
-        WebappIndexer.run_indexing(ids)
+    """Update trending for all published apps."""
+    _update_scores(Trending, _get_trending, 'Trending')
 
 
 @cronjobs.register
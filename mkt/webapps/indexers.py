@@ -1,7 +1,7 @@
+from collections import defaultdict
 from operator import attrgetter
 
 from django.core.urlresolvers import reverse
-from django.db.models import Min
 
 import commonware.log
 from elasticsearch_dsl import F
@@ -229,20 +229,106 @@ class WebappIndexer(BaseIndexer):
 
         return mapping
 
+    @classmethod
+    def attach_related(cls, objs):
+        """
+        Attaches everything we need to index apps, with one query per
+        relation for all the apps instead of a few queries per app.
+
+        The related objects `extract_document` needs are stored in an
+        `_indexing_data` dict on each app.
+        """
+        from mkt.reviewers.models import EscalationQueue, RereviewQueue
+        from mkt.versions.models import Version
+        from mkt.webapps.models import (AddonUpsell, AddonUser,
+                                        attach_devices,
+                                        attach_excluded_regions,
+                                        attach_prices, attach_translations,
+                                        Preview, RatingDescriptors,
+                                        RatingInteractives)
+
+        if not objs:
+            return
+
+        for transform in (attach_devices, attach_excluded_regions,
+                          attach_prices, attach_tags, attach_translations):
+            transform(objs)
+
+        ids = [obj.id for obj in objs]
+
+        escalation_dates = dict(EscalationQueue.objects.filter(addon__in=ids)
+                                .values_list('addon', 'created'))
+        rereview_dates = dict(RereviewQueue.objects.filter(addon__in=ids)
+                              .values_list('addon', 'created'))
+
+        owners = defaultdict(list)
+        for addon_id, user_id in (
+                AddonUser.objects.filter(addon__in=ids,
+                                         role=mkt.AUTHOR_ROLE_OWNER)
+                .values_list('addon', 'user')):
+            owners[addon_id].append(user_id)
+
+        previews = defaultdict(list)
+        for preview in Preview.objects.filter(addon__in=ids).no_transforms():
+            previews[preview.addon_id].append(preview)
+
+        price_tiers = dict(
+            (premium.addon_id, premium.price.name if premium.price else None)
+            for premium in AddonPremium.objects.filter(addon__in=ids)
+                                               .select_related('price'))
+
+        versions = defaultdict(list)
+        for version in Version.objects.filter(addon__in=ids).no_transforms():
+            versions[version.addon_id].append(version)
+
+        descriptors = dict(
+            (descriptor.addon_id, descriptor) for descriptor
+            in RatingDescriptors.objects.filter(addon__in=ids))
+        interactives = dict(
+            (interactive.addon_id, interactive) for interactive
+            in RatingInteractives.objects.filter(addon__in=ids))
+
+        upsells = dict((upsell.free_id, upsell) for upsell
+                       in AddonUpsell.objects.filter(free__in=ids))
+        premium_apps = dict(
+            (app.id, app) for app in cls.get_model().objects.filter(
+                id__in=[upsell.premium_id for upsell in upsells.values()]))
+        for upsell in upsells.values():
+            if upsell.premium_id in premium_apps:
+                upsell.premium = premium_apps[upsell.premium_id]
+
+        for obj in objs:
+            upsell = upsells.get(obj.id)
+            reviewed = filter(None, (v.reviewed for v in versions[obj.id]))
+            obj._indexing_data = {
+                'escalation_date': escalation_dates.get(obj.id),
+                'rereview_date': rereview_dates.get(obj.id),
+                'owners': owners[obj.id],
+                'previews': previews[obj.id],
+                'price_tier': price_tiers.get(obj.id),
+                'reviewed': min(reviewed) if reviewed else None,
+                'versions': versions[obj.id],
+                'rating_descriptors': descriptors.get(obj.id),
+                'rating_interactives': interactives.get(obj.id),
+                'upsell': (upsell.premium
+                           if upsell and upsell.premium_id in premium_apps
+                           else None),
+            }
+
     @classmethod
     def extract_document(cls, pk=None, obj=None):
         """Extracts the ElasticSearch index document for this instance."""
-        from mkt.webapps.models import (AppFeatures, attach_devices,
-                                        attach_prices, attach_translations,
-                                        RatingDescriptors, RatingInteractives)
+        from mkt.webapps.models import AppFeatures
 
         if obj is None:
             obj = cls.get_model().objects.get(pk=pk)
 
-        # Attach everything we need to index apps.
-        for transform in (attach_devices, attach_prices, attach_tags,
-                          attach_translations):
-            transform([obj])
+        if not hasattr(obj, '_indexing_data'):
+            cls.attach_related([obj])
+        # Don't keep the related objects around, they would be out of date
+        # the next time this app is indexed.
+        data = obj._indexing_data
+        del obj._indexing_data
 
         latest_version = obj.latest_version
         version = obj.current_version
@@ -265,31 +351,25 @@ class WebappIndexer(BaseIndexer):
         d['category'] = obj.categories if obj.categories else []
         d['content_ratings'] = (obj.get_content_ratings_by_body(es=True) or
                                 None)
-        try:
-            d['content_descriptors'] = obj.rating_descriptors.to_keys()
-        except RatingDescriptors.DoesNotExist:
-            d['content_descriptors'] = []
+        d['content_descriptors'] = (
+            data['rating_descriptors'].to_keys()
+            if data['rating_descriptors'] else [])
         d['current_version'] = version.version if version else None
         d['device'] = getattr(obj, 'device_ids', [])
         d['features'] = features
         d['has_public_stats'] = obj.public_stats
-        try:
-            d['interactive_elements'] = obj.rating_interactives.to_keys()
-        except RatingInteractives.DoesNotExist:
-            d['interactive_elements'] = []
+        d['interactive_elements'] = (
+            data['rating_interactives'].to_keys()
+            if data['rating_interactives'] else [])
         d['installs_allowed_from'] = (
             version.manifest.get('installs_allowed_from', ['*'])
             if version else ['*'])
         d['is_priority'] = obj.priority_review
 
-        is_escalated = obj.escalationqueue_set.exists()
-        d['is_escalated'] = is_escalated
-        d['escalation_date'] = (obj.escalationqueue_set.get().created
-                                if is_escalated else None)
-        is_rereviewed = obj.rereviewqueue_set.exists()
-        d['is_rereviewed'] = is_rereviewed
-        d['rereview_date'] = (obj.rereviewqueue_set.get().created
-                              if is_rereviewed else None)
+        d['is_escalated'] = data['escalation_date'] is not None
+        d['escalation_date'] = data['escalation_date']
+        d['is_rereviewed'] = data['rereview_date'] is not None
+        d['rereview_date'] = data['rereview_date']
 
         if latest_version:
             d['latest_version'] = {
@@ -312,25 +392,19 @@ class WebappIndexer(BaseIndexer):
         d['manifest_url'] = obj.get_manifest_url()
         d['package_path'] = obj.get_package_path()
         d['name_sort'] = unicode(obj.name).lower()
-        d['owners'] = [au.user.id for au in
-                       obj.addonuser_set.filter(role=mkt.AUTHOR_ROLE_OWNER)]
+        d['owners'] = data['owners']
 
         d['previews'] = [{'filetype': p.filetype, 'modified': p.modified,
                           'id': p.id, 'sizes': p.sizes}
-                         for p in obj.previews.all()]
-        try:
-            p = obj.addonpremium.price
-            d['price_tier'] = p.name
-        except AddonPremium.DoesNotExist:
-            d['price_tier'] = None
+                         for p in data['previews']]
+        d['price_tier'] = data['price_tier']
 
         d['ratings'] = {
             'average': obj.average_rating,
             'count': obj.total_reviews,
         }
         d['region_exclusions'] = obj.get_excluded_region_ids()
-        d['reviewed'] = obj.versions.filter(
-            deleted=False).aggregate(Min('reviewed')).get('reviewed__min')
+        d['reviewed'] = data['reviewed']
 
         # The default locale of the app is considered "supported" by default.
         supported_locales = [obj.default_locale]
@@ -342,8 +416,8 @@ class WebappIndexer(BaseIndexer):
 
         d['tags'] = getattr(obj, 'tags_list', [])
 
-        if obj.upsell and obj.upsell.premium.is_published():
-            upsell_obj = obj.upsell.premium
+        if data['upsell'] and data['upsell'].is_published():
+            upsell_obj = data['upsell']
             d['upsell'] = {
                 'id': upsell_obj.id,
                 'app_slug': upsell_obj.app_slug,
@@ -355,7 +429,7 @@ class WebappIndexer(BaseIndexer):
 
         d['versions'] = [dict(version=v.version,
                               resource_uri=reverse_version(v))
-                         for v in obj.versions.all()]
+                         for v in data['versions']]
 
         # Handle localized fields.
         # This adds both the field used for search and the one with
@@ -415,11 +489,12 @@ class WebappIndexer(BaseIndexer):
 
         log.info('Indexing %s webapps' % len(ids))
 
-        qs = Webapp.with_deleted.filter(id__in=ids)
+        objs = list(Webapp.with_deleted.filter(id__in=ids))
+        cls.attach_related(objs)
         ES = ES or cls.get_es()
 
         docs = []
-        for obj in list(qs):
+        for obj in objs:
             try:
                 docs.append(cls.extract_document(obj.id, obj=obj))
             except Exception as e:
@@ -428,7 +503,8 @@ class WebappIndexer(BaseIndexer):
                           # Trying to chase down a cache-machine problem.
                           exc_info="marketplace:" in str(e))
 
-        cls.bulk_index(docs, es=ES, index=index or cls.get_index())
+        cls.bulk_index(docs, es=ES, index=index or cls.get_index(),
+                       **cls.get_bulk_options(kw))
 
     @classmethod
     def filter_by_apps(cls, app_ids, queryset=None):
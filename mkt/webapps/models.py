@@ -7,6 +7,8 @@ import os
 import time
 import urlparse
 import uuid
+from array import array
+from bisect import bisect_left
 
 from django.conf import settings
 from django.core.cache import cache
@@ -18,7 +20,6 @@ from django.dispatch import receiver
 from django.utils.translation import trans_real as translation
 
 import commonware.log
-from cache_nuggets.lib import memoize, memoize_key
 from django_extensions.db.fields.json import JSONField
 from jingo.helpers import urlparams
 from jinja2.filters import do_dictsort
@@ -43,7 +44,6 @@ from mkt.files.models import File, nfd_str
 from mkt.files.utils import parse_addon, WebAppParser
 from mkt.prices.models import AddonPremium
 from mkt.ratings.models import Review
-from mkt.regions.utils import parse_region
 from mkt.site.decorators import use_master
 from mkt.site.helpers import absolutify
 from mkt.site.mail import send_mail
@@ -194,6 +194,21 @@ def attach_translations(addons):
     attach_trans_dict(Webapp, addons)
 
 
+def attach_excluded_regions(addons):
+    """
+    Attach the IDs of the regions each app is excluded from, for
+    get_excluded_region_ids(), from the per-region exclusions. Meant for
+    bulk callers like reindexing, which look at every app anyway.
+    """
+    exclusions = get_exclusions(mkt.regions.ALL_REGION_IDS)
+    for addon in addons:
+        addon._excluded_regions = []
+        for region_id, app_ids in exclusions.items():
+            i = bisect_left(app_ids, addon.id)
+            if i < len(app_ids) and app_ids[i] == addon.id:
+                addon._excluded_regions.append(region_id)
+
+
 class AddonUser(models.Model):
     addon = models.ForeignKey('Webapp')
     user = UserForeignKey()
@@ -1633,8 +1648,10 @@ class Webapp(UUIDModelMixin, OnChangeMixin, ModelBase):
 
         Note: free and in-app are not included in this.
         """
-        excluded = set(self.addonexcludedregion
-                           .values_list('region', flat=True))
+        excluded = getattr(self, '_excluded_regions', None)
+        if excluded is None:
+            excluded = get_excluded_regions(self.id)
+        excluded = set(excluded)
 
         if self.is_premium():
             all_regions = set(mkt.regions.ALL_REGION_IDS)
@@ -1649,12 +1666,6 @@ class Webapp(UUIDModelMixin, OnChangeMixin, ModelBase):
                 # countries that don't have payments.
                 excluded = excluded.union(all_regions.difference(price_ids))
 
-        geo = self.geodata
-        if geo.region_de_iarc_exclude or geo.region_de_usk_exclude:
-            excluded.add(mkt.regions.DEU.id)
-        if geo.region_br_iarc_exclude:
-            excluded.add(mkt.regions.BRA.id)
-
         return sorted(list(excluded))
 
     def get_price_region_ids(self):
@@ -2307,37 +2318,126 @@ class AddonExcludedRegion(ModelBase):
         return mkt.regions.REGIONS_CHOICES_ID_DICT.get(self.region)
 
 
-@memoize(prefix='get_excluded_in')
+EXCLUSIONS_CACHE_TIMEOUT = 60 * 60
+
+
+def exclusions_key(region_id):
+    return 'webapps:excluded-in:%s' % region_id
+
+
+def get_exclusions(region_ids):
+    """
+    Return a dict of the sorted array of the IDs of the Webapp objects
+    excluded from each region, or excluded due to Geodata flags.
+
+    The arrays are cached per region as compact strings, the missing ones
+    are built together with one query, plus one for Geodata if needed.
+    """
+    cached = cache.get_many([exclusions_key(r) for r in region_ids])
+    exclusions = {}
+    missing = []
+    for region_id in region_ids:
+        blob = cached.get(exclusions_key(region_id))
+        if blob is None:
+            missing.append(region_id)
+        else:
+            exclusions[region_id] = array('I')
+            exclusions[region_id].fromstring(blob)
+    if not missing:
+        return exclusions
+
+    excluded = dict((region_id, set()) for region_id in missing)
+    for region_id, app_id in (AddonExcludedRegion.objects
+                              .filter(region__in=missing)
+                              .values_list('region', 'addon')):
+        excluded[region_id].add(app_id)
+
+    # For pre-IARC unrated games in Brazil/Germany, and USK_RATING_REFUSED
+    # apps in Germany.
+    geodata_fields = {
+        mkt.regions.BRA.id: ['region_br_iarc_exclude'],
+        mkt.regions.DEU.id: ['region_de_iarc_exclude',
+                             'region_de_usk_exclude'],
+    }
+    geodata_regions = [r for r in missing if r in geodata_fields]
+    if geodata_regions:
+        fields = sum((geodata_fields[r] for r in geodata_regions), [])
+        geodata_qs = reduce(operator.or_, [Q(**{f: True}) for f in fields])
+        for row in (Geodata.objects.filter(geodata_qs)
+                    .values('addon', *fields)):
+            for region_id in geodata_regions:
+                if any(row[f] for f in geodata_fields[region_id]):
+                    excluded[region_id].add(row['addon'])
+
+    blobs = {}
+    for region_id, app_ids in excluded.items():
+        exclusions[region_id] = array('I', sorted(app_ids))
+        blobs[exclusions_key(region_id)] = exclusions[region_id].tostring()
+    cache.set_many(blobs, EXCLUSIONS_CACHE_TIMEOUT)
+    return exclusions
+
+
 def get_excluded_in(region_id):
     """
     Return IDs of Webapp objects excluded from a particular region or excluded
     due to Geodata flags.
     """
-    aers = list(AddonExcludedRegion.objects.filter(region=region_id)
-                .values_list('addon', flat=True))
+    return set(get_exclusions([region_id])[region_id])
+
+
+def excluded_regions_key(app_id):
+    return 'webapps:excluded-regions:%s' % app_id
+
+
+def get_excluded_regions(app_id):
+    """
+    Return IDs of the regions an app is excluded from, including because of
+    Geodata flags.
+    """
+    key = excluded_regions_key(app_id)
+    region_ids = cache.get(key)
+    if region_ids is None:
+        region_ids = list(AddonExcludedRegion.objects.filter(addon=app_id)
+                          .values_list('region', flat=True))
+        geo = (Geodata.objects.filter(addon=app_id)
+               .values('region_br_iarc_exclude', 'region_de_iarc_exclude',
+                       'region_de_usk_exclude').first())
+        if geo and (geo['region_de_iarc_exclude'] or
+                    geo['region_de_usk_exclude']):
+            region_ids.append(mkt.regions.DEU.id)
+        if geo and geo['region_br_iarc_exclude']:
+            region_ids.append(mkt.regions.BRA.id)
+        region_ids = sorted(set(region_ids))
+        cache.set(key, region_ids, EXCLUSIONS_CACHE_TIMEOUT)
+    return region_ids
+
+
+def clean_exclusions(region_ids=(), app_ids=()):
+    """
+    Drop the cached exclusions of the given regions and apps.
+
+    The receivers below call it right away, for the rest of the request,
+    and again once the transaction is committed: until then another process
+    could cache the exclusions as they were before the change.
+    """
+    cache.delete_many([exclusions_key(r) for r in region_ids] +
+                      [excluded_regions_key(a) for a in app_ids])
 
-    # For pre-IARC unrated games in Brazil/Germany.
-    geodata_qs = Q()
-    region = parse_region(region_id)
-    if region in (mkt.regions.BRA, mkt.regions.DEU):
-        geodata_qs |= Q(**{'region_%s_iarc_exclude' % region.slug: True})
-    # For USK_RATING_REFUSED apps in Germany.
-    if region == mkt.regions.DEU:
-        geodata_qs |= Q(**{'region_de_usk_exclude': True})
 
-    geodata_exclusions = []
-    if geodata_qs:
-        geodata_exclusions = list(Geodata.objects.filter(geodata_qs)
-                                  .values_list('addon', flat=True))
-    return set(aers + geodata_exclusions)
+def _clean_exclusions_after_commit(region_ids, app_ids):
+    from mkt.webapps.tasks import clean_exclusions_task
+    clean_exclusions(region_ids, app_ids)
+    clean_exclusions_task.delay(region_ids, app_ids)
 
 
 @receiver(models.signals.post_save, sender=AddonExcludedRegion,
           dispatch_uid='clean_memoized_exclusions')
-def clean_memoized_exclusions(sender, **kw):
+@receiver(models.signals.post_delete, sender=AddonExcludedRegion,
+          dispatch_uid='clean_memoized_exclusions_delete')
+def clean_memoized_exclusions(sender, instance, **kw):
+    # Only the region and the app of the exclusion changed.
     if not kw.get('raw'):
-        cache.delete_many([memoize_key('get_excluded_in', k)
-                           for k in mkt.regions.ALL_REGION_IDS])
+        _clean_exclusions_after_commit([instance.region], [instance.addon_id])
 
 
 class IARCCert(ModelBase):
@@ -2580,3 +2680,11 @@ class Geodata(ModelBase):
 for region in (mkt.regions.BRA, mkt.regions.DEU):
     field = models.BooleanField(default=False)
     field.contribute_to_class(Geodata, 'region_%s_iarc_exclude' % region.slug)
+
+
+@receiver(models.signals.post_save, sender=Geodata,
+          dispatch_uid='clean_geodata_exclusions')
+def clean_geodata_exclusions(sender, instance, **kw):
+    if not kw.get('raw'):
+        _clean_exclusions_after_commit(
+            [mkt.regions.BRA.id, mkt.regions.DEU.id], [instance.addon_id])
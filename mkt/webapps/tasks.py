@@ -6,9 +6,15 @@ import os
 import shutil
 import subprocess
 import tempfile
+import threading
+import urlparse
+from collections import defaultdict
+from itertools import izip_longest
+from multiprocessing.pool import ThreadPool
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.template import Context, loader
 from django.test.client import RequestFactory
@@ -24,7 +30,8 @@ from post_request_task.task import task
 import mkt
 from mkt.constants.regions import RESTOFWORLD
 from mkt.developers.models import ActivityLog
-from mkt.developers.tasks import _fetch_manifest, validator
+from mkt.developers.tasks import (_fetch_manifest, ContentNotModified,
+                                  validator)
 from mkt.files.models import FileUpload
 from mkt.reviewers.models import RereviewQueue
 from mkt.site.decorators import use_master
@@ -37,7 +44,7 @@ from mkt.site.utils import JSONEncoder, chunked
 from mkt.users.models import UserProfile
 from mkt.users.utils import get_task_user
 from mkt.webapps.indexers import HomescreenIndexer, WebappIndexer
-from mkt.webapps.models import Preview, Webapp
+from mkt.webapps.models import clean_exclusions, Preview, Webapp
 from mkt.webapps.utils import get_locale_properties
 
 
@@ -68,6 +75,14 @@ def update_last_updated(addon_id):
         Webapp.objects.filter(pk=pk).update(last_updated=t)
 
 
+@task
+def clean_exclusions_task(region_ids, app_ids, **kw):
+    """
+    Drop the cached region exclusions again once the change is committed.
+    """
+    clean_exclusions(region_ids, app_ids)
+
+
 @task
 def delete_preview_files(id, **kw):
     task_log.info('[1@None] Removing preview with id of %s.' % id)
@@ -91,6 +106,101 @@ def _log(webapp, message, rereview=False, exc_info=False):
                   exc_info=exc_info)
 
 
+def _manifest_validators_key(id):
+    return 'webapps:manifest-validators:%s' % id
+
+
+class ManifestFetch(object):
+    """
+    Fetches the manifest of a hosted app, conditionally when we know the
+    validators of the copy we have on file.
+    """
+
+    def __init__(self, url, validators=None):
+        self.url = url
+        # The validators we sent, including the hash of the content they
+        # belong to.
+        self.validators = validators or {}
+        # The validators of the content we got back, if any.
+        self.new_validators = {}
+        self.content = None
+        self.error = None
+        self.not_modified = False
+
+    @property
+    def host(self):
+        return urlparse.urlparse(self.url).netloc
+
+    def run(self):
+        validators = dict(self.validators)
+        try:
+            self.content = _fetch_manifest(self.url, validators=validators)
+            self.new_validators = validators
+        except ContentNotModified:
+            self.not_modified = True
+        except Exception, e:
+            self.error = e
+
+
+def _fetch_manifests(ids, conditional=True):
+    """
+    Fetch the manifests of the given apps concurrently and return a dict of
+    ManifestFetch by app id.
+
+    No more than settings.MANIFEST_FETCH_CONCURRENCY requests are in flight
+    at once, and no more than settings.MANIFEST_FETCH_HOST_CONCURRENCY to
+    the same host. Nothing in here touches the database outside of the
+    calling thread.
+    """
+    urls = dict(Webapp.objects.filter(pk__in=ids)
+                .values_list('id', 'manifest_url'))
+    cached = {}
+    if conditional and settings.MANIFEST_VALIDATORS_TIMEOUT:
+        cached = cache.get_many([_manifest_validators_key(id) for id in urls])
+    fetches = {}
+    for id, url in urls.items():
+        if url:
+            fetches[id] = ManifestFetch(
+                url, cached.get(_manifest_validators_key(id)))
+
+    by_host = defaultdict(list)
+    for fetch in fetches.values():
+        by_host[fetch.host].append(fetch)
+    host_limits = dict(
+        (host, threading.BoundedSemaphore(
+            settings.MANIFEST_FETCH_HOST_CONCURRENCY))
+        for host in by_host)
+    # Interleave the hosts so that workers aren't all waiting on the same
+    # one while requests to other hosts could be made.
+    queue = [fetch for group in izip_longest(*by_host.values())
+             for fetch in group if fetch]
+
+    def run(fetch):
+        with host_limits[fetch.host]:
+            fetch.run()
+
+    if queue:
+        pool = ThreadPool(min(settings.MANIFEST_FETCH_CONCURRENCY,
+                              len(queue)))
+        try:
+            pool.map(run, queue, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    return fetches
+
+
+def _set_manifest_validators(id, content, validators):
+    """
+    Remember the validators of the manifest `content` of app `id`. They are
+    only used while the file on record still has that content.
+    """
+    if settings.MANIFEST_VALIDATORS_TIMEOUT and validators:
+        cache.set(_manifest_validators_key(id),
+                  dict(validators, hash=_get_content_hash(content)),
+                  settings.MANIFEST_VALIDATORS_TIMEOUT)
+
+
 @task
 @use_master
 def update_manifests(ids, **kw):
@@ -103,8 +213,12 @@ def update_manifests(ids, **kw):
     # we'll need to log in as user.
     mkt.set_user(get_task_user())
 
+    # The network is the slow part, so fetch everything up front and
+    # concurrently. When we don't check hashes the manifests have to be
+    # processed anyway, so don't make the requests conditional either.
+    fetches = _fetch_manifests(ids, conditional=check_hash)
     for id in ids:
-        _update_manifest(id, check_hash, retries)
+        _update_manifest(id, check_hash, retries, fetch=fetches.get(id))
     if retries:
         try:
             update_manifests.retry(args=(retries.keys(),),
@@ -147,7 +261,7 @@ def notify_developers_of_failure(app, error_message, has_link=False):
                             context, recipient_list=to)
 
 
-def _update_manifest(id, check_hash, failed_fetches):
+def _update_manifest(id, check_hash, failed_fetches, fetch=None):
     webapp = Webapp.objects.get(pk=id)
     version = webapp.versions.latest()
     file_ = version.files.latest()
@@ -157,9 +271,22 @@ def _update_manifest(id, check_hash, failed_fetches):
         _log(webapp, u'Ignoring, no existing file')
         return
 
+    if fetch is not None and fetch.not_modified:
+        if fetch.validators.get('hash') == file_.hash:
+            _log(webapp, u'Manifest not modified')
+            return
+        # The validators were for content we didn't end up with on file
+        # (it failed validation, for instance): fetch it all again.
+        fetch = None
+    if fetch is None:
+        fetch = ManifestFetch(webapp.manifest_url)
+        fetch.run()
+
     # Fetch manifest, catching and logging any exception.
     try:
-        content = _fetch_manifest(webapp.manifest_url)
+        if fetch.error is not None:
+            raise fetch.error
+        content = fetch.content
     except Exception, e:
         msg = u'Failed to get manifest from %s. Error: %s' % (
             webapp.manifest_url, e)
@@ -180,6 +307,8 @@ def _update_manifest(id, check_hash, failed_fetches):
             _log(webapp, msg, rereview=False, exc_info=True)
         return
 
+    _set_manifest_validators(id, content, fetch.new_validators)
+
     # Check hash.
     if check_hash:
         hash_ = _get_content_hash(content)
@@ -269,7 +269,7 @@ class TestUpdateInstalls(mkt.site.tests.TestCase):
 
     @mock.patch('mkt.webapps.cron._get_installs')
     def test_installs_saved(self, _mock):
-        _mock.return_value = {'all': 12.0}
+        _mock.return_value = {self.app.id: {'all': 12.0}}
         update_app_installs()
 
         eq_(get_popularity(self.app), 12.0)
@@ -280,7 +280,7 @@ class TestUpdateInstalls(mkt.site.tests.TestCase):
                 eq_(get_popularity(self.app, region=region), 0.0)
 
         # Test running again updates the values as we'd expect.
-        _mock.return_value = {'all': 2.0}
+        _mock.return_value = {self.app.id: {'all': 2.0}}
         update_app_installs()
         eq_(get_popularity(self.app), 2.0)
         for region in mkt.regions.REGIONS_DICT.values():
@@ -293,23 +293,57 @@ class TestUpdateInstalls(mkt.site.tests.TestCase):
     def test_installs_deleted(self, _mock):
         self.app.trending.get_or_create(region=0, value=12.0)
 
-        _mock.return_value = {'all': 0.0}
+        _mock.return_value = {self.app.id: {'all': 0.0}}
         update_app_installs()
 
         with self.assertRaises(Installs.DoesNotExist):
             self.app.popularity.get(region=0)
 
+    @mock.patch('mkt.webapps.cron._get_installs')
+    def test_installs_fetched_together(self, _mock):
+        app2 = Webapp.objects.create(status=mkt.STATUS_PUBLIC)
+        _mock.return_value = {self.app.id: {'all': 12.0},
+                              app2.id: {'all': 3.0}}
+        update_app_installs()
+
+        eq_(_mock.call_count, 1)
+        eq_(sorted(_mock.call_args[0][0]), sorted([self.app.id, app2.id]))
+        eq_(get_popularity(self.app), 12.0)
+        eq_(get_popularity(app2), 3.0)
+
+    @mock.patch('mkt.webapps.cron._get_installs')
+    def test_regional_installs_deleted(self, _mock):
+        br = mkt.regions.BRA
+        _mock.return_value = {self.app.id: {'all': 12.0, br.slug: 3.0}}
+        update_app_installs()
+        eq_(self.app.popularity.get(region=br.id).value, 3.0)
+
+        _mock.return_value = {self.app.id: {'all': 12.0}}
+        update_app_installs()
+        eq_(self.app.popularity.get(region=0).value, 12.0)
+        with self.assertRaises(Installs.DoesNotExist):
+            self.app.popularity.get(region=br.id)
+
     @mock.patch('mkt.webapps.cron.get_monolith_client')
     def test_get_trending(self, _mock):
         client = mock.Mock()
         client.raw.return_value = {
             'aggregations': {
-                'popular': {'total_installs': {'value': 123}},
-                'region': {
+                'app': {
                     'buckets': [
                         {
-                            'key': 'br',
-                            'popular': {'total_installs': {'value': 12}}
+                            'key': self.app.id,
+                            'popular': {'total_installs': {'value': 123}},
+                            'region': {
+                                'buckets': [
+                                    {
+                                        'key': 'br',
+                                        'popular': {
+                                            'total_installs': {'value': 12}
+                                        }
+                                    }
+                                ]
+                            }
                         }
                     ]
                 }
@@ -317,8 +351,10 @@ class TestUpdateInstalls(mkt.site.tests.TestCase):
         }
         _mock.return_value = client
 
-        eq_(_get_installs(self.app.id)['all'], 123.0)
-        eq_(_get_installs(self.app.id)['br'], 12.0)
+        installs = _get_installs([self.app.id])
+        eq_(installs[self.app.id]['all'], 123.0)
+        eq_(installs[self.app.id]['br'], 12.0)
+        eq_(client.raw.call_count, 1)
 
     @mock.patch('mkt.webapps.cron.get_monolith_client')
     def test_get_installs_error(self, _mock):
@@ -326,7 +362,7 @@ class TestUpdateInstalls(mkt.site.tests.TestCase):
         client.raw.side_effect = ValueError
         _mock.return_value = client
 
-        eq_(_get_installs(self.app.id), {})
+        eq_(_get_installs([self.app.id]), {})
 
 
 class TestUpdateTrending(mkt.site.tests.TestCase):
@@ -336,7 +372,7 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
 
     @mock.patch('mkt.webapps.cron._get_trending')
     def test_trending_saved(self, _mock):
-        _mock.return_value = {'all': 12.0}
+        _mock.return_value = {self.app.id: {'all': 12.0}}
         update_app_trending()
 
         eq_(get_trending(self.app), 12.0)
@@ -347,7 +383,7 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
                 eq_(get_trending(self.app, region=region), 0.0)
 
         # Test running again updates the values as we'd expect.
-        _mock.return_value = {'all': 2.0}
+        _mock.return_value = {self.app.id: {'all': 2.0}}
         update_app_trending()
         eq_(get_trending(self.app), 2.0)
         for region in mkt.regions.REGIONS_DICT.values():
@@ -360,7 +396,7 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
     def test_trending_deleted(self, _mock):
         self.app.trending.get_or_create(region=0, value=12.0)
 
-        _mock.return_value = {'all': 0.0}
+        _mock.return_value = {self.app.id: {'all': 0.0}}
         update_app_trending()
 
         with self.assertRaises(Trending.DoesNotExist):
@@ -369,28 +405,34 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
     def _return_value(self, week1, week3):
         return {
             'aggregations': {
-                'week1': {'total_installs': {'value': week1}},
-                'week3': {'total_installs': {'value': week3}},
-            }
-        }
-
-    def _return_value_with_regions(self, week1, week3, rweek1, rweek3):
-        return {
-            'aggregations': {
-                'week1': {'total_installs': {'value': week1}},
-                'week3': {'total_installs': {'value': week3}},
-                'region': {
+                'app': {
                     'buckets': [
                         {
-                            'key': 'br',
-                            'week1': {'total_installs': {'value': rweek1}},
-                            'week3': {'total_installs': {'value': rweek3}},
+                            'key': self.app.id,
+                            'week1': {'total_installs': {'value': week1}},
+                            'week3': {'total_installs': {'value': week3}},
                         },
                     ]
                 }
             }
         }
 
+    def _return_value_with_regions(self, week1, week3, rweek1, rweek3):
+        res = self._return_value(week1, week3)
+        res['aggregations']['app']['buckets'][0]['region'] = {
+            'buckets': [
+                {
+                    'key': 'br',
+                    'week1': {'total_installs': {'value': rweek1}},
+                    'week3': {'total_installs': {'value': rweek3}},
+                },
+            ]
+        }
+        return res
+
+    def _get_trending(self):
+        return _get_trending([self.app.id]).get(self.app.id, {})
+
     @mock.patch('mkt.webapps.cron.get_monolith_client')
     def test_get_trending(self, _mock):
         client = mock.Mock()
@@ -400,7 +442,7 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
         # 1st week count: 255
         # Prior 3 weeks get averaged: (255) / 3 = 85
         # (255 - 85) / 85 = 2.0
-        eq_(_get_trending(self.app.id), {'all': 2.0})
+        eq_(self._get_trending(), {'all': 2.0})
 
     @mock.patch('mkt.webapps.cron.get_monolith_client')
     def test_get_trending_threshold(self, _mock):
@@ -410,7 +452,7 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
 
         # 1st week count: 99
         # 99 is less than 100 so we return {} as not trending.
-        eq_(_get_trending(self.app.id), {})
+        eq_(self._get_trending(), {})
 
     @mock.patch('mkt.webapps.cron.get_monolith_client')
     def test_get_trending_negative(self, _mock):
@@ -421,7 +463,7 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
         # 1st week count: 100
         # Prior 3 week count: 1000/3 = 333.3
         # (100 - 333.3) / 333.3 = -0.7 which gets set to 0.0.
-        eq_(_get_trending(self.app.id), {'all': 0.0})
+        eq_(self._get_trending(), {'all': 0.0})
 
     @mock.patch('mkt.webapps.cron.get_monolith_client')
     def test_get_trending_regional(self, _mock):
@@ -436,9 +478,9 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
         # 1st week regional count: 255
         # Prior 3 week regional count: 102/3 = 34
         # (255 - 34) / 34 = 6.5
-        eq_(_get_trending(self.app.id)['br'], 6.5)
+        eq_(self._get_trending()['br'], 6.5)
         # Make sure global trending is still correct.
-        eq_(_get_trending(self.app.id)['all'], 2.0)
+        eq_(self._get_trending()['all'], 2.0)
 
     @mock.patch('mkt.webapps.cron.get_monolith_client')
     def test_get_trending_regional_threshold(self, _mock):
@@ -450,9 +492,9 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
         # 1st week regional count: 99
         # Prior 3 week regional count: 99/3 = 33
         # (99 - 33) / 33 = 2.0 but week1 isn't > 100 so we set to zero.
-        eq_(_get_trending(self.app.id)['br'], 0.0)
+        eq_(self._get_trending()['br'], 0.0)
         # Make sure global trending is still correct.
-        eq_(_get_trending(self.app.id)['all'], 2.0)
+        eq_(self._get_trending()['all'], 2.0)
 
     @mock.patch('mkt.webapps.cron.get_monolith_client')
     def test_get_trending_regional_negative(self, _mock):
@@ -464,9 +506,9 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
         # 1st week regional count: 99
         # Prior 3 week regional count: 99/3 = 33
         # (99 - 33) / 33 = 2.0 but week1 isn't > 100 so we set to zero.
-        eq_(_get_trending(self.app.id)['br'], 0.0)
+        eq_(self._get_trending()['br'], 0.0)
         # Make sure global trending is still correct.
-        eq_(_get_trending(self.app.id)['all'], 2.0)
+        eq_(self._get_trending()['all'], 2.0)
 
     @mock.patch('mkt.webapps.cron.get_monolith_client')
     def test_get_trending_error(self, _mock):
@@ -474,4 +516,4 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
         client.raw.side_effect = ValueError
         _mock.return_value = client
 
-        eq_(_get_trending(self.app.id), {})
+        eq_(self._get_trending(), {})
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from django.test.utils import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 
 import json
 import mock
@@ -16,7 +17,8 @@ from mkt.tags.models import Tag
 from mkt.translations.utils import to_language
 from mkt.users.models import UserProfile
 from mkt.webapps.indexers import HomescreenIndexer, WebappIndexer
-from mkt.webapps.models import AddonDeviceType, ContentRating, Webapp
+from mkt.webapps.models import (AddonDeviceType, AddonUpsell, ContentRating,
+                                RatingDescriptors, Webapp)
 
 
 class TestWebappIndexer(TestCase):
@@ -157,6 +159,56 @@ class TestWebappIndexer(TestCase):
         eq_(doc['is_rereviewed'], True)
         self.assertCloseToNow(doc['rereview_date'])
 
+    def test_extract_owners(self):
+        obj, doc = self._get_doc()
+        eq_(doc['owners'], [self.user.pk])
+
+    def test_extract_content_descriptors(self):
+        RatingDescriptors.objects.create(addon=self.app, has_esrb_blood=True)
+        obj, doc = self._get_doc()
+        eq_(doc['content_descriptors'], ['has_esrb_blood'])
+
+    def test_extract_upsell(self):
+        premium = app_factory(premium_type=mkt.ADDON_PREMIUM)
+        AddonUpsell.objects.create(free=self.app, premium=premium)
+        obj, doc = self._get_doc()
+        eq_(doc['upsell']['id'], premium.pk)
+        eq_(doc['upsell']['app_slug'], premium.app_slug)
+
+    def test_attach_related_same_documents(self):
+        EscalationQueue.objects.create(addon=self.app)
+        others = [app_factory(), app_factory()]
+        ids = [self.app.pk] + [app.pk for app in others]
+        docs = [WebappIndexer.extract_document(obj.pk, obj)
+                for obj in Webapp.objects.filter(id__in=ids)]
+
+        objs = list(Webapp.objects.filter(id__in=ids))
+        WebappIndexer.attach_related(objs)
+        eq_([WebappIndexer.extract_document(obj.pk, obj) for obj in objs],
+            docs)
+
+    def test_attach_related_queries(self):
+        # Whatever the number of apps, each of these tables should only be
+        # queried once by attach_related.
+        tables = ('addon_upsell', 'addons_premium', 'addons_users',
+                  'escalation_queue', 'previews', 'rereview_queue',
+                  'webapps_rating_descriptors', 'webapps_rating_interactives')
+        apps = [self.app] + [app_factory() for i in range(3)]
+        for app in apps:
+            EscalationQueue.objects.create(addon=app)
+            RereviewQueue.objects.create(addon=app)
+            RatingDescriptors.objects.create(addon=app)
+        objs = list(Webapp.objects.filter(id__in=[app.pk for app in apps]))
+
+        with CaptureQueriesContext(connection) as queries:
+            WebappIndexer.attach_related(objs)
+            for obj in objs:
+                WebappIndexer.extract_document(obj.pk, obj)
+
+        for table in tables:
+            eq_(len([q for q in queries.captured_queries
+                     if 'FROM `%s`' % table in q['sql']]), 1, table)
+
     def test_extract_is_priority(self):
         self.app.update(priority_review=True)
         obj, doc = self._get_doc()
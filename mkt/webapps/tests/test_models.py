@@ -54,7 +54,8 @@ from mkt.versions.models import update_status, Version
 from mkt.webapps.indexers import WebappIndexer
 from mkt.webapps.models import (AddonDeviceType, AddonExcludedRegion,
                                 AddonUpsell, AppFeatures, AppManifest,
-                                BlockedSlug, ContentRating, Geodata,
+                                attach_excluded_regions, BlockedSlug,
+                                ContentRating, Geodata,
                                 get_excluded_in, IARCCert, Installed,
                                 Preview, RatingDescriptors, RatingInteractives,
                                 version_changed, Webapp)
@@ -233,6 +234,56 @@ class TestWebapp(WebappTestCase):
         AddonExcludedRegion.objects.create(addon=app, region=region.id)
         self.assertSetEqual(get_excluded_in(region.id), [app.id])
 
+    def test_excluded_in_cleaned_per_region(self):
+        app = self.get_app()
+        AddonExcludedRegion.objects.create(addon=app,
+                                           region=mkt.regions.BRA.id)
+        self.assertSetEqual(get_excluded_in(mkt.regions.BRA.id), [app.id])
+        self.assertSetEqual(get_excluded_in(mkt.regions.DEU.id), [])
+
+        aer = AddonExcludedRegion.objects.create(addon=app,
+                                                 region=mkt.regions.DEU.id)
+        with self.assertNumQueries(0):
+            self.assertSetEqual(get_excluded_in(mkt.regions.BRA.id), [app.id])
+        self.assertSetEqual(get_excluded_in(mkt.regions.DEU.id), [app.id])
+
+        aer.delete()
+        self.assertSetEqual(get_excluded_in(mkt.regions.DEU.id), [])
+
+    @mock.patch('mkt.webapps.models.get_exclusions')
+    def test_excluded_region_ids_cached(self, get_exclusions):
+        app = self.get_app()
+        AddonExcludedRegion.objects.create(addon=app,
+                                           region=mkt.regions.BRA.id)
+        eq_(app.get_excluded_region_ids(), [mkt.regions.BRA.id])
+        with self.assertNumQueries(0):
+            eq_(app.get_excluded_region_ids(), [mkt.regions.BRA.id])
+        # A single app doesn't need the exclusions of every region.
+        assert not get_exclusions.called
+
+        app._geodata.update(region_de_usk_exclude=True)
+        eq_(app.get_excluded_region_ids(),
+            [mkt.regions.BRA.id, mkt.regions.DEU.id])
+
+    def test_attach_excluded_regions(self):
+        app = self.get_app()
+        other = app_factory()
+        AddonExcludedRegion.objects.create(addon=app,
+                                           region=mkt.regions.BRA.id)
+        other._geodata.update(region_de_usk_exclude=True)
+        apps = [Webapp.objects.get(pk=app.pk), Webapp.objects.get(pk=other.pk)]
+        attach_excluded_regions(apps)
+        with self.assertNumQueries(0):
+            eq_(apps[0].get_excluded_region_ids(), [mkt.regions.BRA.id])
+            eq_(apps[1].get_excluded_region_ids(), [mkt.regions.DEU.id])
+
+    @mock.patch('mkt.webapps.tasks.clean_exclusions_task.delay')
+    def test_exclusions_cleaned_after_commit(self, delay):
+        app = self.get_app()
+        AddonExcludedRegion.objects.create(addon=app,
+                                           region=mkt.regions.BRA.id)
+        delay.assert_called_with([mkt.regions.BRA.id], [app.id])
+
     def test_supported_locale_property(self):
         app = self.get_app()
         eq_(app.supported_locales,
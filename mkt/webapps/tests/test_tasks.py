@@ -4,13 +4,17 @@ import hashlib
 import json
 import os
 import tarfile
+import threading
+import time
 from copy import deepcopy
 from tempfile import mkdtemp
 
 from django.conf import settings
 from django.core import mail
+from django.core.cache import cache
 from django.core.management import call_command
 from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
 
 import mock
 from nose.tools import eq_, ok_
@@ -29,7 +33,8 @@ from mkt.users.models import UserProfile
 from mkt.versions.models import Version
 from mkt.webapps.cron import dump_user_installs_cron
 from mkt.webapps.models import AddonUser, Webapp
-from mkt.webapps.tasks import (dump_app, export_data,
+from mkt.webapps.tasks import (_fetch_manifests, _get_content_hash,
+                               _manifest_validators_key, dump_app, export_data,
                                notify_developers_of_failure, pre_generate_apk,
                                PreGenAPKError, rm_directory, update_manifests)
 
@@ -315,6 +320,70 @@ class TestUpdateManifest(mkt.site.tests.TestCase):
         assert not retry.called
         assert RereviewQueue.objects.filter(addon=self.addon).exists()
 
+    def test_manifest_not_modified(self):
+        self.response_mock.headers['ETag'] = '"v1"'
+        self.file.update(hash=_get_content_hash(self._data()))
+        update_manifests(ids=(self.addon.pk,))
+        ok_('If-None-Match' not in self.req_mock.call_args[1]['headers'])
+
+        # The server says our copy is current: nothing else happens, even
+        # though it would now serve something different.
+        self.response_mock.status_code = 304
+        self.new['version'] = '1.1'
+        update_manifests(ids=(self.addon.pk,))
+        eq_(self.req_mock.call_args[1]['headers']['If-None-Match'], '"v1"')
+        assert not self.validator.called
+        eq_(FileUpload.objects.count(), 0)
+
+    def test_manifest_not_modified_stale_validators(self):
+        # These validators are for content we don't have on file, so a 304
+        # can't be trusted and the manifest is fetched again.
+        cache.set(_manifest_validators_key(self.addon.pk),
+                  {'etag': '"v0"', 'hash': 'sha256:invalid'})
+        not_modified = mock.Mock(status_code=304, headers={})
+        self.req_mock.side_effect = [not_modified, self.response_mock]
+        self._run()
+        eq_(self.req_mock.call_count, 2)
+        eq_(self.req_mock.call_args_list[0][1]['headers']['If-None-Match'],
+            '"v0"')
+        ok_('If-None-Match' not in self.req_mock.call_args[1]['headers'])
+        eq_(self.addon.versions.latest().version, '1.0')
+
+    def test_manifest_no_check_hash_not_conditional(self):
+        cache.set(_manifest_validators_key(self.addon.pk),
+                  {'etag': '"v1"', 'hash': self.file.hash})
+        self._run(check_hash=False)
+        ok_('If-None-Match' not in self.req_mock.call_args[1]['headers'])
+
+    @override_settings(MANIFEST_FETCH_CONCURRENCY=4,
+                       MANIFEST_FETCH_HOST_CONCURRENCY=1)
+    @mock.patch('mkt.webapps.tasks._fetch_manifest')
+    def test_fetch_manifests_concurrently(self, fetch):
+        lock = threading.Lock()
+        active = {}
+        peaks = {}
+
+        def fetch_manifest(url, validators=None):
+            host = url.split('/')[2]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peaks[host] = max(peaks.get(host, 0), active[host])
+            time.sleep(0.05)
+            with lock:
+                active[host] -= 1
+            return url
+
+        fetch.side_effect = fetch_manifest
+        apps = [Webapp.objects.create(
+            manifest_url='http://%s.example.com/%s.webapp' % (host, i))
+            for host in ('a', 'b') for i in range(3)]
+        fetches = _fetch_manifests([app.pk for app in apps])
+        eq_(sorted(fetches), sorted(app.pk for app in apps))
+        for app in apps:
+            eq_(fetches[app.pk].content, app.manifest_url)
+        # Never more than one request at a time to the same host.
+        eq_(peaks, {'a.example.com': 1, 'b.example.com': 1})
+
     def test_manifest_validation_failure(self):
         # We are already mocking validator, but this test needs to make sure
         # it actually saves our custom validation result, so add that.
@@ -32,7 +32,7 @@ class TestImportGamesFromCSV(TestCase):
     def _requests_side_effect(self, url, **kw):
         return self._get_requests_mock(is_icon='icon' in url)
 
-    @mock.patch('mkt.developers.tasks.pngcrush_image')
+    @mock.patch('mkt.developers.tasks.pngcrush_files')
     @mock.patch('mkt.developers.tasks.requests.get')
     def test_import(self, requests_mock, crush_mock):
         requests_mock.side_effect = self._requests_side_effect
@@ -57,7 +57,7 @@ class TestImportGamesFromCSV(TestCase):
         ok_(dt2.icon_hash)
         ok_(dt2.promo_img_hash)
 
-    @mock.patch('mkt.developers.tasks.pngcrush_image')
+    @mock.patch('mkt.developers.tasks.pngcrush_files')
     @mock.patch('mkt.developers.tasks.requests.get')
     def test_no_dupes(self, requests_mock, crush_mock):
         requests_mock.side_effect = self._requests_side_effect
@@ -17,7 +17,7 @@ class TestFetchPromoImgs(mkt.site.tests.TestCase):
     def setUp(self):
         self.website = website_factory()
 
-    @mock.patch('mkt.developers.tasks.pngcrush_image')
+    @mock.patch('mkt.developers.tasks.pngcrush_files')
     @mock.patch('mkt.developers.tasks.requests.get')
     def test_saves_promo_img(self, requests_mock, crush_mock):
         img_path = os.path.join(settings.ROOT, 'mkt', 'site', 'tests',
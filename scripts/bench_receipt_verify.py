@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+"""
+Compares the receipt verifier running on sync workers with running on
+gevent, waiting on a database over real sockets.
+
+    python scripts/bench_receipt_verify.py --mode=sync --concurrency=8
+    python scripts/bench_receipt_verify.py --mode=gevent --concurrency=200
+
+In sync mode each of the --concurrency threads verifies one receipt at a
+time, like the same number of sync gunicorn workers. In gevent mode a single
+process verifies up to --concurrency receipts at once, like one worker using
+services/wsgi/receiptverify_gevent.py.
+
+By default queries go to a stand-in for MySQL: a separate process that
+answers each query on its socket after --latency milliseconds. The verifier
+blocks on that socket the way PyMySQL blocks on MySQL's, so gevent only gets
+to run other requests in the meantime because it patched the socket, not
+because the wait is a patched sleep. With --mysql the queries go to the
+database in the settings instead, through PyMySQL in gevent mode like
+receiptverify_gevent.py; --app-id and --user-uuid must then name a
+purchase in it.
+
+Decoding receipts is stubbed out and the purchase cache is disabled, so the
+numbers only reflect waiting on the database.
+"""
+import calendar
+import optparse
+import os
+import signal
+import socket
+import SocketServer
+import sys
+import threading
+import time
+from StringIO import StringIO
+from urlparse import urlparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def percentile(timings, percent):
+    return timings[min(len(timings) - 1, int(len(timings) * percent / 100))]
+
+
+class StandInHandler(SocketServer.BaseRequestHandler):
+    """Answers each byte received on a connection after `latency` seconds."""
+
+    def handle(self):
+        while self.request.recv(1):
+            time.sleep(self.server.latency)
+            self.request.sendall('r')
+
+
+def start_stand_in(latency):
+    """
+    Forks a process serving StandInHandler, returns its pid and address.
+
+    This has to happen before gevent patches anything: the stand-in uses
+    real threads and sleeps, only the verifier's side of the socket is
+    cooperative.
+    """
+    server = SocketServer.ThreadingTCPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    pid = os.fork()
+    if not pid:
+        server.serve_forever()
+        os._exit(0)
+    server.socket.close()
+    return pid, server.server_address
+
+
+class StandInCursor(object):
+    """Waits on the stand-in for every query, answers with a purchase."""
+
+    def __init__(self, sock, purchase_type):
+        self.sock = sock
+        self.purchase_type = purchase_type
+
+    def execute(self, sql, params=None):
+        self.sock.sendall('q')
+        if not self.sock.recv(1):
+            raise IOError('The stand-in database went away.')
+
+    def fetchone(self):
+        return (self.purchase_type,)
+
+    def fetchall(self):
+        return []
+
+
+class StandInConnection(object):
+
+    def __init__(self, address, purchase_type):
+        self.sock = socket.create_connection(address)
+        self.purchase_type = purchase_type
+
+    def cursor(self):
+        return StandInCursor(self.sock, self.purchase_type)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.sock.close()
+
+
+def setup(options, address):
+    """
+    Points the verifier at the stand-in database, or at MySQL if `address`
+    is None, returns a function verifying one receipt.
+    """
+    for path in (ROOT, os.path.join(ROOT, 'services')):
+        sys.path.insert(0, path)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mkt.settings')
+
+    if address is None and options.mode == 'gevent':
+        # Like receiptverify_gevent.py, before services.utils imports
+        # MySQLdb.
+        import pymysql
+        pymysql.install_as_MySQLdb()
+
+    import sqlalchemy.pool as pool
+
+    from lib.utils import static_url
+    from services import utils, verify
+
+    if address is None:
+        getconn = utils.getconn
+    else:
+        def getconn():
+            return StandInConnection(address, verify.CONTRIB_PURCHASE)
+
+    verify.mypool = pool.QueuePool(getconn, pool_size=options.pool_size,
+                                   max_overflow=0, timeout=60)
+    verify.purchase_cache.maxsize = 0
+
+    receipt_url = urlparse(static_url('WEBAPPS_RECEIPT_URL'))
+    decoded = {
+        'exp': calendar.timegm(time.gmtime()) + 3600,
+        'product': {'storedata': 'id=%s' % options.app_id},
+        'typ': 'purchase-receipt',
+        'user': {'type': 'directed-identifier', 'value': options.user_uuid},
+        'verify': receipt_url.geturl(),
+    }
+    verify.decode_receipt = lambda receipt: dict(decoded)
+
+    def request():
+        environ = {'PATH_INFO': receipt_url.path, 'REQUEST_METHOD': 'POST',
+                   'wsgi.input': StringIO('receipt')}
+        start = time.time()
+        body = verify.application(environ, lambda status, headers: None)
+        assert '"ok"' in body[0], body
+        return time.time() - start
+
+    return request
+
+
+def run_sync(request, options):
+    timings = []
+    remaining = [options.requests]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+            timings.append(request())
+
+    threads = [threading.Thread(target=worker)
+               for i in range(options.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings
+
+
+def run_gevent(request, options):
+    from gevent.pool import Pool
+
+    pool = Pool(options.concurrency)
+    return pool.map(lambda i: request(), range(options.requests))
+
+
+def main():
+    parser = optparse.OptionParser(usage=__doc__)
+    parser.add_option('--mode', choices=['sync', 'gevent'], default='sync')
+    parser.add_option('--concurrency', type='int', default=8,
+                      help='Receipts being verified at once.')
+    parser.add_option('--requests', type='int', default=2000)
+    parser.add_option('--latency', type='float', default=20,
+                      help='Milliseconds the stand-in database takes to '
+                           'answer a query.')
+    parser.add_option('--pool-size', type='int', default=5,
+                      help='Size of the database connection pool.')
+    parser.add_option('--mysql', action='store_true', default=False,
+                      help='Query the database in the settings instead of '
+                           'the stand-in.')
+    parser.add_option('--app-id', type='int', default=1,
+                      help='App of the receipts, with --mysql.')
+    parser.add_option('--user-uuid', default='some-uuid',
+                      help='User of the receipts, with --mysql.')
+    options, args = parser.parse_args()
+
+    pid, address = None, None
+    if not options.mysql:
+        pid, address = start_stand_in(options.latency / 1000.0)
+
+    if options.mode == 'gevent':
+        # This has to happen before the verifier is imported.
+        from gevent import monkey
+        monkey.patch_all()
+
+    try:
+        request = setup(options, address)
+        run = run_gevent if options.mode == 'gevent' else run_sync
+        start = time.time()
+        timings = sorted(run(request, options))
+        elapsed = time.time() - start
+    finally:
+        if pid:
+            os.kill(pid, signal.SIGTERM)
+
+    print '%s: %s requests, concurrency %s, pool size %s, %s' % (
+        options.mode, options.requests, options.concurrency,
+        options.pool_size,
+        'mysql' if options.mysql else '%sms stand-in' % options.latency)
+    print '  %.1f requests/second' % (len(timings) / elapsed)
+    print '  p50 %.1fms, p99 %.1fms' % (percentile(timings, 50) * 1000,
+                                        percentile(timings, 99) * 1000)
+
+
+if __name__ == '__main__':
+    main()
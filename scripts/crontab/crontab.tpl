@@ -12,6 +12,7 @@ HOME=/tmp
 # Once per hour.
 20 * * * * %(z_cron)s addon_last_updated
 50 * * * * %(z_cron)s cleanup_extracted_file
+55 * * * * %(z_cron)s cleanup_file_uploads
 
 # Twice per day.
 25 17,5 * * * %(z_cron)s hide_disabled_files
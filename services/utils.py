@@ -1,6 +1,9 @@
 import logging
 import logging.config
 import os
+import threading
+import time
+from collections import OrderedDict
 
 
 # get the right settings module
@@ -18,6 +21,7 @@ import MySQLdb as mysql  # noqa
 import sqlalchemy.pool as pool  # noqa
 
 from django.utils import importlib  # noqa
+from django_statsd.clients import statsd  # noqa
 settings = importlib.import_module(settingmodule)
 
 from mkt.constants.payments import (  # noqa
@@ -33,7 +37,63 @@ def getconn():
                          passwd=db['PASSWORD'], db=db['NAME'])
 
 
-mypool = pool.QueuePool(getconn, max_overflow=10, pool_size=5, recycle=300)
+mypool = pool.QueuePool(
+    getconn, recycle=300,
+    pool_size=settings.SERVICES_DATABASE_POOL_SIZE,
+    max_overflow=settings.SERVICES_DATABASE_POOL_MAX_OVERFLOW)
+
+
+class LRUCache(object):
+    """
+    A bounded, in-process cache where each entry expires at its own time.
+    Once `maxsize` entries are stored, the least recently used one is dropped.
+    A `maxsize` of 0 disables the cache.
+
+    Hits and misses are counted in statsd as `services.cache.<name>.hit` and
+    `services.cache.<name>.miss`.
+    """
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the value for `key`, or None if missing or expired."""
+        if self.maxsize <= 0:
+            return None
+
+        with self.lock:
+            value, expires = self.data.pop(key, (None, 0))
+            if expires > time.time():
+                # Put it back as the most recently used entry.
+                self.data[key] = (value, expires)
+            else:
+                value = None
+
+        statsd.incr('services.cache.%s.%s'
+                    % (self.name, 'miss' if value is None else 'hit'))
+        return value
+
+    def set(self, key, value, expires):
+        """Stores `value` for `key` until the `expires` timestamp."""
+        if self.maxsize <= 0 or value is None or expires <= time.time():
+            return
+
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = (value, expires)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
 
 
 def log_configure():
@@ -1,13 +1,17 @@
 import calendar
+import copy
+import hashlib
 import json
 from datetime import datetime
 import sys
 from time import gmtime, time
 from urlparse import parse_qsl, urlparse
+from uuid import uuid4
 from wsgiref.handlers import format_date_time
 
 import jwt
 from browserid.errors import ExpiredSignatureError
+from django.core.cache import cache
 from django_statsd.clients import statsd
 from receipts import certs
 
@@ -19,7 +23,7 @@ from services.utils import settings
 
 from utils import (CONTRIB_CHARGEBACK, CONTRIB_NO_CHARGE, CONTRIB_PURCHASE,
                    CONTRIB_REFUND, log_configure, log_exception, log_info,
-                   mypool)
+                   LRUCache, mypool)
 
 # Go configure the log.
 log_configure()
@@ -30,11 +34,74 @@ import receipts  # noqa
 status_codes = {
     200: '200 OK',
     204: '204 OK',
+    400: '400 Bad Request',
     405: '405 Method Not Allowed',
     500: '500 Internal Server Error',
 }
 
 
+# Decoded receipts, keyed by the hash of the receipt.
+decoded_cache = LRUCache('decode', settings.WEBAPPS_RECEIPT_DECODE_CACHE_SIZE)
+
+# Purchase lookups, keyed by ('app', app id, uuid) or
+# ('inapp', contribution id), along with the change marker of the purchase
+# when it was looked up.
+purchase_cache = LRUCache('purchase',
+                          settings.WEBAPPS_RECEIPT_PURCHASE_CACHE_SIZE)
+
+
+def purchase_marker_key(key):
+    return 'services:verify:purchase:%s' % ':'.join(str(k) for k in key)
+
+
+def get_purchase_markers(keys):
+    """
+    Returns a dict of the change markers of the purchases with the given
+    purchase_cache `keys`, None for the purchases that haven't changed.
+
+    The markers live in memcache, where the marketplace sets them when a
+    purchase changes (see forget_purchases), so that all the verifier
+    processes stop using their cached lookup of it.
+    """
+    if not purchase_cache.maxsize or not keys:
+        return {}
+    markers = cache.get_many([purchase_marker_key(key) for key in keys])
+    return dict((key, markers.get(purchase_marker_key(key))) for key in keys)
+
+
+def get_cached_purchase(key, markers):
+    """
+    Returns the cached lookup of `key`, unless the purchase has changed
+    since it was looked up.
+    """
+    cached = purchase_cache.get(key)
+    if cached is not None and cached[1] == markers.get(key):
+        return cached[0]
+
+
+def cache_purchase(key, result, markers):
+    """
+    Caches the lookup of `key`. `markers` have to be fetched before the
+    lookup, so that a change made in between is not missed.
+    """
+    if result is None:
+        return
+    timeout = settings.WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT
+    purchase_cache.set(key, (result, markers.get(key)), time() + timeout)
+
+
+def forget_purchases(keys):
+    """
+    Makes every verifier process look the purchases with the given
+    purchase_cache `keys` up again. Call it once the change is committed.
+    """
+    # Outlive the cached lookups: a marker expiring before them would make
+    # them look fresh again.
+    timeout = settings.WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT * 2
+    cache.set_many(dict((purchase_marker_key(key), uuid4().hex)
+                        for key in keys), timeout)
+
+
 class VerificationError(Exception):
     pass
 
@@ -65,11 +132,8 @@ class Verify:
         This is the default that verify will use, this will
         do the entire stack of checks.
         """
-        receipt_domain = urlparse(static_url('WEBAPPS_RECEIPT_URL')).netloc
         try:
-            self.decoded = self.decode()
-            self.check_type('purchase-receipt')
-            self.check_url(receipt_domain)
+            self.check_receipt()
             self.check_purchase()
         except InvalidReceipt, err:
             return self.invalid(str(err))
@@ -78,6 +142,16 @@ class Verify:
 
         return self.ok_or_expired()
 
+    def check_receipt(self):
+        """
+        Decodes the receipt and checks that it is a purchase receipt
+        meant to be verified here, without looking up the purchase.
+        """
+        receipt_domain = urlparse(static_url('WEBAPPS_RECEIPT_URL')).netloc
+        self.decoded = self.decode()
+        self.check_type('purchase-receipt')
+        self.check_url(receipt_domain)
+
     def check_without_purchase(self):
         """
         This is what the developer and reviewer receipts do, we aren't
@@ -240,15 +314,25 @@ class Verify:
         """
         Verifies that the inapp has been purchased.
         """
-        self.setup_db()
-        sql = """SELECT i.guid, c.type FROM stats_contributions c
-                 JOIN inapp_products i ON i.id=c.inapp_product_id
-                 WHERE c.id = %(contribution_id)s LIMIT 1;"""
-        self.cursor.execute(
-            sql,
-            {'contribution_id': self.get_contribution_id()}
-        )
-        result = self.cursor.fetchone()
+        contribution_id = self.get_contribution_id()
+        key = ('inapp', contribution_id)
+        markers = get_purchase_markers([key])
+        result = get_cached_purchase(key, markers)
+        if result is None:
+            self.setup_db()
+            sql = """SELECT i.guid, c.type FROM stats_contributions c
+                     JOIN inapp_products i ON i.id=c.inapp_product_id
+                     WHERE c.id = %(contribution_id)s LIMIT 1;"""
+            self.cursor.execute(sql, {'contribution_id': contribution_id})
+            result = self.cursor.fetchone()
+            cache_purchase(key, result, markers)
+        self.check_purchase_inapp_result(result)
+
+    def check_purchase_inapp_result(self, result):
+        """
+        Verifies the (inapp guid, contribution type) row found for the
+        contribution in the receipt.
+        """
         if not result:
             log_info('Invalid in-app receipt, no purchase')
             raise InvalidReceipt('NO_PURCHASE')
@@ -266,13 +350,24 @@ class Verify:
         """
         Verifies that the app has been purchased by the user.
         """
-        self.setup_db()
-        sql = """SELECT type FROM addon_purchase
-                 WHERE addon_id = %(app_id)s
-                 AND uuid = %(uuid)s LIMIT 1;"""
-        self.cursor.execute(sql, {'app_id': self.get_app_id(),
-                                  'uuid': self.get_user()})
-        result = self.cursor.fetchone()
+        app_id, uuid = self.get_app_id(), self.get_user()
+        key = ('app', app_id, uuid)
+        markers = get_purchase_markers([key])
+        result = get_cached_purchase(key, markers)
+        if result is None:
+            self.setup_db()
+            sql = """SELECT type FROM addon_purchase
+                     WHERE addon_id = %(app_id)s
+                     AND uuid = %(uuid)s LIMIT 1;"""
+            self.cursor.execute(sql, {'app_id': app_id, 'uuid': uuid})
+            result = self.cursor.fetchone()
+            cache_purchase(key, result, markers)
+        self.check_purchase_app_result(result)
+
+    def check_purchase_app_result(self, result):
+        """
+        Verifies the (type,) row found for the app and user in the receipt.
+        """
         if not result:
             log_info('Invalid app receipt, no purchase')
             raise InvalidReceipt('NO_PURCHASE')
@@ -356,6 +451,125 @@ class Verify:
         return {'status': 'expired'}
 
 
+class VerifyBatch:
+    """
+    Verifies a list of purchase receipts, like `Verify.check_full` does for
+    a single one, but looks up all the purchases with one query per receipt
+    flavour (app or in-app) instead of one query per receipt.
+    """
+
+    def __init__(self, batch, environ):
+        self.verifiers = [Verify(receipt, environ) for receipt in batch]
+
+        # This is so the unit tests can override the connection.
+        self.conn, self.cursor = None, None
+
+    def setup_db(self):
+        if not self.cursor:
+            self.conn = mypool.connect()
+            self.cursor = self.conn.cursor()
+
+    def check_full(self):
+        """
+        Returns the verification results in the same order as the receipts.
+        """
+        results = [None] * len(self.verifiers)
+        # Maps the index of each receipt still to check to its lookup key.
+        apps, inapps = {}, {}
+        for index, verifier in enumerate(self.verifiers):
+            try:
+                verifier.check_receipt()
+                if 'contrib' in verifier.get_storedata():
+                    inapps[index] = verifier.get_contribution_id()
+                else:
+                    apps[index] = (verifier.get_app_id(), verifier.get_user())
+            except InvalidReceipt, err:
+                results[index] = verifier.invalid(str(err))
+
+        app_rows = self.get_app_purchases(apps.values())
+        for index, key in apps.items():
+            verifier = self.verifiers[index]
+            results[index] = self.finish(
+                verifier, verifier.check_purchase_app_result,
+                app_rows.get(key))
+
+        inapp_rows = self.get_inapp_purchases(inapps.values())
+        for index, key in inapps.items():
+            verifier = self.verifiers[index]
+            results[index] = self.finish(
+                verifier, verifier.check_purchase_inapp_result,
+                inapp_rows.get(key))
+
+        return results
+
+    def finish(self, verifier, check, result):
+        try:
+            check(result)
+        except InvalidReceipt, err:
+            return verifier.invalid(str(err))
+        except RefundedReceipt:
+            return verifier.refund()
+
+        return verifier.ok_or_expired()
+
+    def get_app_purchases(self, keys):
+        """
+        Returns a dict of (app id, uuid) to (type,) for the purchases
+        matching `keys`.
+        """
+        rows = {}
+        markers = get_purchase_markers([('app',) + key for key in keys])
+        for key in keys:
+            result = get_cached_purchase(('app',) + key, markers)
+            if result is not None:
+                rows[key] = result
+        keys = [key for key in keys if key not in rows]
+        if not keys:
+            return rows
+        self.setup_db()
+        app_ids = sorted(set(app_id for app_id, uuid in keys))
+        uuids = sorted(set(uuid for app_id, uuid in keys))
+        sql = """SELECT addon_id, uuid, type FROM addon_purchase
+                 WHERE addon_id IN ({app_ids})
+                 AND uuid IN ({uuids});""".format(
+            app_ids=', '.join(['%s'] * len(app_ids)),
+            uuids=', '.join(['%s'] * len(uuids)))
+        self.cursor.execute(sql, app_ids + uuids)
+        for app_id, uuid, purchase_type in self.cursor.fetchall():
+            if (app_id, uuid) not in rows:
+                rows[(app_id, uuid)] = (purchase_type,)
+                cache_purchase(('app', app_id, uuid), (purchase_type,),
+                               markers)
+        return rows
+
+    def get_inapp_purchases(self, keys):
+        """
+        Returns a dict of contribution id to (inapp guid, type) for the
+        contributions matching `keys`.
+        """
+        rows = {}
+        markers = get_purchase_markers([('inapp', key) for key in keys])
+        for key in keys:
+            result = get_cached_purchase(('inapp', key), markers)
+            if result is not None:
+                rows[key] = result
+        keys = [key for key in keys if key not in rows]
+        if not keys:
+            return rows
+        self.setup_db()
+        contribution_ids = sorted(set(keys))
+        sql = """SELECT c.id, i.guid, c.type FROM stats_contributions c
+                 JOIN inapp_products i ON i.id=c.inapp_product_id
+                 WHERE c.id IN ({ids});""".format(
+            ids=', '.join(['%s'] * len(contribution_ids)))
+        self.cursor.execute(sql, contribution_ids)
+        for contribution_id, guid, purchase_type in self.cursor.fetchall():
+            rows[contribution_id] = (guid, purchase_type)
+            cache_purchase(('inapp', contribution_id), (guid, purchase_type),
+                           markers)
+        return rows
+
+
 def get_headers(length):
     return [('Access-Control-Allow-Origin', '*'),
             ('Access-Control-Allow-Methods', 'POST'),
@@ -367,6 +581,25 @@ def get_headers(length):
 
 
 def decode_receipt(receipt):
+    """
+    Returns the decoded receipt, from the cache if the same receipt was
+    decoded before and has not expired yet.
+    """
+    key = hashlib.sha256(receipt).hexdigest()
+    decoded = decoded_cache.get(key)
+    if decoded is None:
+        decoded = crack_receipt(receipt)
+        try:
+            expires = int(decoded.get('exp', 0))
+        except (AttributeError, TypeError, ValueError):
+            expires = 0
+        decoded_cache.set(key, decoded, expires)
+    # The verifier changes the expiry of expired receipts, so don't hand out
+    # the cached copy.
+    return copy.deepcopy(decoded)
+
+
+def crack_receipt(receipt):
     """
     Cracks the receipt using the private key. This will probably change
     to using the cert at some point, especially when we get the HSM.
@@ -412,6 +645,8 @@ def receipt_check(environ):
     output = ''
     with statsd.timer('services.verify'):
         data = environ['wsgi.input'].read()
+        if data.lstrip().startswith('['):
+            return receipt_batch_check(data, environ)
         try:
             verify = Verify(data, environ)
             return 200, json.dumps(verify.check_full())
@@ -421,6 +656,35 @@ def receipt_check(environ):
     return output
 
 
+def receipt_batch_check(data, environ):
+    """
+    Verifies a JSON array of receipts, returning a JSON array of the
+    results in the same order.
+    """
+    try:
+        batch = json.loads(data)
+    except ValueError:
+        log_info('Batch of receipts is not valid JSON')
+        return 400, ''
+
+    if (not isinstance(batch, list) or
+            not all(isinstance(r, basestring) for r in batch)):
+        log_info('Batch of receipts is not a list of receipts')
+        return 400, ''
+
+    if len(batch) > settings.WEBAPPS_RECEIPT_BATCH_MAX:
+        log_info('Batch of %s receipts is too large' % len(batch))
+        return 400, ''
+
+    with statsd.timer('services.verify.batch'):
+        try:
+            verify = VerifyBatch([str(r) for r in batch], environ)
+            return 200, json.dumps(verify.check_full())
+        except:
+            log_exception('<batch>')
+            return 500, ''
+
+
 def application(environ, start_response):
     body = ''
     path = environ.get('PATH_INFO', '')
@@ -0,0 +1,28 @@
+# A gunicorn config to run the receipt verifier on gevent, so each worker
+# process can have many verifications waiting on the database at once:
+#
+#   gunicorn -c wsgi/receiptverify_gevent.py -b 127.0.0.1:9000 \
+#       verify:application
+#
+# Raise SERVICES_DATABASE_POOL_SIZE to roughly worker_connections, or the
+# requests will just queue up on the connection pool instead.
+import os
+import site
+
+import pymysql
+
+wsgidir = os.path.dirname(__file__)
+for path in ['../', '../..']:
+    site.addsitedir(os.path.abspath(os.path.join(wsgidir, path)))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mkt.settings')
+
+# MySQLdb waits on the database in C, blocking the whole process. PyMySQL is
+# pure python, so once gevent has patched the sockets other requests can run
+# while a query is waiting. This has to happen before services.utils imports
+# MySQLdb, which is why verify is not imported here: the gevent worker
+# patches the standard library and then loads verify:application itself.
+pymysql.install_as_MySQLdb()
+
+worker_class = 'gevent'
+worker_connections = 1000
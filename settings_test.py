@@ -48,12 +48,19 @@ EXTENSIONS_PATH = _polite_tmpdir()
 SIGNED_EXTENSIONS_PATH = _polite_tmpdir()
 
 ALLOW_SELF_REVIEWS = True
+API_OAUTH_PRINCIPAL_CACHE_TIMEOUT = 0
 BROWSERID_AUDIENCES = [SITE_URL]
+# The cache is cleared between tests, which the namespace values kept in
+# memory would outlive.
+CACHE_NS_LOCAL_TIMEOUT = 0
 CELERY_ROUTES = {}
 CELERY_ALWAYS_EAGER = True
 DEBUG = False
 DEBUG_PROPAGATE_EXCEPTIONS = False
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+# The feed cache is tested explicitly, the other feed tests change apps and
+# expect the feed to follow.
+FEED_CACHE_TIMEOUT = 0
 ES_DEFAULT_NUM_REPLICAS = 0
 # See the following URL on why we set num_shards to 1 for tests:
 # http://www.elasticsearch.org/guide/en/elasticsearch/guide/current/relevance-is-broken.html
@@ -69,10 +76,19 @@ PASSWORD_HASHERS = (
 PAYMENT_PROVIDERS = ['bango', 'reference']
 # This is a precaution in case something isn't mocked right.
 PRE_GENERATE_APK_URL = 'http://you-should-never-load-this.com/'
+# The reviewer queue stats cache is tested explicitly, other tests change the
+# queues and expect the counts to follow.
+REVIEWER_QUEUE_STATS_CACHE_TIMEOUT = 0
 RUN_ES_TESTS = True
 SEND_REAL_EMAIL = True
 SITE_URL = 'http://testserver'
 STATIC_URL = SITE_URL + '/'
 TASK_USER_ID = '4043307'
 TEMPLATE_DEBUG = False
+# The translations cache is tested explicitly, other tests count queries.
+TRANSLATIONS_CACHE_TIMEOUT = 0
 VIDEO_LIBRARIES = ['lib.video.dummy']
+# The receipt verifier caches are tested explicitly, don't let them leak
+# between tests.
+WEBAPPS_RECEIPT_DECODE_CACHE_SIZE = 0
+WEBAPPS_RECEIPT_PURCHASE_CACHE_SIZE = 0